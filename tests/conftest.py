@@ -0,0 +1,57 @@
+# tests/conftest.py
+# Configuração comum dos testes unitários (pytest).
+#
+# As ferramentas vivem em 'tools/' como scripts soltos (não é um pacote):
+# o diretório entra no sys.path, como ao rodar 'python tools/x.py'.
+# Os testes não carregam modelos reais: usam modelos falsos determinísticos.
+#
+# USO:
+# $ pip install -r tools/equirements-dev.txt
+# $ python -m pytest -q tests
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent / 'tools'
+sys.path.insert(0, str(TOOLS_DIR))
+
+# Nada de cache em ~/.cache nem de daemon de scoring durante os testes
+os.environ.setdefault("ACC_CACHE_DIR", tempfile.mkdtemp(prefix='acc-test-cache-'))
+os.environ["ACC_SCORING_DAEMON"] = "0"
+
+@pytest.fixture
+def word_tokenizer(monkeypatch):
+    """
+    Troca o tokenizer do 'template_generator' pelo tokenizer determinístico
+    da suíte de benchmarks (o tiktoken baixa os encodings na primeira
+    execução) e limpa o cache de tokens.
+    """
+    import template_generator
+    from benchmark_suite import WordTokenizer
+    tokenizer = WordTokenizer()
+    monkeypatch.setattr(template_generator, 'get_tokenizer', lambda: tokenizer)
+    template_generator._tokens.cache_clear()
+    yield tokenizer
+    template_generator._tokens.cache_clear()
+
+@pytest.fixture
+def stand_in_models():
+    """
+    Registra o modelo local e determinístico da suíte de benchmarks sob o
+    nome de todos os modelos do ACC (nenhum download).
+    """
+    import model_registry
+    from benchmark_suite import register_stand_in_models
+    from embedding_cache import get_cache
+    from validation_core import EMBEDDING_MODELS
+    get_cache().invalidate()
+    register_stand_in_models()
+    yield
+    for model_name in set(EMBEDDING_MODELS.values()) | {'all-MiniLM-L6-v2'}:
+        model_registry.get_registry().evict(model_name)
+    # Embeddings do stand-in não podem vazar para testes com outros modelos
+    get_cache().invalidate()
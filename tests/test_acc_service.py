@@ -0,0 +1,21 @@
+# tests/test_acc_service.py
+# Serviço unificado (acc_service.py): o app sobe (incluindo o import de
+# 'api-endpoint.py' e do 'alignment_visualizer'), responde às sondas e às
+# rotas montadas dos dois apps. O prewarm (padrão) usa o tokenizer local.
+
+from fastapi.testclient import TestClient
+
+def test_unified_service_starts_and_serves(stand_in_models, word_tokenizer):
+    import acc_service
+
+    with TestClient(acc_service.app) as client:
+        assert client.get("/healthz").json() == {'status': 'ok'}
+
+        response = client.post("/api/v1/analyze-alignment",
+                               json={'agent_name': "Hacker Semântico", 'domain': "análise forense de APIs"})
+        assert response.status_code == 200
+        assert 0.0 <= response.json()['semantic_density'] <= 1.0
+
+        stats = client.get("/api/v1/service/stats").json()
+        assert 'startup' in stats and 'batching' in stats
+        assert "acc_http_requests_total" in client.get("/metrics").text
@@ -0,0 +1,54 @@
+# tests/test_api_endpoint.py
+# Lote NDJSON do 'api-endpoint.py': o corpo vai para o spool (disco acima
+# do limite), é lido em blocos fora do event loop e as respostas saem na
+# ordem de entrada, com erros por linha.
+
+import asyncio
+import json
+import tempfile
+import threading
+
+import httpx
+import pytest
+
+from tool_loader import load_tool
+
+@pytest.fixture
+def api(stand_in_models):
+    return load_tool('api-endpoint.py')
+
+def test_ndjson_batch_spools_to_disk_and_reads_off_the_loop(api, monkeypatch):
+    spool_threads = []
+
+    class RecordingSpool(tempfile.SpooledTemporaryFile):
+        def write(self, data):
+            spool_threads.append(threading.current_thread())
+            return super().write(data)
+
+        def readlines(self, hint=-1):
+            spool_threads.append(threading.current_thread())
+            return super().readlines(hint)
+
+    monkeypatch.setattr(api.tempfile, 'SpooledTemporaryFile', RecordingSpool)
+    monkeypatch.setattr(api, 'BATCH_SPOOL_MAX_BYTES', 256)
+    monkeypatch.setattr(api, 'BATCH_SPOOL_IO_BYTES', 128)
+
+    lines = [json.dumps({'agent_name': f"Auditor {i}", 'domain': "auditoria de segurança de APIs"}) for i in range(8)]
+    lines.insert(3, "{não é json")
+    body = ("\n".join(lines) + "\n").encode('utf-8')
+
+    async def run():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://acc") as client:
+            response = await client.post("/api/v1/analyze-alignment/batch", content=body,
+                                         headers={'Content-Type': 'application/x-ndjson'})
+            return response, threading.current_thread()
+
+    response, loop_thread = asyncio.run(run())
+
+    assert response.status_code == 200
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert len(results) == 9
+    assert "Linha NDJSON inválida" in results[3]['error']
+    assert [r['agent_name'] for r in results if 'error' not in r] == [f"Auditor {i}" for i in range(8)]
+    assert spool_threads and loop_thread not in spool_threads
@@ -0,0 +1,103 @@
+# tests/test_batching.py
+# Micro-batching (batching.py): coalescência de requisições concorrentes,
+# ordem dos resultados por requisição e propagação de erros.
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from batching import MicroBatcher
+
+def _encode(texts):
+    return np.array([[len(text), sum(map(ord, text))] for text in texts], dtype=np.float32)
+
+def test_concurrent_requests_share_one_batch_in_order():
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return _encode(texts)
+
+    batcher = MicroBatcher(encode, max_wait_ms=20.0)
+    requests = [["a", "bb"], ["ccc"], ["bb", "dddd", "a"]]
+
+    async def run():
+        return await asyncio.gather(*(batcher.encode(texts) for texts in requests))
+
+    results = asyncio.run(run())
+
+    assert calls == [["a", "bb", "ccc", "dddd"]]  # um encode, sem duplicatas
+    for texts, result in zip(requests, results):
+        np.testing.assert_array_equal(result, _encode(texts))
+    stats = batcher.get_stats()
+    assert stats['batches'] == 1 and stats['requests'] == 3 and stats['unique_texts'] == 4
+
+def test_batch_size_limit_splits_batches():
+    calls = []
+
+    def encode(texts):
+        calls.append(len(texts))
+        return _encode(texts)
+
+    batcher = MicroBatcher(encode, max_wait_ms=20.0, max_batch_size=2)
+
+    async def run():
+        return await asyncio.gather(*(batcher.encode([f"t{i}"]) for i in range(5)))
+
+    results = asyncio.run(run())
+
+    assert sum(calls) == 5 and max(calls) <= 2
+    for i, result in enumerate(results):
+        np.testing.assert_array_equal(result, _encode([f"t{i}"]))
+
+def test_encode_error_reaches_every_request_in_the_batch():
+    def encode(texts):
+        raise RuntimeError("modelo indisponível")
+
+    batcher = MicroBatcher(encode, max_wait_ms=20.0)
+
+    async def run():
+        return await asyncio.gather(batcher.encode(["a"]), batcher.encode(["b"]), return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert len(results) == 2
+    assert all(isinstance(result, RuntimeError) and "indisponível" in str(result) for result in results)
+
+def test_batcher_recovers_on_a_new_event_loop():
+    batcher = MicroBatcher(_encode, max_wait_ms=1.0)
+
+    first = asyncio.run(batcher.encode(["a"]))
+    second = asyncio.run(batcher.encode(["bb"]))
+
+    np.testing.assert_array_equal(first, _encode(["a"]))
+    np.testing.assert_array_equal(second, _encode(["bb"]))
+
+@pytest.mark.parametrize("max_concurrent_batches", [1, 3])
+def test_concurrent_batches_limit(max_concurrent_batches):
+    in_flight, peak = 0, 0
+    lock = threading.Lock()
+
+    def encode(texts):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.02)
+        with lock:
+            in_flight -= 1
+        return _encode(texts)
+
+    batcher = MicroBatcher(encode, max_wait_ms=0.5, max_batch_size=1,
+                           max_concurrent_batches=max_concurrent_batches)
+
+    async def run():
+        return await asyncio.gather(*(batcher.encode([f"t{i}"]) for i in range(6)))
+
+    results = asyncio.run(run())
+
+    assert len(results) == 6
+    assert peak <= max_concurrent_batches
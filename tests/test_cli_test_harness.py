@@ -0,0 +1,124 @@
+# tests/test_cli_test_harness.py
+# Modo harness do 'cli-test.py' contra um LLM stub (httpx.MockTransport):
+# retries, 429 + Retry-After, record/replay do cache de respostas e
+# templates inexistentes na matriz.
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from response_cache import ResponseCache
+from tool_loader import load_tool
+
+STUB_URL = "http://llm-stub"
+
+cli_test = load_tool('cli-test.py')
+
+class StubLLM:
+    """LLM stub: responde cada requisição com o próximo status da fila (depois, 200)."""
+
+    def __init__(self, statuses=(), retry_after='0'):
+        self.statuses = list(statuses)
+        self.retry_after = retry_after
+        self.calls = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.statuses:
+            # Retry-After: 0 mantém o teste rápido e prova que o cabeçalho é respeitado
+            return httpx.Response(self.statuses.pop(0), headers={'Retry-After': self.retry_after}, text="indisponível")
+        prompt = json.loads(request.content)['contents'][0]['parts'][0]['text']
+        return httpx.Response(200, json={'candidates': [{'content': {'parts': [{'text': f"eco:{len(prompt)}"}]}}]})
+
+@pytest.fixture
+def template(tmp_path):
+    path = tmp_path / 'agente.md'
+    path.write_text("# Agente\nRegras do protocolo.\n", encoding='utf-8')
+    return path
+
+def _case(template_path, query="Liste os endpoints."):
+    return {'id': 'caso', 'template': str(template_path), 'query': query, 'model': 'stub-model'}
+
+def _run_case(stub, case, cache=None, retries=3, jitter_s=0.0):
+    harness = cli_test.LLMHarness(None, base_url=STUB_URL, rate=1000.0, retries=retries, cache=cache,
+                                  jitter_s=jitter_s)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(stub)) as client:
+            return await harness.run_case(client, case)
+
+    return asyncio.run(run())
+
+def test_retries_429_and_5xx_until_success(template):
+    stub = StubLLM([429, 503])
+
+    result = _run_case(stub, _case(template))
+
+    assert result['status'] == 'ok'
+    assert result['attempts'] == 3
+    assert stub.calls == 3
+    assert result['response'].startswith("eco:")
+
+def test_retry_after_is_a_floor(template, monkeypatch):
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+    monkeypatch.setattr(cli_test.asyncio, 'sleep', fake_sleep)
+
+    result = _run_case(StubLLM([429, 429], retry_after='2'), _case(template), jitter_s=0.5)
+
+    assert result['status'] == 'ok'
+    assert len(sleeps) == 2
+    assert all(2.0 <= delay <= 2.5 for delay in sleeps)
+
+def test_gives_up_after_retries(template):
+    stub = StubLLM([429] * 5)
+
+    result = _run_case(stub, _case(template), retries=2)
+
+    assert result['status'] == 'error'
+    assert result['attempts'] == 3
+    assert "HTTP 429" in result['error']
+
+def test_client_error_is_not_retried(template):
+    stub = StubLLM([400])
+
+    result = _run_case(stub, _case(template))
+
+    assert result['status'] == 'error'
+    assert stub.calls == 1
+
+def test_replay_serves_recorded_responses_offline(template, tmp_path):
+    cache_dir = tmp_path / 'responses'
+    recorded = _run_case(StubLLM(), _case(template), cache=ResponseCache(str(cache_dir), mode='record'))
+
+    offline = StubLLM()
+    replayed = _run_case(offline, _case(template), cache=ResponseCache(str(cache_dir), mode='replay'))
+    missing = _run_case(offline, _case(template, "Outra query."), cache=ResponseCache(str(cache_dir), mode='replay'))
+
+    assert replayed['status'] == 'ok' and replayed['cached'] is True
+    assert replayed['response'] == recorded['response']
+    assert missing['status'] == 'error' and "replay" in missing['error']
+    assert offline.calls == 0
+
+def test_unreadable_template_becomes_error_row(tmp_path):
+    stub = StubLLM()
+
+    result = _run_case(stub, _case(tmp_path / 'sumiu.md'))
+
+    assert result['status'] == 'error'
+    assert "template" in result['error']
+    assert stub.calls == 0
+
+def test_matrix_rejects_templates_that_match_nothing(template, tmp_path):
+    matrix = tmp_path / 'matrix.json'
+    matrix.write_text(json.dumps({'templates': ['agente.md', 'agnete.md'], 'queries': ['q']}), encoding='utf-8')
+
+    with pytest.raises(ValueError, match="agnete.md"):
+        cli_test.load_matrix(str(matrix))
+
+    matrix.write_text(json.dumps({'templates': ['*.md'], 'queries': ['q1', 'q2']}), encoding='utf-8')
+    assert [case['template'] for case in cli_test.load_matrix(str(matrix))] == [str(template)] * 2
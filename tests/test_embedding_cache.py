@@ -0,0 +1,91 @@
+# tests/test_embedding_cache.py
+# Cache de embeddings (embedding_cache.py): get/put nos dois tiers, encode
+# só dos textos ausentes e invalidação (por versão e com os backends) do modelo.
+
+import numpy as np
+
+from embedding_cache import EmbeddingCache
+
+class CountingModel:
+    """Modelo falso: embedding = [len(texto), 1, 0]; conta os textos codificados."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        self.encoded.extend(texts)
+        return np.array([[len(text), 1.0, 0.0] for text in texts], dtype=np.float32)
+
+def test_put_get_across_memory_and_disk(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    vector = np.array([0.1, 0.2, 0.3])
+
+    assert cache.get('m', "Explorar API") is None
+    cache.put('m', "Explorar API", vector)
+
+    stored = cache.get('m', "  Explorar   API ")  # texto normalizado na chave
+    assert stored.dtype == np.float32
+    np.testing.assert_allclose(stored, vector)
+    assert cache.get('outro-modelo', "Explorar API") is None
+
+    # Um processo novo lê do disco
+    fresh = EmbeddingCache(str(tmp_path))
+    np.testing.assert_allclose(fresh.get('m', "Explorar API"), vector)
+    assert fresh.stats['disk_hits'] == 1
+    assert cache.stats == {'memory_hits': 1, 'disk_hits': 0, 'misses': 2, 'evictions': 0}
+
+def test_encode_only_missing_and_unique_texts(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    model = CountingModel()
+
+    first = cache.encode(["a", "bb", "a"], 'm', model)
+    second = cache.encode(["bb", "ccc"], 'm', model)
+
+    assert model.encoded == ["a", "bb", "ccc"]
+    np.testing.assert_allclose(first[:, 0], [1, 2, 1])
+    np.testing.assert_allclose(second[:, 0], [2, 3])
+
+def test_model_loader_not_called_on_full_hit(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.encode(["a"], 'm', CountingModel())
+
+    def loader():
+        raise AssertionError("o modelo não deveria ser carregado")
+
+    np.testing.assert_allclose(cache.encode(["a"], 'm', loader)[0], [1, 1, 0])
+
+def test_new_model_version_invalidates_only_that_model(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put('m', "texto", np.ones(3))
+    cache.put('outro', "texto", np.ones(3))
+
+    assert cache.ensure_model_version('m', "v1") is False  # primeira versão registrada
+    assert cache.ensure_model_version('m', "v1") is False
+    assert cache.get('m', "texto") is not None
+
+    assert cache.ensure_model_version('m', "v2") is True
+    assert cache.get('m', "texto") is None
+    assert EmbeddingCache(str(tmp_path)).get('m', "texto") is None
+    assert cache.get('outro', "texto") is not None
+
+def test_invalidate_covers_the_model_backends(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    for name in ('m', 'm@onnx', 'm@onnx-int8', 'mx'):
+        cache.put(name, "texto", np.ones(3))
+
+    cache.invalidate('m')
+
+    for fresh in (cache, EmbeddingCache(str(tmp_path))):
+        assert fresh.get('m', "texto") is None
+        assert fresh.get('m@onnx', "texto") is None
+        assert fresh.get('m@onnx-int8', "texto") is None
+        assert fresh.get('mx', "texto") is not None
+
+def test_memory_tier_respects_byte_budget():
+    cache = EmbeddingCache(cache_dir=None, max_bytes=2 * 3 * 4)  # duas embeddings float32 de dim 3
+    for text in ("a", "b", "c"):
+        cache.put('m', text, np.ones(3))
+
+    assert cache.get('m', "a") is None
+    assert cache.get('m', "c") is not None
+    assert cache.stats['evictions'] == 1
@@ -0,0 +1,102 @@
+# tests/test_metrics.py
+# Métricas (metrics.py): formato texto do Prometheus e a instrumentação
+# HTTP, que cobre respostas em streaming até o último byte.
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from metrics import MetricsRegistry, install_metrics
+
+def _samples(text):
+    return [line for line in text.splitlines() if line and not line.startswith('#')]
+
+def test_counter_and_gauge_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("acc_test_total", "Requisições de teste.", ["route"])
+    in_flight = registry.gauge("acc_test_in_flight", "Em andamento.")
+
+    requests.inc(route="/a")
+    requests.inc(2, route='/b"x')
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+
+    text = registry.render()
+
+    assert "# HELP acc_test_total Requisições de teste.\n# TYPE acc_test_total counter" in text
+    assert "# TYPE acc_test_in_flight gauge" in text
+    assert _samples(text) == [
+        "acc_test_in_flight 1",
+        'acc_test_total{route="/a"} 1',
+        'acc_test_total{route="/b\\"x"} 2',
+    ]
+    assert text.endswith("\n")
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("acc_test_seconds", "Latência.", ["op"], buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.5, 0.5, 5.0):
+        latency.observe(value, op="encode")
+
+    assert _samples(registry.render()) == [
+        'acc_test_seconds_bucket{op="encode",le="0.1"} 1',
+        'acc_test_seconds_bucket{op="encode",le="1"} 3',
+        'acc_test_seconds_bucket{op="encode",le="+Inf"} 4',
+        'acc_test_seconds_sum{op="encode"} 6.05',
+        'acc_test_seconds_count{op="encode"} 4',
+    ]
+
+def test_wrong_labels_are_rejected():
+    registry = MetricsRegistry()
+    counter = registry.counter("acc_test_total", "Teste.", ["route"])
+
+    with pytest.raises(ValueError, match="route"):
+        counter.inc(status="200")
+
+def test_http_metrics_cover_streaming_bodies():
+    registry = MetricsRegistry()
+    app = FastAPI()
+    in_flight_during_stream = []
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(3):
+                in_flight_during_stream.append(
+                    'acc_http_requests_in_flight 1' in registry.render())
+                await asyncio.sleep(0.01)
+                yield b"x"
+        return StreamingResponse(chunks())
+
+    @app.get("/boom")
+    async def boom():
+        raise ValueError("falha")
+
+    install_metrics(app, registry=registry)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://acc") as client:
+            assert (await client.get("/stream")).text == "xxx"
+            assert (await client.get("/boom")).status_code == 500
+            await client.get("/nao-existe")
+            return (await client.get("/metrics")).text
+
+    text = asyncio.run(run())
+
+    assert in_flight_during_stream == [True, True, True]
+    samples = _samples(text)
+    assert "acc_http_requests_in_flight 0" in samples
+    assert 'acc_http_requests_total{method="GET",route="/stream",status="200"} 1' in samples
+    assert 'acc_http_requests_total{method="GET",route="/boom",status="500"} 1' in samples
+    assert 'acc_http_requests_total{method="GET",route="unmatched",status="404"} 1' in samples
+    # A latência inclui o corpo inteiro (3 x 10 ms), não só os headers
+    stream_sum = next(line for line in samples if line.startswith('acc_http_request_seconds_sum{route="/stream"}'))
+    assert float(stream_sum.split()[-1]) >= 0.03
+    # O próprio /metrics não é instrumentado
+    assert 'route="/metrics"' not in text
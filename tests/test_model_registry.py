@@ -0,0 +1,121 @@
+# tests/test_model_registry.py
+# Registro de modelos (model_registry.py): carga única sob concorrência
+# (single-flight), erros propagados, orçamento de RAM (LRU) e a versão
+# dos pesos no cache de embeddings.
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import model_registry
+from embedding_cache import EmbeddingCache
+from model_registry import ModelRegistry
+
+class SizedModel:
+    def __init__(self, name, nbytes):
+        self.name = name
+        self.nbytes = nbytes
+
+    def memory_bytes(self):
+        return self.nbytes
+
+def test_concurrent_gets_share_a_single_load():
+    loads = []
+    started = threading.Event()
+
+    def slow_loader(name):
+        loads.append(name)
+        started.set()
+        time.sleep(0.05)
+        return SizedModel(name, 10)
+
+    registry = ModelRegistry(ram_budget_bytes=0, loader=slow_loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get('m'))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loads == ['m']
+    assert len(results) == 8 and all(model is results[0] for model in results)
+    assert registry.stats['loads'] == 1
+
+def test_load_error_reaches_every_waiter_and_is_retried():
+    attempts = []
+
+    def failing_loader(name):
+        attempts.append(name)
+        if len(attempts) == 1:
+            time.sleep(0.05)
+            raise OSError("pesos ausentes")
+        return SizedModel(name, 10)
+
+    registry = ModelRegistry(ram_budget_bytes=0, loader=failing_loader)
+    errors = []
+
+    def get():
+        try:
+            registry.get('m')
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=get) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(attempts) == 1
+    assert len(errors) == 4 and all("pesos ausentes" in error for error in errors)
+    # Uma chamada posterior tenta carregar de novo
+    assert registry.get('m').name == 'm'
+
+def test_budget_evicts_least_recently_used():
+    registry = ModelRegistry(ram_budget_bytes=100, loader=lambda name: SizedModel(name, 40))
+
+    registry.get('a')
+    registry.get('b')
+    registry.get('a')  # 'b' passa a ser o menos usado
+    registry.get('c')
+
+    assert registry.loaded() == ['a', 'c']
+    assert registry.memory_bytes() == 80
+    assert registry.stats['evictions'] == 1
+
+def test_model_larger_than_budget_stays_loaded():
+    registry = ModelRegistry(ram_budget_bytes=100, loader=lambda name: SizedModel(name, 40 if name == 'a' else 500))
+
+    registry.get('a')
+    registry.get('grande')
+
+    assert registry.loaded() == ['grande']
+
+def test_unknown_backend_is_rejected():
+    import model_registry
+    with pytest.raises(ValueError):
+        model_registry.set_backend('m', 'tensorrt')
+
+class VersionedModel(SizedModel):
+    def __init__(self, name, version):
+        super().__init__(name, 10)
+        self.version = version
+
+def test_load_invalidates_embeddings_of_a_new_model_version(tmp_path, monkeypatch):
+    cache = EmbeddingCache(str(tmp_path))
+    monkeypatch.setattr(model_registry, 'get_cache', lambda: cache)
+    versions = ['v1', 'v1', 'v2']
+
+    def loader(name):
+        return VersionedModel(name, versions.pop(0))
+
+    ModelRegistry(loader=loader).get('m')
+    cache.put('m', "texto", np.ones(3))
+
+    ModelRegistry(loader=loader).get('m')  # mesma versão: o cache continua válido
+    assert cache.get('m', "texto") is not None
+
+    ModelRegistry(loader=loader).get('m')
+    assert cache.get('m', "texto") is None
@@ -0,0 +1,27 @@
+# tests/test_prefork.py
+# Modo pre-fork (prefork.py): o app documentado carrega no pai e o
+# relatório de memória lê o /proc.
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from prefork import _process_memory, load_app_module
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent / 'tools'
+
+def test_documented_app_loads_with_its_startup_state():
+    module = load_app_module(str(TOOLS_DIR / 'api-endpoint.py'))
+
+    assert module is sys.modules['api_endpoint']
+    assert module.app is not None
+    assert module.STARTUP.status in ('off', 'done')
+
+@pytest.mark.skipif(not Path(f"/proc/{os.getpid()}/smaps_rollup").exists(), reason="requer /proc (Linux)")
+def test_memory_report_reads_smaps_rollup():
+    memory = _process_memory(os.getpid())
+
+    assert memory['pid'] == os.getpid()
+    assert memory['rss_mb'] > 0
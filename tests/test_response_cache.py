@@ -0,0 +1,94 @@
+# tests/test_response_cache.py
+# Cache de respostas do LLM (response_cache.py): chave, modos
+# record/replay/refresh e o limite de tamanho em disco.
+
+import os
+
+import pytest
+
+from response_cache import ReplayMiss, ResponseCache, _mode_from_env, response_key
+
+CONFIG = {'temperature': 0.1, 'top_p': 0.9, 'top_k': 10}
+
+class FakeLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return f"resposta {self.calls}"
+
+def _call(cache, llm, query="Liste os endpoints."):
+    return cache.call("# Agente", query, "gemini", CONFIG, llm)
+
+def test_key_covers_every_input():
+    base = response_key("# Agente", "q", "gemini", CONFIG)
+
+    assert base == response_key("# Agente", "q", "gemini", dict(CONFIG))
+    assert base != response_key("# Agente v2", "q", "gemini", CONFIG)
+    assert base != response_key("# Agente", "q", "outro-modelo", CONFIG)
+    assert base != response_key("# Agente", "q", "gemini", {**CONFIG, 'temperature': 0.7})
+    assert base != response_key("# Agente", "q", "gemini", CONFIG, endpoint="http://stub")
+
+def test_record_then_replay(tmp_path):
+    llm = FakeLLM()
+    recorded = _call(ResponseCache(str(tmp_path), mode='record'), llm)
+    again = _call(ResponseCache(str(tmp_path), mode='record'), llm)
+
+    replay = ResponseCache(str(tmp_path), mode='replay')
+
+    assert recorded == again == _call(replay, llm) == "resposta 1"
+    assert llm.calls == 1
+    with pytest.raises(ReplayMiss):
+        _call(replay, llm, "Query nunca gravada.")
+    assert llm.calls == 1
+
+def test_refresh_overwrites_the_entry(tmp_path):
+    llm = FakeLLM()
+    _call(ResponseCache(str(tmp_path), mode='record'), llm)
+
+    refreshed = _call(ResponseCache(str(tmp_path), mode='refresh'), llm)
+
+    assert refreshed == "resposta 2"
+    assert _call(ResponseCache(str(tmp_path), mode='replay'), llm) == "resposta 2"
+
+def test_off_never_touches_disk(tmp_path):
+    llm = FakeLLM()
+    cache = ResponseCache(str(tmp_path), mode='off')
+
+    _call(cache, llm)
+    _call(cache, llm)
+
+    assert llm.calls == 2
+    assert list(tmp_path.iterdir()) == []
+
+def test_invalid_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ResponseCache(str(tmp_path), mode='write-through')
+
+def test_env_mode_defaults_to_off_and_falls_back_on_invalid(monkeypatch, capsys):
+    monkeypatch.delenv("ACC_RESPONSE_CACHE_MODE", raising=False)
+    assert _mode_from_env() == 'off'
+
+    monkeypatch.setenv("ACC_RESPONSE_CACHE_MODE", "Replay")
+    assert _mode_from_env() == 'replay'
+
+    monkeypatch.setenv("ACC_RESPONSE_CACHE_MODE", "write-through")
+    assert _mode_from_env() == 'off'
+    assert "ACC_RESPONSE_CACHE_MODE inválido" in capsys.readouterr().err
+
+def test_size_limit_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path), mode='record', max_bytes=10 ** 6)
+    for i in range(3):
+        cache.put(f"{i:064x}", "x" * 2000)
+        os.utime(cache._path(f"{i:064x}"), (1000 + i, 1000 + i))  # 0 é a menos usada
+
+    # Cabem as três entradas (+ meia de folga: o tamanho varia alguns bytes
+    # com o timestamp): a quarta força UMA remoção
+    small = ResponseCache(str(tmp_path), mode='record', max_bytes=cache._total_bytes * 7 // 6)
+    small.put(f"{3:064x}", "x" * 2000)
+
+    assert small.stats['evictions'] == 1
+    assert small.get(f"{0:064x}") is None
+    assert small.get(f"{3:064x}") is not None
+    assert small._total_bytes <= small.max_bytes
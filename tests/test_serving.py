@@ -0,0 +1,59 @@
+# tests/test_serving.py
+# Sondas de saúde (serving.py): o '/healthz' responde logo, e o '/readyz'
+# só fica pronto quando o prewarm (o padrão) termina de carregar o modelo.
+
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from serving import install_health_probes
+
+def test_readyz_waits_for_the_prewarm():
+    release = threading.Event()
+    app = FastAPI()
+    state = install_health_probes(app, warmup=lambda: release.wait(5))
+
+    with TestClient(app) as client:
+        assert client.get("/healthz").status_code == 200
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()['prewarm'] == 'running'
+        assert 'Retry-After' in response.headers
+
+        release.set()
+        for _ in range(100):
+            if state.ready:
+                break
+            time.sleep(0.01)
+
+        response = client.get("/readyz")
+        assert response.status_code == 200
+        assert response.json()['prewarm'] == 'done'
+
+def test_prewarm_off_is_ready_at_startup():
+    app = FastAPI()
+    install_health_probes(app, warmup=lambda: None, prewarm=False)
+
+    with TestClient(app) as client:
+        response = client.get("/readyz")
+        assert response.status_code == 200
+        assert response.json()['prewarm'] == 'off'
+
+def test_failed_prewarm_is_never_ready():
+    app = FastAPI()
+
+    def warmup():
+        raise RuntimeError("modelo ausente")
+    state = install_health_probes(app, warmup=warmup)
+
+    with TestClient(app) as client:
+        for _ in range(100):
+            if state.status == 'error':
+                break
+            time.sleep(0.01)
+
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()['error'] == "modelo ausente"
@@ -0,0 +1,70 @@
+# tests/test_strategy_generator.py
+# Busca pontuada de candidatos (strategy_generator.py): o top-k com poda
+# (cascata + branch-and-bound) é o mesmo da avaliação completa, e o
+# '--score' roda de ponta a ponta.
+
+import sys
+
+import numpy as np
+import pytest
+
+import model_registry
+import strategy_generator
+from embedding_cache import get_cache
+from validation_core import EMBEDDING_MODELS, THRESHOLD_MIN_CROSS_PLATFORM, run_validation
+
+DOMAIN = "análise forense de APIs e ofertas de tecnologia"
+
+class NoisyModel:
+    """
+    Modelo falso por semente: embedding = direção comum + ruído do texto.
+    As SDs ficam em torno de 0.5-0.8 e variam entre modelos e candidatos.
+    """
+
+    def __init__(self, seed, dim=16, noise=0.6):
+        self.seed, self.dim, self.noise = seed, dim, noise
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, **kwargs):
+        rows = []
+        for text in texts:
+            rng = np.random.default_rng([self.seed, *text.encode('utf-8')])
+            rows.append(np.ones(self.dim) / np.sqrt(self.dim) + self.noise * rng.standard_normal(self.dim) / np.sqrt(self.dim))
+        return np.array(rows, dtype=np.float32)
+
+@pytest.fixture
+def noisy_models():
+    registry = model_registry.get_registry()
+    get_cache().invalidate()
+    for seed, model_name in enumerate(EMBEDDING_MODELS.values()):
+        registry.register(model_name, NoisyModel(seed))
+    yield
+    for model_name in EMBEDDING_MODELS.values():
+        registry.evict(model_name)
+    get_cache().invalidate()
+
+@pytest.mark.parametrize("top_k, chunk_size", [(3, 4), (5, 64), (8, 2)])
+def test_pruned_top_k_matches_full_evaluation(noisy_models, capsys, top_k, chunk_size):
+    candidates = strategy_generator.generate_name_candidates("Hacker", DOMAIN, top_n=15, keyword_pairs=True)
+
+    ranked = strategy_generator.score_candidates(candidates, DOMAIN, top_k=top_k, chunk_size=chunk_size)
+
+    full = {name: run_validation(name, DOMAIN) for name in dict.fromkeys(candidates)}
+    passing = sorted((dict(v, name=name) for name, v in full.items()
+                      if v['sd_min'] >= THRESHOLD_MIN_CROSS_PLATFORM and v['status_minimalism'] == 'PASS'),
+                     key=lambda v: -v['sd_mean'])
+    assert top_k < len(passing) < len(full)  # há o que podar (cascata e top-k)
+    assert [v['name'] for v in ranked] == [v['name'] for v in passing[:top_k]]
+    for verdict, expected in zip(ranked, passing):
+        assert verdict['sd_partial'] is False
+        assert verdict['sd_mean'] == pytest.approx(expected['sd_mean'], abs=1e-5)
+
+def test_score_cli_prints_the_ranking(stand_in_models, monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'argv', ['strategy_generator.py', 'Hacker', 'análise', 'de', 'APIs',
+                                      '--score', '--top-k', '3'])
+
+    strategy_generator.main()
+
+    output = capsys.readouterr().out
+    assert "Pontuando Candidatos" in output
+    ranking = [line for line in output.splitlines() if line.strip().startswith(('1.', '2.', '3.'))]
+    assert len(ranking) == 3 and all("Hacker" in line for line in ranking)
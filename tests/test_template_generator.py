@@ -0,0 +1,119 @@
+# tests/test_template_generator.py
+# Modo orçamento do gerador (template_generator.py): a mochila de múltipla
+# escolha contra a força bruta, e o 'optimize_for_budget' de ponta a ponta.
+
+from itertools import product
+
+import pytest
+
+from template_generator import (
+    MIN_BASESHOT_EXAMPLES, MIN_PROTOCOL_ITEMS, AgentConfigV1_1, BaseshotExample, TemplateGenerator
+)
+
+FIXED_COST = 20
+
+# (custo, valor) por variante: inteira e cortada
+PROTOCOL_COSTS = [[(9, 1.0), (4, 0.6)], [(7, 0.9), (3, 0.5)], [(12, 0.8), (5, 0.3)], [(6, 0.7), (2, 0.2)]]
+EXAMPLE_COSTS = [
+    ('positive', [(10, 1.0), (5, 0.7)]),
+    ('negative', [(14, 1.2), (6, 0.8)]),
+    ('edge', [(8, 0.9), (4, 0.4)]),
+    ('positive', [(11, 0.8), (3, 0.3)]),
+    ('negative', [(9, 1.1), (5, 0.5)]),
+    ('positive', [(7, 0.6), (2, 0.2)]),
+]
+
+def _options():
+    protocol = [[(cost, value, f"item {i}/{v}") for v, (cost, value) in enumerate(variants)]
+                for i, variants in enumerate(PROTOCOL_COSTS)]
+    examples = [[(cost, value, BaseshotExample(ex_type, f"in {i}/{v}", f"out {i}/{v}"))
+                 for v, (cost, value) in enumerate(variants)]
+                for i, (ex_type, variants) in enumerate(EXAMPLE_COSTS)]
+    return protocol, examples
+
+def _brute_force(protocol, examples, budget):
+    """Maior valor entre todas as escolhas (None = item removido) que respeitam as regras."""
+    def choices(options):
+        for picks in product(*[[None] + variants for variants in options]):
+            yield [pick for pick in picks if pick is not None]
+
+    best = None
+    for p in choices(protocol):
+        if len(p) < MIN_PROTOCOL_ITEMS:
+            continue
+        for e in choices(examples):
+            if len(e) < MIN_BASESHOT_EXAMPLES or not any(item.type == 'negative' for _, _, item in e):
+                continue
+            cost = FIXED_COST + sum(c for c, _, _ in p) + sum(c for c, _, _ in e)
+            value = sum(v for _, v, _ in p) + sum(v for _, v, _ in e)
+            if cost <= budget and (best is None or value > best):
+                best = value
+    return best
+
+def _value(options, chosen):
+    lookup = {id(item): value for variants in options for _, value, item in variants}
+    return sum(lookup[id(item)] for item in chosen)
+
+@pytest.mark.parametrize("budget", [45, 55, 62, 70, 85, 200])
+def test_knapsack_matches_brute_force(budget):
+    protocol, examples = _options()
+
+    choice = TemplateGenerator()._solve_budget(FIXED_COST, protocol, examples, budget)
+    best = _brute_force(protocol, examples, budget)
+
+    if best is None:
+        assert choice is None
+        return
+    protocol_items, baseshot_examples, _ = choice
+    assert _value(protocol, protocol_items) + _value(examples, baseshot_examples) == pytest.approx(best)
+    cost_lookup = {id(item): cost for variants in protocol + examples for cost, _, item in variants}
+    assert FIXED_COST + sum(cost_lookup[id(item)] for item in protocol_items + baseshot_examples) <= budget
+
+def test_knapsack_minimize_without_budget():
+    protocol, examples = _options()
+
+    protocol_items, baseshot_examples, _ = TemplateGenerator()._solve_budget(FIXED_COST, protocol, examples, None)
+
+    assert len(protocol_items) == MIN_PROTOCOL_ITEMS
+    assert len(baseshot_examples) == MIN_BASESHOT_EXAMPLES
+    assert any(ex.type == 'negative' for ex in baseshot_examples)
+
+def _config():
+    long_text = "valida cada campo do contrato contra o schema publicado e registra as divergências encontradas"
+    return AgentConfigV1_1(
+        name="Explorador de API",
+        domain="Exploração de APIs REST",
+        mission="Mapear endpoints e contratos de uma API REST.",
+        protocol_items=[f"Passo {i}: {long_text}" for i in range(5)],
+        baseshot_examples=[BaseshotExample('positive', f"Caso {i}: {long_text}", f"Saída {i}: {long_text}")
+                           for i in range(6)]
+                          + [BaseshotExample('negative', "Inventar endpoint", "Endpoint fictício")]
+    )
+
+def test_optimize_for_budget_fits_and_keeps_the_rules(word_tokenizer):
+    generator = TemplateGenerator()
+    config = _config()
+    _, full_tokens, _ = generator.generate_template_file(config)
+    minimum = generator.optimize_for_budget(config, 0).token_count
+    budget = (minimum + full_tokens) // 2
+
+    result = generator.optimize_for_budget(config, budget)
+
+    assert result.fits and result.token_count <= budget
+    assert generator.generate_template_file(result.config)[1] == result.token_count
+    assert len(result.config.protocol_items) >= MIN_PROTOCOL_ITEMS
+    assert len(result.config.baseshot_examples) >= MIN_BASESHOT_EXAMPLES
+    assert any(ex.type == 'negative' for ex in result.config.baseshot_examples)
+    assert result.dropped_protocol_items + result.dropped_examples + result.trimmed_items > 0
+
+def test_optimize_for_budget_keeps_everything_when_it_fits(word_tokenizer):
+    generator = TemplateGenerator()
+    config = _config()
+    _, full_tokens, _ = generator.generate_template_file(config)
+
+    # Folga: a soma dos trechos pode passar um pouco do documento inteiro
+    result = generator.optimize_for_budget(config, full_tokens + 50)
+
+    assert result.fits
+    assert result.config == config
+    assert (result.dropped_protocol_items, result.dropped_examples, result.trimmed_items) == (0, 0, 0)
@@ -0,0 +1,90 @@
+# tests/test_template_parser.py
+# Parser de templates (template_parser.py): ida e volta com o gerador,
+# a biblioteca 'templates/' e os erros com arquivo:linha.
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from template_generator import AgentConfigV1_1, BaseshotExample, TemplateGenerator
+from template_parser import TemplateParseError, parse_directory, parse_file, parse_summary, parse_text
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / 'templates'
+TOOLS_DIR = TEMPLATES_DIR.parent / 'tools'
+
+def _config():
+    return AgentConfigV1_1(
+        name="Explorador de API",
+        domain="Exploração de APIs REST",
+        mission="Mapear endpoints e contratos de uma API REST.",
+        protocol_items=["Ler a spec OpenAPI", "Listar endpoints", "Validar contratos"],
+        baseshot_examples=[
+            BaseshotExample('positive', "Liste os endpoints", "GET /users, POST /users"),
+            BaseshotExample('positive', "Qual o contrato de /users?", "Schema User {id, name}"),
+            BaseshotExample('edge', "Spec ausente", "Pedir a spec antes de mapear"),
+            BaseshotExample('positive', "Endpoints paginados?", "GET /users?page=N"),
+            BaseshotExample('negative', "Inventar endpoint", "Endpoint fictício"),
+        ]
+    )
+
+def test_round_trip_generator_to_parser(word_tokenizer):
+    config = _config()
+    markdown, _, _ = TemplateGenerator().generate_template_file(config)
+
+    parsed = parse_text(markdown)
+
+    assert parsed == config
+    assert TemplateGenerator().generate_template_file(parsed)[0] == markdown
+
+def test_crlf_and_ascii_borders_are_tolerated(word_tokenizer):
+    markdown, _, _ = TemplateGenerator().generate_template_file(_config())
+
+    parsed = parse_text(markdown.replace("│", "|").replace("\n", "\r\n"))
+
+    assert parsed == _config()
+
+def test_library_templates_parse():
+    paths = sorted(TEMPLATES_DIR.glob('*.md'))
+    assert paths
+
+    results = parse_directory(TEMPLATES_DIR, workers=1)
+
+    assert [error for _, _, error in results if error is not None] == []
+    for path in paths:
+        summary = parse_summary(path.read_text(encoding='utf-8').splitlines())
+        assert summary['identity'] == parse_file(path).name
+
+def test_summary_tolerates_what_the_strict_parser_rejects(word_tokenizer):
+    markdown, _, _ = TemplateGenerator().generate_template_file(_config())
+    # Linha solta antes das camadas e uma 'BASESHOT' inválida: 'parse_text' falharia
+    broken = "Rascunho do agente\n" + markdown.replace("❌ Caso (Tipo: negative)", "✅ Caso (Tipo: positive)")
+
+    with pytest.raises(TemplateParseError):
+        parse_text(broken)
+    assert parse_summary(broken.splitlines()) == {
+        'identity': "Explorador de API",
+        'domain': "Exploração de APIs REST",
+        'mission': "Mapear endpoints e contratos de uma API REST."
+    }
+
+def test_parse_error_points_to_the_line(word_tokenizer):
+    markdown, _, _ = TemplateGenerator().generate_template_file(_config())
+    # Sem o único 'negative': a Camada 4 fica inválida
+    broken = markdown.replace("❌ Caso (Tipo: negative)", "✅ Caso (Tipo: positive)")
+
+    with pytest.raises(TemplateParseError) as info:
+        parse_text(broken, "agente.md")
+
+    assert info.value.path == "agente.md"
+    assert str(info.value).startswith(f"agente.md:{info.value.line}:")
+
+def test_parser_and_index_do_not_import_the_api():
+    # O modelo de dados vive em 'agent_config.py': nem o FastAPI nem o
+    # 'template_generator' entram no import do parser e do índice
+    code = ("import sys, template_parser, template_index; "
+            "print(sorted({'fastapi', 'template_generator'} & sys.modules.keys()))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=TOOLS_DIR, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,34 @@
+# tests/test_token_counter.py
+# Auditoria do 'token-counter.py': o manifesto reaproveita as contagens de
+# arquivos inalterados e descarta os arquivos que não estão mais na execução.
+
+import json
+
+import pytest
+
+from benchmark_suite import WordTokenizer
+from tool_loader import load_tool
+
+@pytest.fixture
+def token_counter(monkeypatch):
+    module = load_tool('token-counter.py')
+    tokenizer = WordTokenizer()
+    monkeypatch.setattr(module, 'get_encoding', lambda: tokenizer)
+    return module
+
+def test_manifest_reuses_counts_and_prunes_missing_files(tmp_path, token_counter):
+    manifest = tmp_path / 'manifest.json'
+    first, second = tmp_path / 'a.md', tmp_path / 'b.md'
+    first.write_text("# Agente A\nRegras.\n", encoding='utf-8')
+    second.write_text("# Agente B\n", encoding='utf-8')
+
+    rows = token_counter.audit_files([first, second], str(manifest))
+    assert [row['tokens'] > 0 for row in rows] == [True, True]
+    assert len(json.loads(manifest.read_text(encoding='utf-8'))['files']) == 2
+
+    second.unlink()
+    again = token_counter.audit_files([first], str(manifest))
+
+    assert again == rows[:1]
+    files = json.loads(manifest.read_text(encoding='utf-8'))['files']
+    assert list(files) == [str(first.resolve())]
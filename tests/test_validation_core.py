@@ -0,0 +1,54 @@
+# tests/test_validation_core.py
+# Regras de parada da cascata (validation_core.cascade_decided) e o
+# resultado parcial ('sd_partial') de uma validação interrompida.
+
+import pytest
+
+import validation_core
+from validation_core import THRESHOLD_MIN_CROSS_PLATFORM, cascade_decided, run_validation
+
+@pytest.mark.parametrize("sd_values, decided", [
+    ([0.54], True),
+    ([0.90, 0.54], True),
+    ([0.55], False),
+    ([0.56, 0.56], False),
+    # Média baixa, mas nenhuma SD < 0.55: o último modelo ainda decide
+    ([0.55, 0.55, 0.55], False),
+    ([0.99, 0.99, 0.10], True),
+])
+def test_cascade_decided_only_on_sd_below_cross_platform_minimum(sd_values, decided):
+    assert cascade_decided(sd_values) is decided
+
+def _fake_scores(monkeypatch, sds):
+    """Substitui o encode por SDs fixas por modelo; registra a ordem de chamada."""
+    calls = []
+
+    def fake_score_model(key, name, domain):
+        calls.append(key)
+        return sds[key], len(name.split()), {'wall_s': 0.0, 'cpu_s': 0.0}
+
+    monkeypatch.setattr(validation_core, '_score_model', fake_score_model)
+    return calls
+
+def test_cascade_stops_at_first_model_below_minimum(monkeypatch, capsys):
+    calls = _fake_scores(monkeypatch, {'miniLM': 0.80, 'mpnet': 0.40, 'multilingual': 0.95})
+
+    result = run_validation("Explorador de API", "Explorar API", cascade=True)
+
+    assert calls == ['miniLM', 'mpnet']
+    assert result['models_evaluated'] == ['miniLM', 'mpnet']
+    assert result['sd_partial'] is True
+    assert result['status_sd'] == 'FAIL'
+    assert result['sd_min'] < THRESHOLD_MIN_CROSS_PLATFORM
+
+def test_cascade_runs_every_model_when_undecided(monkeypatch, capsys):
+    sds = {'miniLM': 0.60, 'mpnet': 0.60, 'multilingual': 0.60}
+    _fake_scores(monkeypatch, sds)
+
+    cascaded = run_validation("Explorador de API", "Explorar API", cascade=True)
+    sequential = run_validation("Explorador de API", "Explorar API")
+
+    assert cascaded['sd_partial'] is False
+    assert sorted(cascaded['models_evaluated']) == sorted(sds)
+    assert cascaded['sd_mean'] == pytest.approx(sequential['sd_mean'])
+    assert cascaded['status_sd'] == sequential['status_sd'] == 'FAIL'
@@ -0,0 +1,35 @@
+# tests/test_vocab_index.py
+# Índice de vocabulário (vocab_index.py): o hash do vocabulário gravado no
+# .npz é conferido na carga, e um índice desatualizado é reconstruído.
+
+import numpy as np
+
+import vocab_index
+
+MODEL = 'all-MiniLM-L6-v2'
+
+def _hash_of(path):
+    with np.load(path, allow_pickle=False) as data:
+        return str(data['vocab_hash'])
+
+def test_index_of_another_vocabulary_is_rebuilt(tmp_path, stand_in_models):
+    old_words = ["api", "scanner", "auditor"]
+    new_words = ["forense", "hacker", "rede", "segurança"]
+    path = vocab_index.build_index(MODEL, old_words, index_dir=str(tmp_path))
+
+    assert vocab_index.get_index(MODEL, str(tmp_path), old_words).words == old_words
+
+    index = vocab_index.get_index(MODEL, str(tmp_path), new_words)
+
+    assert index.words == new_words
+    assert _hash_of(path) == vocab_index.vocabulary_hash(new_words)
+
+def test_default_vocabulary_replaces_a_stale_index(tmp_path, stand_in_models):
+    vocab_index.build_index(MODEL, ["api", "scanner"], index_dir=str(tmp_path))
+
+    names = vocab_index.suggest_names(MODEL, "auditoria de segurança de APIs", k=3, index_dir=str(tmp_path))
+
+    index = vocab_index.get_index(MODEL, str(tmp_path))
+    assert index.words == vocab_index.DEFAULT_VOCABULARY
+    assert index.vocab_hash == vocab_index.DEFAULT_VOCABULARY_HASH
+    assert len(names) == 3
@@ -0,0 +1,163 @@
+# tools/acc_service.py
+# v1.1.0 - Serviço Unificado ACC (Um Processo, Modelos Compartilhados)
+#
+# OBJETIVO:
+# 'api-endpoint.py' (alinhamento), 'template_generator.py' (geração e
+# exportação) e o blueprint Flask de 'app/routes.py' rodavam como três
+# apps separados, todos na porta 8000, cada um com seu tokenizer/modelo.
+# Aqui eles são servidos por UM app FastAPI:
+#
+# 1. (ROTAS) As rotas '/api/...' dos dois apps FastAPI são montadas como
+#    estão; o blueprint Flask fica em ACC_APP_PREFIX (Padrão: /app), via WSGI.
+# 2. (COMPARTILHADO) Um único 'model_registry', cache de embeddings,
+#    tokenizer ('get_tokenizer'), pool de inferência e micro-batcher.
+# 3. (OPERAÇÃO) Um controle de admissão, '/healthz' + '/readyz', '/metrics'
+#    e um prewarm (padrão; ACC_PREWARM=0 desliga) que cobre modelo E tokenizer.
+#    Compatível com o modo multi-worker: 'prefork.py serve tools/acc_service.py'.
+#
+# USO (CLI):
+# $ python tools/acc_service.py --port 8000
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+import model_registry
+import template_generator
+from embedding_cache import get_cache
+from metrics import REGISTRY, install_metrics
+from serving import install_admission_control, install_health_probes
+from tool_loader import load_tool
+
+TOOLS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = TOOLS_DIR.parent
+
+# --- Configuração ---
+DEFAULT_PORT = int(os.getenv("ACC_PORT", "8000"))
+APP_PREFIX = os.getenv("ACC_APP_PREFIX", "/app")
+
+# 'api-endpoint.py' não é um nome de módulo válido
+api_endpoint = load_tool('api-endpoint.py')
+
+# --- App Unificado ---
+
+app = FastAPI(
+    title="Agente Canivete Cirúrgico (ACC) - Serviço Unificado",
+    description="Análise de alinhamento, geração/exportação de templates e rotas do app, em um processo.",
+    version="1.1.0"
+)
+
+def _mount_api_routes(target: FastAPI, source: FastAPI) -> int:
+    """Copia as rotas '/api/...' de 'source' (sem docs/health, que são do app unificado)."""
+    existing = {(route.path, tuple(sorted(route.methods))) for route in target.routes if isinstance(route, APIRoute)}
+    mounted = 0
+    for route in source.routes:
+        if not isinstance(route, APIRoute) or not route.path.startswith('/api/'):
+            continue
+        key = (route.path, tuple(sorted(route.methods)))
+        if key in existing:
+            raise RuntimeError(f"Rota duplicada no serviço unificado: {sorted(route.methods)} {route.path}")
+        target.router.routes.append(route)
+        existing.add(key)
+        mounted += 1
+    return mounted
+
+_mount_api_routes(app, api_endpoint.app)
+_mount_api_routes(app, template_generator.app)
+
+def _mount_flask_app(target: FastAPI, prefix: str) -> bool:
+    """
+    Monta o blueprint 'api_routes' (app/routes.py) em 'prefix'. Flask é
+    opcional: sem ele, o serviço sobe só com as rotas FastAPI.
+    """
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.append(str(REPO_ROOT))
+    try:
+        from flask import Flask
+        from app.routes import api_routes
+    except ImportError as e:
+        print(f"Aviso: Rotas Flask (app/routes.py) não montadas: {e}", file=sys.stderr)
+        return False
+    try:
+        from a2wsgi import WSGIMiddleware
+    except ImportError:
+        from starlette.middleware.wsgi import WSGIMiddleware
+
+    flask_app = Flask('acc_app')
+    flask_app.register_blueprint(api_routes)
+    target.mount(prefix, WSGIMiddleware(flask_app))
+    return True
+
+FLASK_MOUNTED = _mount_flask_app(app, APP_PREFIX)
+
+# Um único controle de admissão e um prewarm para tudo que o processo serve
+ADMISSION = install_admission_control(app)
+
+def warmup() -> None:
+    model_registry.get_registry().warmup([api_endpoint.MODEL_NAME])
+    template_generator.get_tokenizer().encode("warmup")
+
+STARTUP = install_health_probes(app, warmup=warmup)
+install_metrics(app)
+
+def _token_cache_lookups():
+    info = template_generator._tokens.cache_info()
+    return {('hit',): info.hits, ('miss',): info.misses}
+
+REGISTRY.callback("acc_token_cache_lookups_total", "Lookups no cache de tokens do gerador por resultado.",
+                  "counter", ["result"], _token_cache_lookups)
+
+@app.get("/api/v1/service/stats")
+async def service_stats() -> Dict[str, Any]:
+    """
+    Estado das camadas compartilhadas: micro-batching, admissão, cache de
+    embeddings, modelos carregados e cache de tokens do gerador.
+    """
+    registry = model_registry.get_registry()
+    token_cache = template_generator._tokens.cache_info()
+    return {
+        'batching': api_endpoint.BATCHER.get_stats(),
+        'admission': ADMISSION.get_stats(),
+        'embedding_cache': get_cache().get_stats(),
+        'models': {
+            'loaded': registry.loaded(),
+            'memory_bytes': registry.memory_bytes(),
+            **registry.stats
+        },
+        'token_cache': {'hits': token_cache.hits, 'misses': token_cache.misses, 'size': token_cache.currsize},
+        'startup': STARTUP.get_stats(),
+        'flask_prefix': APP_PREFIX if FLASK_MOUNTED else None
+    }
+
+# --- Executor CLI ---
+
+def main():
+    """
+    Inicia o serviço unificado.
+    """
+    parser = argparse.ArgumentParser(description='Serviço Unificado ACC (v1.1.0)')
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f'Porta (Padrão: {DEFAULT_PORT}, ou ACC_PORT).')
+    args = parser.parse_args()
+
+    import uvicorn
+
+    print(f"\n{'='*70}")
+    print("🚀 Iniciando Serviço Unificado - ACC (v1.1.0)")
+    print(f"   Alinhamento: http://{args.host}:{args.port}/api/v1/analyze-alignment")
+    print(f"   Templates:   http://{args.host}:{args.port}/api/v1/generate-template")
+    if FLASK_MOUNTED:
+        print(f"   App (Flask): http://{args.host}:{args.port}{APP_PREFIX}/")
+    print(f"   Docs (Swagger): http://{args.host}:{args.port}/docs")
+    print(f"{'='*70}\n")
+
+    uvicorn.run(app, host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
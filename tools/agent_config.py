@@ -0,0 +1,42 @@
+# tools/agent_config.py
+# v1.1.0 - Configuração do Agente (Modelo de Dados das 4 Camadas)
+#
+# OBJETIVO:
+# 'AgentConfigV1_1' e 'BaseshotExample' sem dependências: o parser
+# ('template_parser.py') e o índice ('template_index.py') os importam sem
+# carregar o FastAPI do 'template_generator.py' (que os re-exporta).
+
+from dataclasses import dataclass
+from typing import List
+
+@dataclass
+class BaseshotExample:
+    """Define um único exemplo de Baseshot"""
+    type: str  # 'positive' (✅), 'negative' (❌), 'edge' (⚠️)
+    input: str
+    output: str
+
+@dataclass
+class AgentConfigV1_1:
+    """Configuração completa do agente v1.1.0"""
+    name: str                   # Camada 1: Identidade
+    domain: str                 # Camada 1: Domínio
+    mission: str                # Camada 2: Missão
+    protocol_items: List[str]   # Camada 3: Protocolo
+    baseshot_examples: List[BaseshotExample] # Camada 4: Baseshot
+    sd_score: float = 0.0       # Metadado
+    
+    # Validação Pós-Inicialização
+    def __post_init__(self):
+        if not self.name or len(self.name.strip()) < 2:
+            raise ValueError("Identidade (Nome) é obrigatória (mín. 2 caracteres)")
+        if not self.domain or len(self.domain.strip()) < 10:
+            raise ValueError("Domínio é obrigatório (mín. 10 caracteres)")
+        if not self.mission or len(self.mission.strip()) < 20:
+            raise ValueError("Missão é obrigatória (mín. 20 caracteres)")
+        if len(self.protocol_items) < 3:
+            raise ValueError("Protocolo (Camada 3) requer no mínimo 3 itens.")
+        if len(self.baseshot_examples) < 5:
+            raise ValueError("Baseshot (Camada 4) requer no mínimo 5 exemplos.")
+        if not any(ex.type == 'negative' for ex in self.baseshot_examples):
+            raise ValueError("Baseshot (Camada 4) requer pelo menos um 'negative' (❌) 'Erro Comum'.")
@@ -8,22 +8,36 @@
 # 2. (LÓGICA) 'generate_recommendations' agora avalia AMBAS as métricas.
 # 3. (CORE) Este script é a "fonte da verdade" que 'api-endpoint.py' e 
 #    'strategy_generator.py' irão importar.
+# 4. (LAZY) O modelo NÃO é carregado no import: importar só a extração de
+#    keywords (ex: 'strategy_generator.py') não paga o torch nem o modelo.
+# 5. (SUGESTÕES) Se houver um índice de vocabulário ('vocab_index.py build'),
+#    as recomendações incluem nomes sugeridos para o domínio.
 
-from sentence_transformers import SentenceTransformer, util
-from typing import List, Dict, Tuple, Set
+from typing import List, Dict, Optional, Tuple, Set
 import re
 import sys
 from collections import Counter
 
+import model_registry
+from embedding_cache import cosine_matrix
+from metrics import KEYWORD_SECONDS
+from vocab_index import suggest_names
+
 # --- Constantes Globais do Framework ---
 
-# Modelo global (carregado uma vez)
-try:
-    MODEL = SentenceTransformer('all-MiniLM-L6-v2')
-except Exception as e:
-    print(f"ERRO: Falha ao carregar modelo 'all-MiniLM-L6-v2'.", file=sys.stderr)
-    print("Execute: pip install sentence-transformers", file=sys.stderr)
-    sys.exit(1)
+# Modelo global (carregado sob demanda, uma vez, pelo model_registry)
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+def get_model():
+    """Retorna o modelo do visualizador (carregado na primeira chamada)."""
+    return model_registry.get_model(MODEL_NAME)
+
+def __getattr__(name: str):
+    # Compatibilidade: 'from alignment_visualizer import MODEL' continua
+    # funcionando, mas agora dispara a carga apenas quando acessado.
+    if name == 'MODEL':
+        return get_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Stopwords PT-BR (método "canivete")
 STOPWORDS: Set[str] = {
@@ -65,6 +79,7 @@ def classify_word_type(word: str) -> str:
     else:
         return 'domain' # SINAL (neutro)
 
+@KEYWORD_SECONDS.time()
 def extract_domain_keywords(domain: str, top_n: int = 8) -> List[Dict[str, any]]:
     """
     Extrai palavras-chave "SINAL" do domínio com metadata.
@@ -106,23 +121,17 @@ def extract_domain_keywords(domain: str, top_n: int = 8) -> List[Dict[str, any]]
 # --- Parte B: Lógica de Análise (O "Coração") ---
 # (Esta lógica será importada pelo 'api-endpoint.py')
 
-def calculate_alignment_per_keyword(
-    agent_name: str, 
-    domain_keywords: List[Dict[str, any]]
+def _score_keywords(
+    domain_keywords: List[Dict[str, any]],
+    similarities: List[float]
 ) -> List[Dict[str, any]]:
     """
-    Calcula alinhamento (cosine similarity) entre nome e CADA keyword "SINAL".
+    Monta o diagnóstico por keyword a partir das similaridades já calculadas
+    (uma por keyword, na mesma ordem de 'domain_keywords').
     """
-    name_embedding = MODEL.encode(agent_name, convert_to_tensor=True)
-    
     results = []
     
-    for keyword_data in domain_keywords:
-        keyword = keyword_data['word']
-        keyword_embedding = MODEL.encode(keyword, convert_to_tensor=True)
-        
-        similarity = util.cos_sim(name_embedding, keyword_embedding)[0][0].item()
-        
+    for keyword_data, similarity in zip(domain_keywords, similarities):
         result = keyword_data.copy()
         result['alignment'] = round(similarity, 3)
         
@@ -135,16 +144,40 @@ def calculate_alignment_per_keyword(
     
     return results
 
+def calculate_alignment_per_keyword(
+    agent_name: str, 
+    domain_keywords: List[Dict[str, any]]
+) -> List[Dict[str, any]]:
+    """
+    Calcula alinhamento (cosine similarity) entre nome e CADA keyword "SINAL".
+    
+    Nome e keywords são codificados em UM único 'encode' (batch) e as
+    similaridades saem de um único produto matricial.
+    """
+    if not domain_keywords:
+        return []
+    
+    texts = [agent_name] + [k['word'] for k in domain_keywords]
+    embeddings = model_registry.encode(MODEL_NAME, texts)
+    
+    similarities = cosine_matrix(embeddings[0:1], embeddings[1:])[0].tolist()
+    
+    return _score_keywords(domain_keywords, similarities)
+
 def generate_recommendations(
     agent_name: str, 
     aligned_keywords: List[Dict], 
     semantic_density: float,
-    word_count: int
+    word_count: int,
+    suggested_names: Optional[List[str]] = None
 ) -> List[str]:
     """
     [FÍSICA v1.1.0] Gera recomendações baseadas nas duas métricas do ACC:
     1. Densidade Semântica (SD)
     2. Minimalismo (Word Count)
+    
+    'suggested_names' (opcional) vem do índice de vocabulário ('vocab_index.py')
+    e é exibido quando a SD não passa.
     """
     recs = []
     
@@ -161,6 +194,10 @@ def generate_recommendations(
         if agent_name.lower() in generic_names:
             recs.append(f"   Sugestão: Substitua '{agent_name}' por termo técnico (ex: 'auditor', 'scanner', 'hacker').")
 
+    if suggested_names and semantic_density < THRESHOLD_SD_PASS:
+        names = ", ".join(f"'{name}'" for name in suggested_names)
+        recs.append(f"   Sugestões (índice de vocabulário): {names}")
+
     # --- Teste 2: Minimalismo ---
     if word_count <= THRESHOLD_MINIMALISM_PASS:
         recs.append(f"✅ (Minimalismo) APROVADO (Palavras: {word_count} <= {THRESHOLD_MINIMALISM_PASS}).")
@@ -170,17 +207,36 @@ def generate_recommendations(
     
     return recs
 
-def generate_alignment_report(agent_name: str, domain: str) -> Dict[str, any]:
+def collect_report_texts(agent_name: str, domain: str, top_n: int = 8) -> Tuple[List[str], List[Dict[str, any]]]:
     """
-    [FÍSICA v1.1.0] Gera relatório completo de alinhamento.
-    Esta é a função "core" importada pela API e outros scripts.
+    Reúne TODOS os textos que o relatório precisa codificar, na ordem
+    [nome, domínio, keyword_1, ..., keyword_n].
+    
+    Retorna (texts, domain_keywords). Quem chama faz UM único 'encode' de
+    'texts' e repassa as embeddings para 'build_report_from_embeddings'.
+    """
+    domain_keywords = extract_domain_keywords(domain, top_n=top_n)
+    texts = [agent_name, domain] + [k['word'] for k in domain_keywords]
+    return texts, domain_keywords
+
+def build_report_from_embeddings(
+    agent_name: str,
+    domain: str,
+    domain_keywords: List[Dict[str, any]],
+    embeddings
+) -> Dict[str, any]:
+    """
+    [FÍSICA v1.1.0] Monta o relatório a partir das embeddings já calculadas
+    (linhas alinhadas com 'collect_report_texts').
+    
+    A SD do domínio inteiro e o cosseno de cada keyword saem de um único
+    produto matricial: nome (1 x d) contra [domínio + keywords] (n x d).
     """
     
     # --- Cálculo da Física v1.1.0 ---
-    name_embed = MODEL.encode(agent_name, convert_to_tensor=True)
-    domain_embed = MODEL.encode(domain, convert_to_tensor=True)
+    similarities = cosine_matrix(embeddings[0:1], embeddings[1:])[0].tolist()
     
-    cosine_sim = util.cos_sim(name_embed, domain_embed)[0][0].item()
+    cosine_sim = similarities[0]
     word_count = max(len(agent_name.split()), 1)
     
     # A FÍSICA:
@@ -190,8 +246,7 @@ def generate_alignment_report(agent_name: str, domain: str) -> Dict[str, any]:
     minimalism_score = word_count
     
     # --- Análise de Keywords (Diagnóstico) ---
-    domain_keywords = extract_domain_keywords(domain, top_n=8)
-    aligned_keywords = calculate_alignment_per_keyword(agent_name, domain_keywords)
+    aligned_keywords = _score_keywords(domain_keywords, similarities[1:])
     
     # Identificar top contributors (alta afinidade com o *Nome*)
     top_contributors = [
@@ -205,12 +260,19 @@ def generate_alignment_report(agent_name: str, domain: str) -> Dict[str, any]:
         if k['alignment'] < 0.30
     ]
     
+    # Sugestões do índice de vocabulário (se construído), reusando a
+    # embedding do domínio já calculada: nenhum encode extra.
+    suggested_names = []
+    if semantic_density < THRESHOLD_SD_PASS:
+        suggested_names = [name for name, _ in suggest_names(MODEL_NAME, domain, k=3, domain_embedding=embeddings[1])]
+    
     # Gerar recomendações com base na FÍSICA
     recommendations = generate_recommendations(
         agent_name, 
         aligned_keywords, 
         semantic_density,  # Passa a SD v1.1.0
-        minimalism_score   # Passa o Minimalismo v1.1.0
+        minimalism_score,  # Passa o Minimalismo v1.1.0
+        suggested_names
     )
     
     return {
@@ -224,6 +286,19 @@ def generate_alignment_report(agent_name: str, domain: str) -> Dict[str, any]:
         'recommendations': recommendations
     }
 
+def generate_alignment_report(agent_name: str, domain: str) -> Dict[str, any]:
+    """
+    [FÍSICA v1.1.0] Gera relatório completo de alinhamento.
+    Esta é a função "core" importada pela API e outros scripts.
+    
+    Nome, domínio e keywords são codificados em UM único forward pass (batch);
+    textos já vistos são servidos pelo cache de embeddings.
+    """
+    texts, domain_keywords = collect_report_texts(agent_name, domain)
+    embeddings = model_registry.encode(MODEL_NAME, texts)
+    
+    return build_report_from_embeddings(agent_name, domain, domain_keywords, embeddings)
+
 # --- Parte C: Executor CLI (O "Visualizador") ---
 # (Este bloco é executado quando o script é chamado diretamente)
 
@@ -244,7 +319,12 @@ def run_cli_visualizer():
     print(f"🔍 ANÁLISE DE ALINHAMENTO SEMÂNTICO (ACC v1.1.0)")
     print(f"{'='*70}\n")
     
-    report = generate_alignment_report(name, domain)
+    try:
+        report = generate_alignment_report(name, domain)
+    except RuntimeError as e:
+        print(f"ERRO: {e}", file=sys.stderr)
+        print("Execute: pip install sentence-transformers", file=sys.stderr)
+        sys.exit(1)
     
     print(f"Agente: {report['agent_name']}")
     print(f"Domínio: {report['domain'][:60]}...")
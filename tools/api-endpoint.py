@@ -4,21 +4,62 @@
 # MUDANÇAS v1.1.0:
 # 1. (COESÃO) Importa a lógica 'core' unificada do alignment_visualizer.py.
 # 2. (FÍSICA) Expõe a "Física v1.1.0" (SD + Minimalismo) como um endpoint JSON.
+# 3. (VAZÃO) Requisições concorrentes são agrupadas (micro-batching) em um
+#    único encode. Janela e tamanho: ACC_BATCH_WINDOW_MS e ACC_BATCH_MAX_SIZE;
+#    encodes simultâneos: ACC_BATCH_MAX_CONCURRENT.
+# 4. (LATÊNCIA) O encode roda em um pool limitado (fora do event loop) e o
+#    excesso de carga recebe 503 + Retry-After (ver 'serving.py').
+# 5. (LOTE) '/api/v1/analyze-alignment/batch' recebe listas ou NDJSON e
+#    responde em NDJSON (streaming), com memória limitada.
+# 6. (STARTUP) Nada pesado no import (torch e modelo são sob demanda);
+#    '/healthz' e '/readyz' para o orquestrador; o modelo carrega em
+#    background depois do startup (ACC_PREWARM=0 desliga).
+# 7. (MÉTRICAS) GET /metrics no formato Prometheus (ver 'metrics.py').
 
-import uvicorn
-from fastapi import FastAPI
-from pydantic import BaseModel
+import asyncio
+import json
+import os
+import tempfile
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
 import sys
 
 # --- Importação Cirúrgica ---
-# Importa a função "coração" do framework.
+# Importa a lógica "coração" do framework, em duas etapas (textos -> relatório),
+# para que o encode possa ser agrupado entre requisições.
 try:
-    from alignment_visualizer import generate_alignment_report
+    from alignment_visualizer import MODEL_NAME, collect_report_texts, build_report_from_embeddings
 except ImportError:
-    print("Erro: Falha ao importar 'generate_alignment_report'.", file=sys.stderr)
+    print("Erro: Falha ao importar a lógica de 'alignment_visualizer'.", file=sys.stderr)
     print("Certifique-se que 'alignment_visualizer.py' está no mesmo diretório.", file=sys.stderr)
     sys.exit(1)
 
+import model_registry
+from batching import MicroBatcher
+from metrics import REGISTRY, install_metrics
+from serving import get_worker_pool, install_admission_control, install_health_probes, run_in_pool
+
+# --- Micro-Batching ---
+
+BATCHER = MicroBatcher(
+    encode_fn=lambda texts: model_registry.encode(MODEL_NAME, texts),
+    max_wait_ms=float(os.getenv("ACC_BATCH_WINDOW_MS", "5")),
+    max_batch_size=int(os.getenv("ACC_BATCH_MAX_SIZE", "64")),
+    executor=get_worker_pool(),
+    max_concurrent_batches=int(os.getenv("ACC_BATCH_MAX_CONCURRENT", "2"))
+)
+
+# Itens do lote em andamento ao mesmo tempo (limita a memória do streaming)
+BATCH_STREAM_WINDOW = int(os.getenv("ACC_BATCH_STREAM_WINDOW", "64"))
+# Corpo NDJSON acima deste tamanho vai para disco (não para a RAM)
+BATCH_SPOOL_MAX_BYTES = int(os.getenv("ACC_BATCH_SPOOL_MAX_BYTES", str(4 * 1024 * 1024)))
+# I/O do spool em blocos deste tamanho, numa thread (nunca no event loop)
+BATCH_SPOOL_IO_BYTES = 64 * 1024
+
 # --- Definição da API ---
 
 app = FastAPI(
@@ -27,6 +68,12 @@ app = FastAPI(
     version="1.1.0"
 )
 
+ADMISSION = install_admission_control(app)
+STARTUP = install_health_probes(app, warmup=lambda: model_registry.get_registry().warmup([MODEL_NAME]))
+install_metrics(app)
+REGISTRY.callback("acc_batcher_queue_depth", "Requisições aguardando o próximo batch de encode.",
+                  "gauge", [], lambda: {(): BATCHER.get_stats()['queue_depth']})
+
 class AlignmentRequest(BaseModel):
     """
     Define o corpo da requisição para a análise.
@@ -53,6 +100,16 @@ class AlignmentResponse(BaseModel):
     recommendations: list[str]
     # Você pode adicionar os outros campos (keywords_analysis, etc.) se necessário
 
+async def _analyze(agent_name: str, domain: str) -> Dict[str, Any]:
+    """
+    Relatório de alinhamento de um par (nome, domínio). O encode é
+    agrupado com as requisições concorrentes pelo BATCHER.
+    """
+    texts, domain_keywords = collect_report_texts(agent_name, domain)
+    embeddings = await BATCHER.encode(texts)
+    # O relatório inclui o beam search do índice de vocabulário (CPU): fora do event loop
+    return await run_in_pool(build_report_from_embeddings, agent_name, domain, domain_keywords, embeddings)
+
 @app.post("/api/v1/analyze-alignment", response_model=AlignmentResponse)
 async def analyze_alignment(request: AlignmentRequest):
     """
@@ -63,20 +120,153 @@ async def analyze_alignment(request: AlignmentRequest):
     """
     
     # Chama a lógica "core" unificada
-    report = generate_alignment_report(
-        request.agent_name, 
-        request.domain
-    )
+    report = await _analyze(request.agent_name, request.domain)
     
     # Retorna o relatório completo. O FastAPI o serializará para JSON.
     return report
 
+# --- Análise em Lote (NDJSON) ---
+
+async def _load_json_items(request: Request) -> List[Any]:
+    """Itens de um corpo JSON (lista de AlignmentRequest). 400 se inválido."""
+    try:
+        items = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Corpo JSON inválido.")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="O corpo deve ser uma lista de {agent_name, domain}.")
+    return items
+
+async def _iter_list(items: List[Any]) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+async def _spool_body(request: Request) -> tempfile.SpooledTemporaryFile:
+    """
+    Recebe o corpo em streaming para um arquivo temporário "spooled" (RAM
+    até BATCH_SPOOL_MAX_BYTES, disco acima disso). O Starlette não permite
+    ler o corpo enquanto a resposta já está em streaming. As escritas
+    (em disco, acima do limite) vão para o threadpool em blocos.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=BATCH_SPOOL_MAX_BYTES)
+    buffer = bytearray()
+    try:
+        async for chunk in request.stream():
+            buffer += chunk
+            if len(buffer) >= BATCH_SPOOL_IO_BYTES:
+                await run_in_threadpool(spool.write, bytes(buffer))
+                buffer.clear()
+        await run_in_threadpool(spool.write, bytes(buffer))
+        await run_in_threadpool(spool.seek, 0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool
+
+async def _iter_ndjson_items(spool: tempfile.SpooledTemporaryFile) -> AsyncIterator[Any]:
+    """
+    Itens de um corpo NDJSON (um JSON por linha). O spool é lido no
+    threadpool, um bloco de linhas (~BATCH_SPOOL_IO_BYTES) por vez: a
+    leitura do disco não bloqueia o event loop.
+    """
+    try:
+        while True:
+            lines = await run_in_threadpool(spool.readlines, BATCH_SPOOL_IO_BYTES)
+            if not lines:
+                break
+            for line in lines:
+                if line.strip():
+                    yield _parse_ndjson_line(line)
+    finally:
+        await run_in_threadpool(spool.close)
+
+def _parse_ndjson_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"Linha NDJSON inválida: {e}")
+
+async def _analyze_item(item: Any) -> Dict[str, Any]:
+    """
+    Valida e analisa um item do lote. Erros (item inválido, falha de encode
+    ou do modelo) viram uma linha {'error': ...}: o status 200 já foi
+    enviado, então uma exceção cortaria o stream no meio.
+    """
+    if isinstance(item, Exception):
+        return {'error': str(item)}
+    try:
+        request = AlignmentRequest.model_validate(item)
+    except ValidationError as e:
+        return {'error': f"Item inválido: {e.errors()}"}
+    try:
+        report = await _analyze(request.agent_name, request.domain)
+        return AlignmentResponse(**report).model_dump()
+    except Exception as e:
+        print(f"Erro na análise em lote ({request.agent_name!r}): {e}", file=sys.stderr)
+        return {'error': f"Falha na análise: {e}"}
+
+async def _stream_reports(items: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+    """
+    Emite uma linha NDJSON por item, na ordem de entrada, assim que o item
+    (e os anteriores) estiverem prontos. No máximo BATCH_STREAM_WINDOW itens
+    ficam em andamento: a memória não cresce com o tamanho do lote.
+    """
+    pending: Deque[asyncio.Future] = deque()
+    try:
+        async for item in items:
+            pending.append(asyncio.ensure_future(_analyze_item(item)))
+            while pending and (pending[0].done() or len(pending) >= BATCH_STREAM_WINDOW):
+                yield _ndjson_line(await pending.popleft())
+        while pending:
+            yield _ndjson_line(await pending.popleft())
+    finally:
+        # Cliente desconectou (o stream foi cancelado): nada de encode órfão
+        for future in pending:
+            future.cancel()
+        await items.aclose()
+
+def _ndjson_line(result: Dict[str, Any]) -> bytes:
+    return (json.dumps(result, ensure_ascii=False) + "\n").encode('utf-8')
+
+@app.post("/api/v1/analyze-alignment/batch")
+async def analyze_alignment_batch(request: Request):
+    """
+    Análise em lote.
+    
+    Aceita uma lista JSON de {agent_name, domain} ou um corpo NDJSON
+    (Content-Type: application/x-ndjson), recomendado para lotes grandes.
+    A lista JSON é validada e carregada INTEIRA na memória antes da
+    resposta; o NDJSON vai para um arquivo temporário (disco acima de
+    ACC_BATCH_SPOOL_MAX_BYTES) e é lido linha a linha.
+    Responde em NDJSON: um AlignmentResponse por linha, na ordem de entrada.
+    Domínios repetidos no lote reaproveitam as mesmas embeddings (cache +
+    deduplicação do micro-batching).
+    """
+    content_type = request.headers.get('content-type', '')
+    if 'ndjson' in content_type or 'jsonl' in content_type:
+        items = _iter_ndjson_items(await _spool_body(request))
+    else:
+        # O corpo é validado antes de iniciar a resposta (400 em vez de stream vazio)
+        items = _iter_list(await _load_json_items(request))
+    
+    return StreamingResponse(_stream_reports(items), media_type="application/x-ndjson")
+
+@app.get("/api/v1/batching/stats")
+async def batching_stats():
+    """
+    Métricas do micro-batching (profundidade da fila, tamanho dos batches),
+    para calibrar vazão vs. latência de cauda.
+    """
+    return {**BATCHER.get_stats(), 'admission': ADMISSION.get_stats()}
+
 # --- Executor (para rodar o servidor) ---
 
 def main():
     """
     Inicia o servidor da API.
     """
+    import uvicorn
+    
     print(f"\n{'='*70}")
     print(f"🚀 Iniciando Servidor da API - ACC (v1.1.0)")
     print(f"   Endpoint: http://127.0.0.1:8000/api/v1/analyze-alignment")
@@ -0,0 +1,181 @@
+# tools/batching.py
+# v1.1.0 - Micro-Batching (Coalescência de Requisições)
+#
+# OBJETIVO:
+# Sob carga concorrente, juntar os textos de várias requisições em UM
+# único 'encode' (batch grande) em vez de muitos 'encode' pequenos.
+#
+# FUNCIONAMENTO:
+# 1. Cada requisição chama 'await batcher.encode(texts)'.
+# 2. O coletor espera até 'max_wait_ms' (ex: 5 ms) ou até 'max_batch_size'
+#    textos, o que vier primeiro.
+# 3. Um único encode roda fora do event loop (executor) e as embeddings
+#    são devolvidas para cada requisição em espera.
+# 4. Até 'max_concurrent_batches' encodes rodam ao mesmo tempo: enquanto um
+#    batch é codificado, o coletor já forma o próximo.
+
+import asyncio
+import time
+from functools import partial
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Faixas do histograma de tamanho de batch (em número de textos)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+class MicroBatcher:
+    """
+    Coalescedor assíncrono de chamadas de encode.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_wait_ms: float = 5.0,
+        max_batch_size: int = 64,
+        executor: Optional[Executor] = None,
+        max_concurrent_batches: int = 2
+    ):
+        self.encode_fn = encode_fn
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.executor = executor
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._batches: Set[asyncio.Task] = set()
+        self.stats = {
+            'requests': 0,
+            'batches': 0,
+            'texts': 0,
+            'unique_texts': 0,
+            'max_queue_depth': 0,
+            'queue_wait_seconds': 0.0,
+            'encode_seconds': 0.0,
+            'batch_size_histogram': {bucket: 0 for bucket in BATCH_SIZE_BUCKETS + ('+Inf',)}
+        }
+
+    async def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embeddings (n x d) de 'texts', calculadas junto com os textos das
+        demais requisições que chegarem na mesma janela.
+        """
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done():
+            self._fail_abandoned()
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+            self._worker = loop.create_task(self._collect())
+
+        future = loop.create_future()
+        self._queue.put_nowait((list(texts), future, time.perf_counter()))
+        self.stats['requests'] += 1
+        self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], self._queue.qsize())
+        return await future
+
+    async def _collect(self) -> None:
+        """Laço do coletor: forma batches por janela de tempo ou por tamanho."""
+        loop = asyncio.get_running_loop()
+        queue, slots = self._queue, self._slots
+        while True:
+            batch = [await queue.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            # Espera uma vaga (no máximo 'max_concurrent_batches' encodes ao
+            # mesmo tempo); o encode roda em uma task e o coletor volta a
+            # acumular o próximo batch.
+            await slots.acquire()
+            task = loop.create_task(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(partial(self._batch_done, slots))
+
+    def _batch_done(self, slots: asyncio.Semaphore, task: asyncio.Task) -> None:
+        self._batches.discard(task)
+        slots.release()
+
+    def _fail_abandoned(self) -> None:
+        """
+        O coletor anterior morreu (ou era de outro event loop): as requisições
+        que ficaram na fila dele recebem o erro em vez de esperar para sempre.
+        """
+        if self._queue is None:
+            return
+        cause = None
+        if self._worker is not None and self._worker.done() and not self._worker.cancelled():
+            cause = self._worker.exception()
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if future.done():
+                continue
+            error = RuntimeError(f"Coletor do micro-batching encerrado: {cause or 'cancelado'}")
+            try:
+                future.set_exception(error)
+            except RuntimeError:
+                pass  # o loop dessa future já foi fechado
+
+    async def _run_batch(self, batch: List[Tuple[List[str], asyncio.Future, float]]) -> None:
+        """Um único encode para o batch (sem duplicatas) e fan-out dos resultados."""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+
+        try:
+            unique: Dict[str, int] = {}
+            for texts, _, _ in batch:
+                for text in texts:
+                    unique.setdefault(text, len(unique))
+            embeddings = await loop.run_in_executor(self.executor, self.encode_fn, list(unique.keys()))
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        finished = time.perf_counter()
+        total = sum(len(texts) for texts, _, _ in batch)
+        self._record(total, len(unique), sum(started - queued for _, _, queued in batch), finished - started)
+
+        for texts, future, _ in batch:
+            if not future.done():
+                future.set_result(embeddings[[unique[text] for text in texts]])
+
+    def _record(self, texts: int, unique_texts: int, queue_wait: float, encode_time: float) -> None:
+        self.stats['batches'] += 1
+        self.stats['texts'] += texts
+        self.stats['unique_texts'] += unique_texts
+        self.stats['queue_wait_seconds'] += queue_wait
+        self.stats['encode_seconds'] += encode_time
+        bucket = next((b for b in BATCH_SIZE_BUCKETS if unique_texts <= b), '+Inf')
+        self.stats['batch_size_histogram'][bucket] += 1
+
+    def queue_depth(self) -> int:
+        """Requisições aguardando o próximo batch."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def get_stats(self) -> Dict:
+        """Métricas para calibrar vazão vs. latência de cauda."""
+        batches = self.stats['batches']
+        return {
+            **self.stats,
+            'queue_depth': self.queue_depth(),
+            'avg_batch_size': round(self.stats['unique_texts'] / batches, 2) if batches else 0.0,
+            'avg_requests_per_batch': round(self.stats['requests'] / batches, 2) if batches else 0.0,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'max_batch_size': self.max_batch_size,
+            'batches_in_flight': len(self._batches),
+            'max_concurrent_batches': self.max_concurrent_batches
+        }
@@ -0,0 +1,448 @@
+# tools/benchmark_suite.py
+# v1.1.0 - Suíte de Benchmarks (Caminhos Quentes)
+#
+# OBJETIVO:
+# Medir latência (p50/p90/p99), vazão e pico de RSS dos caminhos quentes do
+# ACC e comparar com um baseline salvo, acusando regressões.
+#
+# OFFLINE:
+# Por padrão, um modelo de embedding LOCAL e determinístico (hash de
+# palavras e trigramas) é registrado no 'model_registry' no lugar dos
+# modelos reais, e um tokenizer de palavras no lugar do tiktoken (que
+# baixa os encodings na primeira execução): nenhum download, nenhuma rede.
+# '--real-models' usa os modelos e o tiktoken reais. Os endpoints FastAPI são
+# chamados em processo (httpx.ASGITransport). Só benchmarks cuja dependência
+# OPCIONAL não está instalada (ImportError) são pulados; qualquer outro erro
+# (ex: endpoint com HTTP >= 400) é uma FALHA e a suíte sai com 1.
+#
+# USO (CLI):
+# $ python tools/benchmark_suite.py --save-baseline
+# $ python tools/benchmark_suite.py -o bench.json --threshold 0.20
+#
+# (Não é coletado pelo pytest: é um executável, não um teste.)
+
+import os
+
+# Sem cache em disco: cada execução mede o mesmo trabalho (e os benchmarks
+# "cold" podem limpar o cache sem tocar no cache real do usuário)
+os.environ["ACC_CACHE_DIR"] = ""
+# Mede o processo local, nunca um daemon de scoring (scoring_daemon.py)
+os.environ["ACC_SCORING_DAEMON"] = "0"
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import io
+import json
+import platform
+import re
+import resource
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from tool_loader import load_tool
+
+TOOLS_DIR = Path(__file__).resolve().parent
+REPO_DIR = TOOLS_DIR.parent
+DEFAULT_BASELINE = str(REPO_DIR / "tests" / "benchmark-baseline.json")
+DEFAULT_THRESHOLD = 0.20  # +20% na p50 (ou -20% na vazão) = regressão
+
+# Casos de referência (espelham os exemplos do README e dos templates)
+BENCH_NAME = "Hacker Semântico"
+BENCH_DOMAIN = "análise forense de APIs e ofertas de tecnologia, auditoria de segurança e arquitetura de sistemas"
+BENCH_TEMPLATE = REPO_DIR / "templates" / "hacker-semantico.md"
+
+# --- Modelo Local (Stand-in) ---
+
+class HashEmbeddingModel:
+    """
+    Modelo de embedding determinístico e offline: soma de vetores
+    pseudo-aleatórios (semente = hash) de palavras e trigramas de
+    caracteres, normalizada. Textos parecidos ficam próximos, como num
+    modelo real, com custo proporcional ao tamanho do texto.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self._vectors: Dict[str, np.ndarray] = {}
+
+    def _feature(self, feature: str) -> np.ndarray:
+        vector = self._vectors.get(feature)
+        if vector is None:
+            seed = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+            vector = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+            self._vectors[feature] = vector
+        return vector
+
+    def encode(self, texts, batch_size: int = 32, convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        single = isinstance(texts, str)
+        embeddings = np.zeros((1 if single else len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate([texts] if single else texts):
+            for word in re.findall(r'\w+', text.lower()):
+                embeddings[row] += self._feature(word)
+                padded = f" {word} "
+                for i in range(len(padded) - 2):
+                    embeddings[row] += 0.5 * self._feature(padded[i:i + 3])
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings /= np.clip(norms, 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+    def memory_bytes(self) -> int:
+        return sum(v.nbytes for v in self._vectors.values())
+
+class WordTokenizer:
+    """
+    Tokenizer determinístico (palavras, pontuação e espaços) no lugar do
+    tiktoken, com a interface usada pelas ferramentas (encode/decode e o
+    'encode_batch' do token-counter).
+    """
+
+    _TOKEN = re.compile(r'\w+|\s+|[^\w\s]')
+
+    def __init__(self):
+        self.vocab: Dict[str, int] = {}
+        self.pieces: List[str] = []
+
+    def encode(self, text: str) -> List[int]:
+        ids = []
+        for piece in self._TOKEN.findall(text):
+            if piece not in self.vocab:
+                self.vocab[piece] = len(self.pieces)
+                self.pieces.append(piece)
+            ids.append(self.vocab[piece])
+        return ids
+
+    def encode_batch(self, texts: List[str], num_threads: int = 1) -> List[List[int]]:
+        return [self.encode(text) for text in texts]
+
+    def decode(self, ids: List[int]) -> str:
+        return "".join(self.pieces[i] for i in ids)
+
+def register_stand_in_tokenizer() -> None:
+    """Troca o tiktoken pelo 'WordTokenizer' no 'template_generator' e no 'token-counter'."""
+    import template_generator
+    tokenizer = WordTokenizer()
+    template_generator.get_tokenizer = lambda: tokenizer
+    template_generator._tokens.cache_clear()
+    try:
+        token_counter = load_tool('token-counter.py')
+    except ImportError:
+        return  # tiktoken não instalado: o benchmark 'token_count' é pulado
+    token_counter.get_encoding = lambda: tokenizer
+
+def register_stand_in_models() -> None:
+    """Registra o modelo local sob o nome de todos os modelos do ACC."""
+    import model_registry
+    from validation_core import EMBEDDING_MODELS
+    model = HashEmbeddingModel()
+    for model_name in set(EMBEDDING_MODELS.values()) | {'all-MiniLM-L6-v2'}:
+        model_registry.get_registry().register(model_name, model)
+
+# --- Medição ---
+
+def _peak_rss_mb() -> float:
+    """Pico de RSS do processo (ru_maxrss: KB no Linux, bytes no macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 2)
+
+def _summarize(latencies: List[float], wall_s: float, operations: int) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+
+    def percentile(p: float) -> float:
+        index = min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))
+        return round(ordered[index] * 1000, 4)
+
+    return {
+        'iterations': len(latencies),
+        'p50_ms': percentile(50),
+        'p90_ms': percentile(90),
+        'p99_ms': percentile(99),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 4),
+        'throughput_ops_s': round(operations / wall_s, 2) if wall_s > 0 else 0.0,
+        'peak_rss_mb': _peak_rss_mb()
+    }
+
+def run_sync(fn: Callable[[], Any], iterations: int, warmup: int) -> Dict[str, Any]:
+    """Latência de 'fn()' (saída do stdout descartada: os scripts imprimem banners)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            fn()
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            fn()
+            latencies.append(time.perf_counter() - t0)
+        wall = time.perf_counter() - started
+    return _summarize(latencies, wall, iterations)
+
+def run_http(app: Any, method: str, path: str, payload: Any, iterations: int, warmup: int,
+             concurrency: int = 8) -> Dict[str, Any]:
+    """Latência por requisição e vazão de um endpoint, com 'concurrency' clientes em paralelo."""
+    import httpx
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def call() -> float:
+                t0 = time.perf_counter()
+                response = await client.request(method, path, json=payload)
+                await response.aread()
+                if response.status_code >= 400:
+                    raise RuntimeError(f"{method} {path}: HTTP {response.status_code} {response.text[:200]}")
+                return time.perf_counter() - t0
+
+            for _ in range(warmup):
+                await call()
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def bounded() -> float:
+                async with semaphore:
+                    return await call()
+
+            started = time.perf_counter()
+            latencies = await asyncio.gather(*(bounded() for _ in range(iterations)))
+            return list(latencies), time.perf_counter() - started
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        latencies, wall = asyncio.run(scenario())
+    result = _summarize(latencies, wall, iterations)
+    result['concurrency'] = concurrency
+    return result
+
+# --- Benchmarks ---
+
+def _template_config():
+    from template_parser import parse_file
+    return parse_file(BENCH_TEMPLATE)
+
+def _template_payload() -> Dict[str, Any]:
+    from dataclasses import asdict
+    return asdict(_template_config())
+
+def build_benchmarks(iterations: int) -> Dict[str, Callable[[], Dict[str, Any]]]:
+    """Nome -> função que roda o benchmark e devolve as métricas."""
+    http_iterations = max(iterations // 2, 10)
+    warmup = max(iterations // 20, 2)
+
+    def alignment():
+        import alignment_visualizer
+        return alignment_visualizer
+
+    def bench_extract_keywords():
+        av = alignment()
+        return run_sync(lambda: av.extract_domain_keywords(BENCH_DOMAIN), iterations, warmup)
+
+    def bench_alignment_per_keyword():
+        av = alignment()
+        keywords = av.extract_domain_keywords(BENCH_DOMAIN)
+        return run_sync(lambda: av.calculate_alignment_per_keyword(BENCH_NAME, keywords), iterations, warmup)
+
+    def bench_alignment_report():
+        av = alignment()
+        return run_sync(lambda: av.generate_alignment_report(BENCH_NAME, BENCH_DOMAIN), iterations, warmup)
+
+    def bench_alignment_report_cold():
+        from embedding_cache import get_cache
+        av = alignment()
+
+        def cold():
+            get_cache().invalidate()
+            av.generate_alignment_report(BENCH_NAME, BENCH_DOMAIN)
+        return run_sync(cold, iterations, warmup)
+
+    def bench_run_validation():
+        import validation_core
+        return run_sync(lambda: validation_core.run_validation(BENCH_NAME, BENCH_DOMAIN), iterations, warmup)
+
+    def bench_run_validation_cold():
+        import validation_core
+        from embedding_cache import get_cache
+
+        def cold():
+            get_cache().invalidate()
+            validation_core.run_validation(BENCH_NAME, BENCH_DOMAIN)
+        return run_sync(cold, iterations, warmup)
+
+    def bench_generate_template():
+        from template_generator import TemplateGenerator
+        generator, config = TemplateGenerator(), _template_config()
+        return run_sync(lambda: generator.generate_template_file(config), iterations, warmup)
+
+    def bench_token_count():
+        token_counter = load_tool('token-counter.py')
+        return run_sync(lambda: token_counter.count_tokens_from_file(str(BENCH_TEMPLATE)), iterations, warmup)
+
+    def bench_api_analyze():
+        alignment()
+        api = load_tool('api-endpoint.py')
+        payload = {'agent_name': BENCH_NAME, 'domain': BENCH_DOMAIN}
+        return run_http(api.app, 'POST', '/api/v1/analyze-alignment', payload, http_iterations, warmup)
+
+    def bench_api_analyze_batch():
+        alignment()
+        api = load_tool('api-endpoint.py')
+        payload = [{'agent_name': f"{BENCH_NAME} {i}", 'domain': BENCH_DOMAIN} for i in range(32)]
+        return run_http(api.app, 'POST', '/api/v1/analyze-alignment/batch', payload,
+                        max(http_iterations // 8, 5), warmup, concurrency=2)
+
+    def bench_api_generate_template():
+        import template_generator
+        return run_http(template_generator.app, 'POST', '/api/v1/generate-template',
+                        _template_payload(), http_iterations, warmup)
+
+    def bench_api_export_template():
+        import template_generator
+        return run_http(template_generator.app, 'POST', '/api/v1/export-template',
+                        _template_payload(), http_iterations, warmup)
+
+    return {
+        'extract_domain_keywords': bench_extract_keywords,
+        'calculate_alignment_per_keyword': bench_alignment_per_keyword,
+        'generate_alignment_report': bench_alignment_report,
+        'generate_alignment_report_cold': bench_alignment_report_cold,
+        'run_validation': bench_run_validation,
+        'run_validation_cold': bench_run_validation_cold,
+        'generate_template_file': bench_generate_template,
+        'token_count': bench_token_count,
+        'api_analyze_alignment': bench_api_analyze,
+        'api_analyze_alignment_batch': bench_api_analyze_batch,
+        'api_generate_template': bench_api_generate_template,
+        'api_export_template': bench_api_export_template,
+    }
+
+def run_suite(iterations: int = 200, only: Optional[List[str]] = None, real_models: bool = False) -> Dict[str, Any]:
+    """Roda os benchmarks e devolve o relatório (metadados + métricas por benchmark)."""
+    if not real_models:
+        register_stand_in_models()
+        register_stand_in_tokenizer()
+
+    results: Dict[str, Any] = {}
+    for name, bench in build_benchmarks(iterations).items():
+        if only and name not in only:
+            continue
+        print(f"⏱️  {name}...", file=sys.stderr)
+        try:
+            results[name] = bench()
+        except ImportError as e:
+            # Dependência opcional não instalada: registra e segue
+            results[name] = {'skipped': f"{type(e).__name__}: {e}"[:300]}
+            print(f"   ⚠️  pulado: {results[name]['skipped']}", file=sys.stderr)
+        except (Exception, SystemExit) as e:
+            # Endpoint/pipeline quebrado: falha (nunca "pulado")
+            results[name] = {'failed': f"{type(e).__name__}: {e}"[:300]}
+            print(f"   ❌ falhou: {results[name]['failed']}", file=sys.stderr)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'iterations': iterations,
+            'models': 'real' if real_models else 'stand-in',
+            'tokenizer': 'tiktoken' if real_models else 'stand-in'
+        },
+        'benchmarks': results
+    }
+
+def failures(report: Dict[str, Any]) -> List[str]:
+    """Benchmarks que falharam (erro que não é dependência opcional ausente)."""
+    return [f"{name}: {result['failed']}" for name, result in report['benchmarks'].items() if 'failed' in result]
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any],
+                        threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Regressões: p50 acima de (1 + threshold) x baseline, vazão abaixo de
+    (1 - threshold) x baseline, ou um benchmark medido no baseline que agora
+    falhou ou foi pulado (a cobertura do gate não pode encolher em silêncio).
+    """
+    regressions = []
+    for name, base in baseline.get('benchmarks', {}).items():
+        if 'p50_ms' not in base:
+            continue
+        current = report['benchmarks'].get(name)
+        if not current:
+            continue
+        if 'p50_ms' not in current:
+            regressions.append(f"{name}: medido no baseline, agora {current.get('failed') or current.get('skipped')}")
+            continue
+        if current['p50_ms'] > base['p50_ms'] * (1 + threshold):
+            regressions.append(f"{name}: p50 {current['p50_ms']:.3f} ms > {base['p50_ms']:.3f} ms (+{threshold:.0%})")
+        if current['throughput_ops_s'] < base['throughput_ops_s'] * (1 - threshold):
+            regressions.append(
+                f"{name}: vazão {current['throughput_ops_s']:.1f} ops/s < {base['throughput_ops_s']:.1f} ops/s (-{threshold:.0%})"
+            )
+    return regressions
+
+# --- Executor CLI ---
+
+def main():
+    """
+    Ponto de entrada do CLI.
+    """
+    parser = argparse.ArgumentParser(
+        description='Suíte de benchmarks dos caminhos quentes do ACC (v1.1.0)'
+    )
+    parser.add_argument('-o', '--output', type=str, default=None,
+                        help='Arquivo JSON do relatório (Padrão: stdout).')
+    parser.add_argument('--baseline', type=str, default=DEFAULT_BASELINE,
+                        help=f'Baseline para comparação (Padrão: {DEFAULT_BASELINE}).')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Grava o relatório como o novo baseline.')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Tolerância de regressão (Padrão: {DEFAULT_THRESHOLD}).')
+    parser.add_argument('--iterations', type=int, default=200,
+                        help='Iterações por benchmark (Padrão: 200).')
+    parser.add_argument('--only', type=str, default=None,
+                        help='Benchmarks separados por vírgula (Padrão: todos).')
+    parser.add_argument('--real-models', action='store_true',
+                        help='Usa os modelos e o tiktoken reais (requer os modelos e encodings baixados).')
+
+    args = parser.parse_args()
+    sys.path.insert(0, str(TOOLS_DIR))
+
+    only = [name.strip() for name in args.only.split(',')] if args.only else None
+    report = run_suite(args.iterations, only, args.real_models)
+    rendered = json.dumps(report, ensure_ascii=False, indent=2)
+
+    if args.output:
+        Path(args.output).write_text(rendered + "\n", encoding='utf-8')
+    else:
+        print(rendered)
+
+    failed = failures(report)
+    if failed:
+        print(f"❌ {len(failed)} benchmark(s) falharam{' (baseline NÃO salvo)' if args.save_baseline else ''}:",
+              file=sys.stderr)
+        for line in failed:
+            print(f"   {line}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.save_baseline:
+        Path(args.baseline).write_text(rendered + "\n", encoding='utf-8')
+        print(f"✅ Baseline salvo em: {args.baseline}", file=sys.stderr)
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"ℹ️  Sem baseline em {args.baseline} (use --save-baseline).", file=sys.stderr)
+        return
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        regressions = compare_to_baseline(report, json.load(f), args.threshold)
+    if regressions:
+        print(f"❌ {len(regressions)} regressão(ões):", file=sys.stderr)
+        for line in regressions:
+            print(f"   {line}", file=sys.stderr)
+        sys.exit(1)
+    print("✅ Nenhuma regressão em relação ao baseline.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
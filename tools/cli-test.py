@@ -7,22 +7,59 @@
 #
 # DEPENDÊNCIAS:
 # 1. google-generativeai (para acesso ao LLM)
+# 2. httpx (modo harness, --matrix)
 #
 # CONFIGURAÇÃO (Variável de Ambiente):
 # Para usar, você DEVE configurar sua API key:
 # export GOOGLE_API_KEY="SUA_API_KEY_AQUI"
 #
+# MODO HARNESS (--matrix):
+# Roda uma matriz templates x queries x modelos em paralelo (asyncio), com
+# limite de concorrência, rate limit (token bucket), retries com backoff e
+# UM cliente HTTP reutilizado. Resultados em JSONL, à medida que terminam.
+# '--base-url' aponta para um servidor LLM local (stub) nos testes.
+#
+# CACHE DE RESPOSTAS (response_cache.py):
+# Respostas gravadas por hash(template, query, modelo, GenerationConfig);
+# '--cache-mode replay' re-executa uma suíte inteira offline.
+#
 
 import os
 import sys
 import argparse
-import google.generativeai as genai
+import asyncio
+import glob
+import json
+import random
+import time
+from functools import lru_cache
+from itertools import product
 from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from response_cache import (
+    CACHE_MODES, DEFAULT_CACHE_DIR, DEFAULT_MODE as DEFAULT_CACHE_MODE,
+    ReplayMiss, ResponseCache, response_key
+)
 
 # --- Configuração do LLM ---
 # O modelo padrão "canivete": rápido, barato e potente.
 DEFAULT_MODEL = "gemini-1.5-flash-latest"
 
+# Configurações de geração "cirúrgicas"
+# Baixa temperatura para reduzir alucinação e aumentar a aderência
+# ao protocolo (determinismo).
+GENERATION_CONFIG = {'temperature': 0.1, 'top_p': 0.9, 'top_k': 10}
+
+# API REST do Gemini (usada pelo modo harness)
+DEFAULT_BASE_URL = os.getenv("ACC_LLM_BASE_URL", "https://generativelanguage.googleapis.com")
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RATE = 5.0        # requisições por segundo
+DEFAULT_RETRIES = 3
+DEFAULT_TIMEOUT_S = 60.0
+DEFAULT_JITTER_S = 1.0    # espera extra aleatória (0..jitter) sobre o backoff/Retry-After
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
 def load_api_key():
     """Carrega a API key da variável de ambiente."""
     api_key = os.getenv("GOOGLE_API_KEY")
@@ -46,46 +83,280 @@ def read_template_file(file_path: str) -> str:
         print(f"Erro ao ler o arquivo {file_path}: {e}", file=sys.stderr)
         sys.exit(1)
 
-def run_agent_test(template_content: str, user_query: str, model_name: str) -> str:
+def build_prompt(template_content: str, user_query: str) -> str:
     """
-    Combina o template com o query e executa no LLM.
+    O "Acoplamento" Cirúrgico: o prompt final é a concatenação do sistema
+    (template) e do usuário (query).
     """
-    
-    # --- O "Acoplamento" Cirúrgico ---
-    # O prompt final é a concatenação do sistema (template) e do usuário (query)
-    full_prompt = f"""{template_content}
+    return f"""{template_content}
 
 ---
 TAREFA DO USUÁRIO:
 {user_query}
 """
+
+@lru_cache(maxsize=None)
+def get_generative_model(model_name: str):
+    """Modelo do SDK, configurado uma única vez por processo e por nome."""
+    import google.generativeai as genai
+    genai.configure(api_key=load_api_key())
+    return genai.GenerativeModel(model_name)
+
+def run_agent_test(
+    template_content: str,
+    user_query: str,
+    model_name: str,
+    cache: Optional[ResponseCache] = None
+) -> str:
+    """
+    Combina o template com o query e executa no LLM (ou responde do
+    'cache', conforme o modo dele).
+    """
     
-    print(f"⏳ Executando Agente no modelo: {model_name}...")
+    full_prompt = build_prompt(template_content, user_query)
     
-    try:
-        genai.configure(api_key=load_api_key())
-        model = genai.GenerativeModel(model_name)
-        
-        # Configurações de geração "cirúrgicas"
-        # Baixa temperatura para reduzir alucinação e aumentar a aderência
-        # ao protocolo (determinismo).
-        generation_config = genai.GenerationConfig(
-            temperature=0.1,
-            top_p=0.9,
-            top_k=10
-        )
+    def generate() -> str:
+        print(f"⏳ Executando Agente no modelo: {model_name}...")
+        import google.generativeai as genai
+        model = get_generative_model(model_name)
         
         response = model.generate_content(
             full_prompt,
-            generation_config=generation_config
+            generation_config=genai.GenerationConfig(**GENERATION_CONFIG)
         )
         
         return response.text
+    
+    try:
+        if cache is None:
+            return generate()
+        return cache.call(template_content, user_query, model_name, GENERATION_CONFIG, generate)
         
+    except ReplayMiss as e:
+        print(f"\nErro: {e}", file=sys.stderr)
+        sys.exit(1)
     except Exception as e:
         print(f"\nErro durante a chamada da API do LLM: {e}", file=sys.stderr)
         sys.exit(1)
 
+# --- Modo Harness (Matriz Concorrente) ---
+
+class TokenBucket:
+    """Rate limit assíncrono: 'rate' requisições/s, rajadas de até 'capacity'."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+def load_matrix(path: str) -> List[Dict[str, Any]]:
+    """
+    Casos de teste de um arquivo JSON:
+    - Matriz: {"templates": [paths/globs], "queries": [...], "models": [...]}
+      (produto cartesiano; "models" é opcional), e/ou
+    - Casos explícitos: {"cases": [{"template", "query", "model"?, "id"?}]}.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+    base_dir = Path(path).resolve().parent
+
+    def resolve(pattern: str) -> List[str]:
+        full = pattern if os.path.isabs(pattern) else str(base_dir / pattern)
+        matches = sorted(path for path in glob.glob(full, recursive=True) if os.path.isfile(path))
+        if not matches:
+            raise ValueError(f"Nenhum template encontrado para '{pattern}' ({full}).")
+        return matches
+
+    cases = []
+    templates = [t for pattern in spec.get('templates', []) for t in resolve(pattern)]
+    queries = spec.get('queries', [])
+    models = spec.get('models') or [DEFAULT_MODEL]
+    for template, (q_index, query), model in product(templates, enumerate(queries), models):
+        cases.append({'id': f"{Path(template).stem}#{q_index}@{model}",
+                      'template': template, 'query': query, 'model': model})
+    for index, case in enumerate(spec.get('cases', [])):
+        template = resolve(case['template'])[0]
+        model = case.get('model', DEFAULT_MODEL)
+        cases.append({'id': case.get('id', f"case-{index}@{model}"),
+                      'template': template, 'query': case['query'], 'model': model})
+    return cases
+
+class LLMHarness:
+    """
+    Executor concorrente da matriz de casos contra a API REST do Gemini
+    (ou um stub compatível em 'base_url'), com UM cliente HTTP reutilizado.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        base_url: str = DEFAULT_BASE_URL,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rate: float = DEFAULT_RATE,
+        retries: int = DEFAULT_RETRIES,
+        timeout_s: float = DEFAULT_TIMEOUT_S,
+        cache: Optional[ResponseCache] = None,
+        jitter_s: float = DEFAULT_JITTER_S
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.cache = cache
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate)
+        self.retries = retries
+        self.jitter_s = jitter_s
+        self.timeout_s = timeout_s
+        self._templates: Dict[str, str] = {}
+
+    def _template(self, path: str) -> str:
+        if path not in self._templates:
+            self._templates[path] = Path(path).read_text(encoding='utf-8')
+        return self._templates[path]
+
+    async def _generate(self, client, model_name: str, prompt: str) -> str:
+        """Uma chamada 'generateContent' (levanta exceção com o status HTTP)."""
+        import httpx
+        response = await client.post(
+            f"{self.base_url}/v1beta/models/{model_name}:generateContent",
+            params={'key': self.api_key} if self.api_key else None,
+            json={
+                'contents': [{'role': 'user', 'parts': [{'text': prompt}]}],
+                'generationConfig': {
+                    'temperature': GENERATION_CONFIG['temperature'],
+                    'topP': GENERATION_CONFIG['top_p'],
+                    'topK': GENERATION_CONFIG['top_k']
+                }
+            }
+        )
+        if response.status_code >= 400:
+            raise httpx.HTTPStatusError(
+                f"HTTP {response.status_code}: {response.text[:200]}", request=response.request, response=response
+            )
+        candidates = response.json().get('candidates') or []
+        if not candidates:
+            raise ValueError(f"Resposta sem 'candidates': {response.text[:200]}")
+        parts = candidates[0].get('content', {}).get('parts', [])
+        return "".join(part.get('text', '') for part in parts)
+
+    async def run_case(self, client, case: Dict[str, Any]) -> Dict[str, Any]:
+        """Executa um caso com rate limit e retries (backoff exponencial ou Retry-After, + jitter)."""
+        import httpx
+        started = time.perf_counter()
+        try:
+            template_content = self._template(case['template'])
+        except OSError as e:
+            # Um template ilegível vira uma linha de erro, não derruba a suíte
+            return {**case, 'status': 'error', 'error': f"Falha ao ler o template: {e}",
+                    'attempts': 0, 'cached': False, 'latency_s': 0.0}
+        prompt = build_prompt(template_content, case['query'])
+
+        # Cache de respostas: um hit não consome rate limit nem rede. Um stub
+        # (--base-url) entra na chave para não misturar respostas com a API real.
+        key = None
+        if self.cache is not None:
+            key = response_key(template_content, case['query'], case['model'], GENERATION_CONFIG,
+                               endpoint=None if self.base_url == DEFAULT_BASE_URL.rstrip('/') else self.base_url)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return {**case, 'status': 'ok', 'response': cached, 'attempts': 0, 'cached': True,
+                        'latency_s': round(time.perf_counter() - started, 3)}
+            if self.cache.mode == 'replay':
+                return {**case, 'status': 'error', 'error': f"Resposta não gravada (modo replay), chave {key[:12]}.",
+                        'attempts': 0, 'cached': False, 'latency_s': 0.0}
+
+        error = None
+        for attempt in range(1, self.retries + 2):
+            await self.bucket.acquire()
+            try:
+                text = await self._generate(client, case['model'], prompt)
+                if key is not None:
+                    self.cache.put(key, text, {'model': case['model'], 'query': case['query']})
+                return {**case, 'status': 'ok', 'response': text, 'attempts': attempt, 'cached': False,
+                        'latency_s': round(time.perf_counter() - started, 3)}
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                error = str(e)
+                status = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+                if (status is not None and status not in RETRY_STATUS) or attempt > self.retries:
+                    break
+                # O Retry-After é um piso: o jitter só soma, nunca antecipa o retry
+                retry_after = e.response.headers.get('retry-after') if status else None
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** (attempt - 1)
+                await asyncio.sleep(delay + random.uniform(0, self.jitter_s))
+            except ValueError as e:
+                error = str(e)
+                break
+        return {**case, 'status': 'error', 'error': error, 'attempts': attempt, 'cached': False,
+                'latency_s': round(time.perf_counter() - started, 3)}
+
+    async def run(self, cases: List[Dict[str, Any]], output) -> Dict[str, int]:
+        """Roda todos os casos e escreve uma linha JSONL por resultado, ao terminar."""
+        import httpx
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        summary = {'total': len(cases), 'ok': 0, 'error': 0}
+
+        async with httpx.AsyncClient(timeout=self.timeout_s, limits=limits) as client:
+            async def bounded(case):
+                async with semaphore:
+                    return await self.run_case(client, case)
+
+            for finished in asyncio.as_completed([bounded(case) for case in cases]):
+                result = await finished
+                summary[result['status']] += 1
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                output.flush()
+        return summary
+
+def run_harness(args) -> int:
+    """Executa o modo harness. Retorna o código de saída."""
+    try:
+        cases = load_matrix(args.matrix)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Erro ao ler a matriz {args.matrix}: {e}", file=sys.stderr)
+        return 1
+    if not cases:
+        print("Erro: A matriz não gerou nenhum caso.", file=sys.stderr)
+        return 1
+
+    # Um stub local (--base-url) não precisa de API key
+    api_key = os.getenv("GOOGLE_API_KEY") if args.base_url != DEFAULT_BASE_URL else load_api_key()
+    harness = LLMHarness(api_key, args.base_url, args.concurrency, args.rate, args.retries, args.timeout,
+                         cache=open_cache(args), jitter_s=args.jitter)
+
+    print(f"⏳ Executando {len(cases)} caso(s) (concorrência {args.concurrency}, {args.rate}/s)...", file=sys.stderr)
+    started = time.perf_counter()
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            summary = asyncio.run(harness.run(cases, output))
+    else:
+        summary = asyncio.run(harness.run(cases, sys.stdout))
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ {summary['ok']} ok | ❌ {summary['error']} erro(s) | {elapsed:.1f}s", file=sys.stderr)
+    if harness.cache is not None:
+        stats = harness.cache.stats
+        print(f"   Cache ({harness.cache.mode}): {stats['hits']} hit(s), {stats['writes']} gravada(s)", file=sys.stderr)
+    return 1 if summary['error'] else 0
+
+def open_cache(args) -> Optional[ResponseCache]:
+    """Cache de respostas conforme '--cache-mode' (None se 'off')."""
+    if args.cache_mode == 'off':
+        return None
+    return ResponseCache(cache_dir=args.cache_dir, mode=args.cache_mode)
+
 def main():
     """
     Ponto de entrada do CLI.
@@ -102,6 +373,11 @@ $ python tools/cli-test.py \\
     -t "templates/hacker-semantico.md" \\
     -q "Analise esta oferta: 'Cloud Mágica que escala infinito e usa IA quântica.'"
 
+MODO HARNESS (matriz templates x queries x modelos, JSONL):
+
+$ python tools/cli-test.py --matrix tests/behavior-matrix.json -o results.jsonl \\
+    --concurrency 16 --rate 10
+
 ... (aguarde a resposta) ...
 
 =========================================
@@ -114,20 +390,48 @@ $ python tools/cli-test.py \\
 """
     )
     
-    parser.add_argument('-t', '--template', type=str, required=True,
+    parser.add_argument('-t', '--template', type=str,
                         help='Caminho para o arquivo .md do template do Agente.')
-    parser.add_argument('-q', '--query', type=str, required=True,
+    parser.add_argument('-q', '--query', type=str,
                         help='A tarefa (query) a ser executada pelo Agente.')
     parser.add_argument('-m', '--model', type=str, default=DEFAULT_MODEL,
                         help=f'Nome do modelo LLM a ser usado (Padrão: {DEFAULT_MODEL}).')
     
+    parser.add_argument('--cache-mode', choices=CACHE_MODES, default=DEFAULT_CACHE_MODE,
+                        help=f'Cache de respostas: record, replay (offline), refresh ou off (Padrão: {DEFAULT_CACHE_MODE}).')
+    parser.add_argument('--cache-dir', type=str, default=DEFAULT_CACHE_DIR,
+                        help=f'Diretório do cache de respostas (Padrão: {DEFAULT_CACHE_DIR}).')
+    
+    harness = parser.add_argument_group('modo harness')
+    harness.add_argument('--matrix', type=str, default=None,
+                         help='Arquivo JSON com a matriz de casos (templates x queries x modelos).')
+    harness.add_argument('-o', '--output', type=str, default=None,
+                         help='Arquivo JSONL de resultados (Padrão: stdout).')
+    harness.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                         help=f'Casos simultâneos (Padrão: {DEFAULT_CONCURRENCY}).')
+    harness.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                         help=f'Requisições por segundo (Padrão: {DEFAULT_RATE}).')
+    harness.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                         help=f'Retries por caso em 429/5xx/rede (Padrão: {DEFAULT_RETRIES}).')
+    harness.add_argument('--jitter', type=float, default=DEFAULT_JITTER_S,
+                         help=f'Espera extra aleatória (0..N s) somada ao backoff/Retry-After (Padrão: {DEFAULT_JITTER_S}).')
+    harness.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT_S,
+                         help=f'Timeout por requisição, em segundos (Padrão: {DEFAULT_TIMEOUT_S}).')
+    harness.add_argument('--base-url', type=str, default=DEFAULT_BASE_URL,
+                         help='URL base da API (ex: um stub local: http://127.0.0.1:8080).')
+    
     args = parser.parse_args()
     
+    if args.matrix:
+        sys.exit(run_harness(args))
+    if not args.template or not args.query:
+        parser.error("-t/--template e -q/--query são obrigatórios (ou use --matrix).")
+    
     # 1. Carregar o "cérebro" do Agente
     template_content = read_template_file(args.template)
     
     # 2. Executar a simulação
-    agent_response = run_agent_test(template_content, args.query, args.model)
+    agent_response = run_agent_test(template_content, args.query, args.model, cache=open_cache(args))
     
     # 3. Imprimir o resultado
     print(f"\n{'='*70}")
@@ -0,0 +1,328 @@
+# tools/embedding_cache.py
+# v1.1.0 - Cache de Embeddings (Memória + Disco)
+#
+# OBJETIVO:
+# Evitar re-codificar os mesmos Nomes, Domínios e Keywords em cada chamada
+# e em cada processo. A chave é (nome do modelo, hash do texto normalizado).
+#
+# CAMADAS:
+# 1. (MEMÓRIA) LRU com orçamento em bytes (ACC_CACHE_MAX_BYTES).
+# 2. (DISCO) Um arquivo .npy por embedding em ACC_CACHE_DIR; sobrevive a
+#    reinícios e é compartilhado entre processos. ACC_CACHE_DIR="" desativa.
+#
+# USO (CLI):
+# $ python tools/embedding_cache.py stats
+# $ python tools/embedding_cache.py invalidate --model all-mpnet-base-v2
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from metrics import COSINE_SECONDS, ENCODE_BATCH_SIZE, ENCODE_SECONDS, batch_bucket
+
+# --- Configuração ---
+DEFAULT_CACHE_DIR = os.getenv(
+    "ACC_CACHE_DIR",
+    str(Path.home() / ".cache" / "acc" / "embeddings")
+)
+DEFAULT_MAX_BYTES = int(os.getenv("ACC_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 64 MB
+
+VERSION_FILE = "VERSION"
+
+def normalize_text(text: str) -> str:
+    """
+    Normaliza o texto antes do hash (e do encode): Unicode NFC e espaços colapsados.
+    Não altera caixa: alguns modelos são case-sensitive.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+def text_key(text: str) -> str:
+    """Hash (sha256) do texto normalizado."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+def _model_slug(model_name: str) -> str:
+    """
+    Nome de diretório seguro para o modelo (ex: 'all-MiniLM-L6-v2'). O '@'
+    dos ids por backend ('modelo@onnx') é mantido, para 'invalidate' achá-los.
+    """
+    return re.sub(r'[^\w.@-]', '_', model_name)
+
+def _same_model(cache_name: str, model_name: str) -> bool:
+    """'cache_name' é 'model_name' ou um dos seus backends ('model_name@backend')."""
+    return cache_name == model_name or cache_name.startswith(f"{model_name}@")
+
+class EmbeddingCache:
+    """
+    Cache de embeddings endereçado por conteúdo, com tier LRU em memória e
+    tier persistente em disco.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+    # --- Tier 1: Memória (LRU) ---
+
+    def _memory_get(self, entry: Tuple[str, str]) -> Optional[np.ndarray]:
+        with self._lock:
+            embedding = self._memory.get(entry)
+            if embedding is not None:
+                self._memory.move_to_end(entry)
+            return embedding
+
+    def _memory_put(self, entry: Tuple[str, str], embedding: np.ndarray) -> None:
+        if embedding.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(entry, None)
+            if previous is not None:
+                self._memory_bytes -= previous.nbytes
+            self._memory[entry] = embedding
+            self._memory_bytes += embedding.nbytes
+            while self._memory_bytes > self.max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted.nbytes
+                self.stats['evictions'] += 1
+
+    # --- Tier 2: Disco ---
+
+    def _disk_path(self, model_name: str, key: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / _model_slug(model_name) / key[:2] / f"{key}.npy"
+
+    def _disk_get(self, model_name: str, key: str) -> Optional[np.ndarray]:
+        path = self._disk_path(model_name, key)
+        if path is None or not path.is_file():
+            return None
+        try:
+            return np.load(path, allow_pickle=False)
+        except Exception:
+            # Arquivo corrompido (ex: escrita interrompida): trata como miss.
+            path.unlink(missing_ok=True)
+            return None
+
+    def _disk_put(self, model_name: str, key: str, embedding: np.ndarray) -> None:
+        path = self._disk_path(model_name, key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Escrita atômica: outro processo nunca lê um arquivo pela metade.
+            tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                np.save(f, embedding, allow_pickle=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Aviso: Falha ao gravar cache de embeddings em disco: {e}", file=sys.stderr)
+
+    # --- API Pública ---
+
+    def get(self, model_name: str, text: str) -> Optional[np.ndarray]:
+        """Busca uma embedding (memória, depois disco). Retorna None em caso de miss."""
+        key = text_key(text)
+        entry = (model_name, key)
+
+        embedding = self._memory_get(entry)
+        if embedding is not None:
+            self.stats['memory_hits'] += 1
+            return embedding
+
+        embedding = self._disk_get(model_name, key)
+        if embedding is not None:
+            self.stats['disk_hits'] += 1
+            self._memory_put(entry, embedding)
+            return embedding
+
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, model_name: str, text: str, embedding: np.ndarray) -> None:
+        """Armazena uma embedding nos dois tiers."""
+        key = text_key(text)
+        embedding = np.ascontiguousarray(embedding, dtype=np.float32)
+        self._memory_put((model_name, key), embedding)
+        self._disk_put(model_name, key, embedding)
+
+    def encode(
+        self,
+        texts: List[str],
+        model_name: str,
+        model: Any,
+        batch_size: int = 32
+    ) -> np.ndarray:
+        """
+        Retorna as embeddings (n x d, float32) de 'texts', codificando apenas
+        os textos ausentes do cache, em UM único batch e sem duplicatas.
+
+        'model' pode ser o objeto SentenceTransformer ou uma função sem
+        argumentos que o retorna (resolvida apenas se houver miss).
+        """
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+
+        for i, text in enumerate(texts):
+            embedding = self.get(model_name, text)
+            if embedding is not None:
+                results[i] = embedding
+            else:
+                missing.setdefault(normalize_text(text), []).append(i)
+
+        if missing:
+            if not hasattr(model, 'encode'):
+                model = model()
+            miss_texts = list(missing.keys())
+            start = time.perf_counter()
+            embeddings = model.encode(miss_texts, batch_size=batch_size, convert_to_numpy=True)
+            ENCODE_SECONDS.observe(time.perf_counter() - start, model=model_name, batch=batch_bucket(len(miss_texts)))
+            ENCODE_BATCH_SIZE.observe(len(miss_texts), model=model_name)
+            for text, embedding in zip(miss_texts, embeddings):
+                self.put(model_name, text, embedding)
+                for i in missing[text]:
+                    results[i] = embedding
+
+        return np.stack(results).astype(np.float32, copy=False)
+
+    def invalidate(self, model_name: Optional[str] = None, backends: bool = True) -> None:
+        """
+        Remove as embeddings de um modelo (ou de todos, se None) dos dois tiers,
+        incluindo as dos seus backends ('modelo@onnx', ...), salvo se
+        'backends=False'. Deve ser chamado sempre que a versão/pesos de um
+        modelo mudarem.
+        """
+        def matches(name: str) -> bool:
+            if model_name is None:
+                return True
+            return _same_model(name, model_name) if backends else name == model_name
+
+        with self._lock:
+            for entry in [e for e in self._memory if matches(e[0])]:
+                self._memory_bytes -= self._memory.pop(entry).nbytes
+
+        if self.cache_dir is None or not self.cache_dir.is_dir():
+            return
+        slug = _model_slug(model_name) if model_name else None
+        for target in self.cache_dir.iterdir():
+            if not target.is_dir():
+                continue
+            if slug is None or target.name == slug or (backends and target.name.startswith(f"{slug}@")):
+                shutil.rmtree(target, ignore_errors=True)
+
+    def ensure_model_version(self, model_name: str, version: str) -> bool:
+        """
+        Compara a versão registrada no disco para 'model_name' (um id do
+        cache, ex: 'modelo@onnx') com 'version'. Se divergir, invalida o
+        cache desse id e registra a nova versão. Retorna True se houve
+        invalidação. Chamado pelo 'ModelRegistry' a cada carga de modelo.
+        """
+        if self.cache_dir is None:
+            return False
+        version_path = self.cache_dir / _model_slug(model_name) / VERSION_FILE
+        current = version_path.read_text(encoding='utf-8').strip() if version_path.is_file() else None
+        if current == version:
+            return False
+
+        invalidated = current is not None
+        if invalidated:
+            self.invalidate(model_name, backends=False)
+        version_path.parent.mkdir(parents=True, exist_ok=True)
+        version_path.write_text(version, encoding='utf-8')
+        return invalidated
+
+    def hit_rate(self) -> float:
+        """Fração de lookups servidos pelo cache (memória ou disco)."""
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        total = hits + self.stats['misses']
+        return hits / total if total else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de hit/miss e ocupação do tier de memória."""
+        return {
+            **self.stats,
+            'hit_rate': round(self.hit_rate(), 4),
+            'memory_entries': len(self._memory),
+            'memory_bytes': self._memory_bytes,
+            'memory_max_bytes': self.max_bytes,
+            'cache_dir': str(self.cache_dir) if self.cache_dir else None
+        }
+
+# --- Instância Compartilhada ---
+
+_CACHE: Optional[EmbeddingCache] = None
+_CACHE_LOCK = threading.Lock()
+
+def get_cache() -> EmbeddingCache:
+    """Retorna o cache compartilhado do processo (criado na primeira chamada)."""
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = EmbeddingCache()
+    return _CACHE
+
+def cosine_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Similaridade de cossenos (m x n) entre as linhas de 'a' e de 'b'."""
+    start = time.perf_counter()
+    a = np.atleast_2d(a)
+    b = np.atleast_2d(b)
+    a = a / np.clip(np.linalg.norm(a, axis=1, keepdims=True), 1e-12, None)
+    b = b / np.clip(np.linalg.norm(b, axis=1, keepdims=True), 1e-12, None)
+    similarity = a @ b.T
+    COSINE_SECONDS.observe(time.perf_counter() - start)
+    return similarity
+
+# --- Executor CLI ---
+
+def main():
+    """
+    Ponto de entrada do CLI (inspeção e invalidação do cache em disco).
+    """
+    parser = argparse.ArgumentParser(
+        description='Cache de Embeddings (ACC v1.1.0)',
+        epilog="Exemplo: python tools/embedding_cache.py invalidate --model all-mpnet-base-v2"
+    )
+    parser.add_argument('command', choices=['stats', 'invalidate'],
+                        help='"stats" lista o uso do disco; "invalidate" apaga entradas.')
+    parser.add_argument('--model', type=str, default=None,
+                        help='Nome do modelo (ex: "all-MiniLM-L6-v2"). Padrão: todos.')
+    parser.add_argument('--cache-dir', type=str, default=DEFAULT_CACHE_DIR,
+                        help=f'Diretório do cache (Padrão: {DEFAULT_CACHE_DIR}).')
+
+    args = parser.parse_args()
+    cache = EmbeddingCache(cache_dir=args.cache_dir)
+
+    if args.command == 'invalidate':
+        cache.invalidate(args.model)
+        print(f"✅ Cache invalidado: {args.model or 'todos os modelos'}")
+        return
+
+    usage = {}
+    if cache.cache_dir is not None and cache.cache_dir.is_dir():
+        for model_dir in sorted(p for p in cache.cache_dir.iterdir() if p.is_dir()):
+            files = list(model_dir.glob("*/*.npy"))
+            version_path = model_dir / VERSION_FILE
+            usage[model_dir.name] = {
+                'entries': len(files),
+                'bytes': sum(f.stat().st_size for f in files),
+                'version': version_path.read_text(encoding='utf-8').strip() if version_path.is_file() else None
+            }
+    print(json.dumps({'cache_dir': str(cache.cache_dir), 'models': usage}, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
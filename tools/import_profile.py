@@ -0,0 +1,138 @@
+# tools/import_profile.py
+# v1.1.0 - Perfil de Import (Cold Start)
+#
+# OBJETIVO:
+# Mostrar quais módulos dominam o startup de um serviço (ex: api-endpoint.py,
+# template_generator.py) antes de ele conseguir responder o '/healthz'.
+# Importa o alvo em um processo limpo com 'python -X importtime' e agrega
+# o tempo por módulo e por pacote.
+#
+# USO (CLI):
+# $ python tools/import_profile.py tools/api-endpoint.py
+# $ python tools/import_profile.py tools/template_generator.py --top 10 --json
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+from tool_loader import TOOLS_DIR, module_name_for
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+# Carrega um arquivo como módulo (o nome pode ter '-' ou espaço), sem rodar o main()
+_LOADER = """
+import sys
+sys.path.insert(0, {tools_dir!r})
+from tool_loader import load_tool
+load_tool({path!r})
+"""
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Linhas do '-X importtime' -> [{'module', 'self_us', 'cumulative_us', 'depth'}]."""
+    rows = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            rows.append({
+                'module': match.group(4),
+                'self_us': int(match.group(1)),
+                'cumulative_us': int(match.group(2)),
+                'depth': len(match.group(3)) // 2
+            })
+    return rows
+
+def profile_imports(target: str, python: str = sys.executable) -> Dict[str, Any]:
+    """Importa 'target' (arquivo .py ou nome de módulo) e devolve o perfil agregado."""
+    path = Path(target)
+    if path.is_file():
+        module = module_name_for(path)
+        code = _LOADER.format(tools_dir=str(TOOLS_DIR), path=str(path.resolve()))
+    else:
+        module = target
+        code = f"import {target}"
+
+    env = {**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+    result = subprocess.run([python, '-X', 'importtime', '-c', code], capture_output=True, text=True, env=env)
+    rows = parse_importtime(result.stderr)
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+        raise RuntimeError(f"Falha ao importar '{target}': {errors[-1] if errors else result.returncode}")
+
+    packages: Dict[str, int] = defaultdict(int)
+    for row in rows:
+        packages[row['module'].split('.')[0]] += row['self_us']
+
+    return {
+        'target': target,
+        'module': module,
+        'total_ms': round(sum(row['self_us'] for row in rows) / 1000, 1),
+        'modules': len(rows),
+        # Imports diretos do alvo (profundidade 0): quem puxa o quê
+        'top_level': sorted(
+            ({'module': r['module'], 'cumulative_ms': round(r['cumulative_us'] / 1000, 1)} for r in rows if r['depth'] == 0),
+            key=lambda r: -r['cumulative_ms']
+        ),
+        'packages': sorted(
+            ({'package': name, 'self_ms': round(us / 1000, 1)} for name, us in packages.items()),
+            key=lambda r: -r['self_ms']
+        )
+    }
+
+def print_profile(profile: Dict[str, Any], top: int) -> None:
+    print(f"\n{'='*70}")
+    print(f"⏱️  PERFIL DE IMPORT: {profile['target']}")
+    print(f"{'='*70}\n")
+    print(f"Tempo total de import: {profile['total_ms']:.1f} ms ({profile['modules']} módulos)\n")
+
+    print(f"{'Import direto (cumulativo)':<50} {'ms':>10}")
+    print(f"{'-'*70}")
+    for row in profile['top_level'][:top]:
+        print(f"{row['module']:<50} {row['cumulative_ms']:>10.1f}")
+
+    print(f"\n{'Pacote (tempo próprio)':<50} {'ms':>10}")
+    print(f"{'-'*70}")
+    for row in profile['packages'][:top]:
+        print(f"{row['package']:<50} {row['self_ms']:>10.1f}")
+    print(f"\n{'='*70}\n")
+
+# --- Executor CLI ---
+
+def main():
+    """
+    Ponto de entrada do CLI.
+    """
+    parser = argparse.ArgumentParser(
+        description='Perfil de Import / Cold Start (ACC v1.1.0)',
+        epilog="Exemplo: python tools/import_profile.py tools/api-endpoint.py --top 10"
+    )
+    parser.add_argument('targets', type=str, nargs='+',
+                        help='Arquivos .py (ou nomes de módulos) a importar.')
+    parser.add_argument('--top', type=int, default=15,
+                        help='Linhas por tabela (Padrão: 15).')
+    parser.add_argument('--json', action='store_true',
+                        help='Imprime o perfil completo em JSON.')
+
+    args = parser.parse_args()
+
+    profiles = []
+    for target in args.targets:
+        try:
+            profiles.append(profile_imports(target))
+        except RuntimeError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(1)
+
+    if args.json:
+        print(json.dumps(profiles if len(profiles) > 1 else profiles[0], indent=2, ensure_ascii=False))
+        return
+    for profile in profiles:
+        print_profile(profile, args.top)
+
+if __name__ == "__main__":
+    main()
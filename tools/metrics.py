@@ -0,0 +1,354 @@
+# tools/metrics.py
+# v1.1.0 - Métricas de Performance (Formato Prometheus)
+#
+# OBJETIVO:
+# Uma camada de instrumentação única, sem dependências, para os servidores
+# e para os CLIs: contadores, gauges e histogramas no formato texto do
+# Prometheus.
+#
+# O QUE É MEDIDO (ver os pontos de instrumentação em cada módulo):
+# - acc_model_load_seconds{model}              carga de modelos (model_registry)
+# - acc_encode_seconds{model,batch}            encode real (embedding_cache)
+# - acc_encode_batch_size{model}               tamanho dos batches de encode
+# - acc_cosine_seconds                         similaridade de cossenos
+# - acc_keyword_extraction_seconds             extração de keywords
+# - acc_tokenize_seconds{tool}                 tokenização (tiktoken)
+# - acc_embedding_cache_lookups_total{result}  hits/misses do cache de embeddings
+# - acc_http_requests_in_flight / _total / acc_http_request_seconds
+#
+# USO:
+# - Servidores: 'install_metrics(app)' expõe GET /metrics.
+# - CLIs: ACC_METRICS_DUMP=arquivo (ou "-" para stderr) grava as métricas
+#   ao sair do processo.
+# - Código: 'with timed(HISTOGRAM, label=...):' mede um trecho.
+
+import atexit
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# --- Configuração ---
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+LabelValues = Tuple[str, ...]
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Labels de '{self.name}': esperado {self.labelnames}, recebido {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+class Counter(_Metric):
+    """Contador monotônico."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+class Gauge(Counter):
+    """Valor instantâneo (pode subir e descer)."""
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+class CallbackMetric(_Metric):
+    """Métrica lida na hora do scrape (ex: contadores que já existem em outro objeto)."""
+
+    def __init__(self, name: str, documentation: str, kind: str,
+                 labelnames: Sequence[str], collect: Callable[[], Dict[LabelValues, float]]):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self._collect = collect
+
+    def samples(self) -> List[str]:
+        try:
+            values = self._collect()
+        except Exception:
+            return []
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(values.items())]
+
+class Histogram(_Metric):
+    """Histograma com buckets cumulativos (le), soma e contagem."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}  # [contagem por bucket..., +Inf, soma]
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, **labels: str) -> "_Timer":
+        return _Timer(self, labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+class _Timer:
+    """Context manager/decorador que observa o tempo de parede em um histograma."""
+
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+    def __call__(self, fn):
+        def wrapper(*args, **kwargs):
+            with _Timer(self.histogram, self.labels):
+                return fn(*args, **kwargs)
+        wrapper.__name__ = fn.__name__
+        wrapper.__doc__ = fn.__doc__
+        wrapper.__wrapped__ = fn
+        return wrapper
+
+# --- Registro ---
+
+class MetricsRegistry:
+    """Conjunto de métricas do processo (uma por nome)."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def callback(self, name: str, documentation: str, kind: str, labelnames: Sequence[str],
+                 collect: Callable[[], Dict[LabelValues, float]]) -> CallbackMetric:
+        """Registra (ou substitui) uma métrica calculada no scrape."""
+        with self._lock:
+            metric = self._metrics[name] = CallbackMetric(name, documentation, kind, labelnames, collect)
+            return metric
+
+    def render(self) -> str:
+        """Todas as métricas no formato texto do Prometheus (0.0.4)."""
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+# --- Métricas do ACC ---
+
+MODEL_LOAD_SECONDS = REGISTRY.histogram(
+    "acc_model_load_seconds", "Tempo de carga de um modelo de embedding.", ["model"])
+ENCODE_SECONDS = REGISTRY.histogram(
+    "acc_encode_seconds", "Latência do encode (textos fora do cache) por modelo e faixa de batch.", ["model", "batch"])
+ENCODE_BATCH_SIZE = REGISTRY.histogram(
+    "acc_encode_batch_size", "Textos por chamada de encode.", ["model"], buckets=SIZE_BUCKETS)
+COSINE_SECONDS = REGISTRY.histogram(
+    "acc_cosine_seconds", "Tempo da matriz de similaridade de cossenos.")
+KEYWORD_SECONDS = REGISTRY.histogram(
+    "acc_keyword_extraction_seconds", "Tempo de extração de keywords do domínio.")
+TOKENIZE_SECONDS = REGISTRY.histogram(
+    "acc_tokenize_seconds", "Tempo de tokenização (tiktoken).", ["tool"])
+
+def batch_bucket(size: int) -> str:
+    """Faixa (potência de 2) do tamanho do batch, para limitar a cardinalidade."""
+    for bound in SIZE_BUCKETS:
+        if size <= bound:
+            return str(bound)
+    return f"{SIZE_BUCKETS[-1]}+"
+
+@contextmanager
+def timed(histogram: Histogram, **labels: str) -> Iterator[None]:
+    """Mede o bloco e observa o tempo em 'histogram'."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, **labels)
+
+def _embedding_cache_lookups() -> Dict[LabelValues, float]:
+    from embedding_cache import get_cache
+    stats = get_cache().stats
+    return {('memory_hit',): stats['memory_hits'], ('disk_hit',): stats['disk_hits'], ('miss',): stats['misses']}
+
+REGISTRY.callback("acc_embedding_cache_lookups_total", "Lookups no cache de embeddings por resultado.",
+                  "counter", ["result"], _embedding_cache_lookups)
+
+# --- Servidores (FastAPI) ---
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI da instrumentação HTTP. A requisição só termina no
+    último 'http.response.body' (ou em erro/desconexão): respostas em
+    streaming contam em 'in_flight' e na latência até o último byte.
+    """
+
+    def __init__(self, app, path: str, in_flight: Gauge, requests_total: Counter, request_seconds: Histogram):
+        self.app = app
+        self.path = path
+        self.in_flight = in_flight
+        self.requests_total = requests_total
+        self.request_seconds = request_seconds
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] != 'http' or scope['path'] == self.path:
+            await self.app(scope, receive, send)
+            return
+        self.in_flight.inc()
+        start = time.perf_counter()
+        status = 500
+        finished = False
+
+        def finish() -> None:
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            self.in_flight.dec()
+            route = getattr(scope.get('route'), 'path', None) or 'unmatched'
+            self.request_seconds.observe(time.perf_counter() - start, route=route)
+            self.requests_total.inc(method=scope['method'], route=route, status=str(status))
+
+        async def send_and_measure(message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+            if message['type'] == 'http.response.body' and not message.get('more_body', False):
+                finish()
+
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            finish()
+
+def install_metrics(app, path: str = "/metrics", registry: MetricsRegistry = REGISTRY):
+    """
+    Adiciona a 'app' a instrumentação HTTP (requisições em andamento,
+    total e latência por rota) e a rota GET 'path' com o texto Prometheus.
+    """
+    from fastapi.responses import PlainTextResponse
+
+    app.add_middleware(
+        MetricsMiddleware, path=path,
+        in_flight=registry.gauge("acc_http_requests_in_flight", "Requisições HTTP em andamento."),
+        requests_total=registry.counter(
+            "acc_http_requests_total", "Requisições HTTP por rota e status.", ["method", "route", "status"]),
+        request_seconds=registry.histogram(
+            "acc_http_request_seconds", "Latência das requisições HTTP (até o fim do corpo da resposta).", ["route"])
+    )
+
+    @app.get(path, include_in_schema=False)
+    async def metrics_endpoint():
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+    return registry
+
+# --- CLIs (dump ao sair) ---
+
+def dump(target: Optional[str] = None, registry: MetricsRegistry = REGISTRY) -> None:
+    """Grava as métricas em 'target' (arquivo; "-" = stderr)."""
+    target = target or os.getenv("ACC_METRICS_DUMP")
+    if not target:
+        return
+    text = registry.render()
+    if target == "-":
+        sys.stderr.write(text)
+        return
+    try:
+        with open(target, 'w', encoding='utf-8') as f:
+            f.write(text)
+    except OSError as e:
+        print(f"Aviso: Falha ao gravar métricas em {target}: {e}", file=sys.stderr)
+
+if os.getenv("ACC_METRICS_DUMP"):
+    atexit.register(dump)
@@ -0,0 +1,265 @@
+# tools/model_registry.py
+# v1.1.0 - Registro de Modelos (Lazy, Thread-Safe, com Orçamento de RAM)
+#
+# OBJETIVO:
+# Um único ponto de carga para os modelos SentenceTransformer de todas as
+# ferramentas. Nenhum modelo (nem o torch) é carregado no import: cada
+# modelo é carregado sob demanda, pela chave (nome do modelo), uma única vez.
+#
+# GARANTIAS:
+# 1. (SINGLE-FLIGHT) Threads concorrentes pedindo o mesmo modelo esperam
+#    UMA única carga.
+# 2. (ORÇAMENTO) ACC_MODEL_RAM_BUDGET_MB limita a RAM dos pesos carregados;
+#    o modelo menos usado recentemente (LRU) é descarregado. 0 = sem limite.
+# 3. (WARMUP) 'warmup()' carrega modelos explicitamente (ex: no startup).
+# 4. (BACKEND) ACC_EMBEDDING_BACKENDS escolhe o backend POR MODELO
+#    (ex: "all-mpnet-base-v2=onnx-int8"); ver 'onnx_backend.py'.
+# 5. (DAEMON) Com o 'scoring_daemon.py' rodando, o loader padrão devolve
+#    um 'RemoteModel' (modelos já quentes no daemon, sem torch no processo).
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from embedding_cache import get_cache
+from metrics import MODEL_LOAD_SECONDS
+
+# --- Configuração ---
+DEFAULT_RAM_BUDGET_MB = int(os.getenv("ACC_MODEL_RAM_BUDGET_MB", "0"))
+BACKENDS = ('torch', 'onnx', 'onnx-int8')  # (usado também por onnx_backend.py)
+
+def _parse_backends(spec: str) -> Dict[str, str]:
+    """Lê "modelo=backend,modelo=backend" (ACC_EMBEDDING_BACKENDS)."""
+    backends = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        model_name, _, backend = item.partition('=')
+        backends[model_name.strip()] = backend.strip() or 'torch'
+    return backends
+
+_BACKENDS: Dict[str, str] = _parse_backends(os.getenv("ACC_EMBEDDING_BACKENDS", ""))
+
+def backend_for(model_name: str) -> str:
+    """Backend configurado para o modelo: 'torch' (padrão), 'onnx' ou 'onnx-int8'."""
+    return _BACKENDS.get(model_name, 'torch')
+
+def set_backend(model_name: str, backend: str) -> None:
+    """
+    Seleciona o backend de um modelo (vale para as próximas cargas; use
+    'get_registry().evict(model_name)' para trocar um modelo já carregado).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: '{backend}' (use {', '.join(BACKENDS)}).")
+    _BACKENDS[model_name] = backend
+
+def cache_id(model_name: str) -> str:
+    """
+    Identidade do modelo no cache de embeddings. Backends diferentes geram
+    vetores (levemente) diferentes, então cada um tem seu próprio espaço.
+    """
+    backend = backend_for(model_name)
+    return model_name if backend == 'torch' else f"{model_name}@{backend}"
+
+def _load_sentence_transformer(model_name: str) -> Any:
+    """
+    Loader padrão: o daemon de scoring, se estiver rodando; senão, a carga
+    local ('_load_local_model').
+    """
+    from scoring_daemon import remote_model
+    remote = remote_model(model_name, backend_for(model_name), local_loader=_load_local_model)
+    if remote is not None:
+        return remote
+    return _load_local_model(model_name)
+
+def _load_local_model(model_name: str) -> Any:
+    """
+    Carga local: importa o sentence-transformers (e o torch) só aqui.
+    Backends ONNX só carregam se aprovados na paridade (onnx_backend.py).
+    """
+    backend = backend_for(model_name)
+    if backend != 'torch':
+        from onnx_backend import load_onnx_model
+        return load_onnx_model(model_name, backend)
+
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+def model_nbytes(model: Any) -> int:
+    """Estimativa da RAM ocupada pelos pesos (parâmetros + buffers) do modelo."""
+    if hasattr(model, 'memory_bytes'):
+        return model.memory_bytes()
+    try:
+        tensors = list(model.parameters()) + list(model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    except Exception:
+        return 0
+
+def model_version(model: Any) -> Optional[str]:
+    """
+    Versão dos pesos do modelo, para invalidar o cache de embeddings quando
+    ela mudar: o atributo 'version' (ex: o export ONNX) ou o commit do
+    Hugging Face Hub do SentenceTransformer. None se desconhecida.
+    """
+    version = getattr(model, 'version', None)
+    if version:
+        return str(version)
+    try:
+        return model[0].auto_model.config._commit_hash or None
+    except Exception:
+        return None
+
+class ModelRegistry:
+    """
+    Registro de modelos carregados sob demanda, com LRU limitado por RAM.
+    """
+
+    def __init__(
+        self,
+        ram_budget_bytes: Optional[int] = None,
+        loader: Callable[[str], Any] = _load_sentence_transformer
+    ):
+        if ram_budget_bytes is None:
+            ram_budget_bytes = DEFAULT_RAM_BUDGET_MB * 1024 * 1024
+        self.ram_budget_bytes = ram_budget_bytes
+        self._loader = loader
+        self._models: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._loading: Dict[str, threading.Event] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._lock = threading.Lock()
+        self.stats = {'loads': 0, 'evictions': 0, 'load_seconds': 0.0}
+
+    def get(self, model_name: str) -> Any:
+        """
+        Retorna o modelo 'model_name', carregando-o se necessário.
+        Apenas uma thread carrega; as demais aguardam o mesmo resultado.
+        """
+        while True:
+            with self._lock:
+                model = self._models.get(model_name)
+                if model is not None:
+                    self._models.move_to_end(model_name)
+                    return model
+                event = self._loading.get(model_name)
+                leader = event is None
+                if leader:
+                    event = threading.Event()
+                    self._loading[model_name] = event
+                    self._errors.pop(model_name, None)
+
+            if leader:
+                return self._load(model_name, event)
+
+            event.wait()
+            with self._lock:
+                error = self._errors.get(model_name)
+            if error is not None:
+                raise RuntimeError(f"❌ ERRO FATAL: Falha ao carregar modelo '{model_name}': {error}")
+
+    def _load(self, model_name: str, event: threading.Event) -> Any:
+        """Carga efetiva (executada apenas pela thread 'líder')."""
+        try:
+            print(f"⏳ Carregando modelo de embedding: {model_name}...", file=sys.stderr)
+            start_load = time.time()
+            model = self._loader(model_name)
+            load_time = time.time() - start_load
+            print(f"✅ Modelo '{model_name}' carregado em {load_time:.2f}s.", file=sys.stderr)
+            MODEL_LOAD_SECONDS.observe(load_time, model=model_name)
+            self._check_cache_version(model_name, model)
+
+            with self._lock:
+                self._store(model_name, model)
+                self.stats['loads'] += 1
+                self.stats['load_seconds'] += load_time
+            return model
+        except Exception as e:
+            with self._lock:
+                self._errors[model_name] = e
+            raise RuntimeError(f"❌ ERRO FATAL: Falha ao carregar modelo '{model_name}': {e}") from e
+        finally:
+            with self._lock:
+                self._loading.pop(model_name, None)
+            event.set()
+
+    def _check_cache_version(self, model_name: str, model: Any) -> None:
+        """Invalida as embeddings em cache se a versão dos pesos mudou desde a última carga."""
+        version = model_version(model)
+        if version is None:
+            return
+        try:
+            if get_cache().ensure_model_version(cache_id(model_name), version):
+                print(f"♻️  Cache de embeddings de '{model_name}' invalidado (nova versão: {version}).",
+                      file=sys.stderr)
+        except OSError as e:
+            print(f"Aviso: Falha ao verificar a versão do cache de '{model_name}': {e}", file=sys.stderr)
+
+    def _store(self, model_name: str, model: Any) -> None:
+        """Insere o modelo e aplica o orçamento de RAM (chamar com o lock)."""
+        self._models[model_name] = model
+        self._models.move_to_end(model_name)
+        self._sizes[model_name] = model_nbytes(model)
+
+        if self.ram_budget_bytes <= 0:
+            return
+        # Nunca descarrega o modelo recém-inserido, mesmo que sozinho exceda o orçamento.
+        while self.memory_bytes() > self.ram_budget_bytes and len(self._models) > 1:
+            evicted, _ = self._models.popitem(last=False)
+            self._sizes.pop(evicted, None)
+            self.stats['evictions'] += 1
+            print(f"♻️  Modelo '{evicted}' descarregado (orçamento de RAM).", file=sys.stderr)
+
+    def register(self, model_name: str, model: Any) -> None:
+        """
+        Registra um modelo já instanciado (ex: um backend alternativo ou um
+        modelo local de testes) sob 'model_name'.
+        """
+        with self._lock:
+            self._store(model_name, model)
+
+    def warmup(self, model_names: Iterable[str]) -> Dict[str, Any]:
+        """Carrega explicitamente os modelos (ex: no startup de um serviço)."""
+        return {name: self.get(name) for name in model_names}
+
+    def evict(self, model_name: str) -> bool:
+        """Descarrega um modelo. Retorna True se ele estava carregado."""
+        with self._lock:
+            self._sizes.pop(model_name, None)
+            return self._models.pop(model_name, None) is not None
+
+    def loaded(self) -> List[str]:
+        """Nomes dos modelos carregados (do menos ao mais usado recentemente)."""
+        with self._lock:
+            return list(self._models.keys())
+
+    def memory_bytes(self) -> int:
+        """RAM estimada dos pesos carregados."""
+        return sum(list(self._sizes.values()))
+
+# --- Instância Compartilhada ---
+
+_REGISTRY: Optional[ModelRegistry] = None
+_REGISTRY_LOCK = threading.Lock()
+
+def get_registry() -> ModelRegistry:
+    """Retorna o registro compartilhado do processo (criado na primeira chamada)."""
+    global _REGISTRY
+    if _REGISTRY is None:
+        with _REGISTRY_LOCK:
+            if _REGISTRY is None:
+                _REGISTRY = ModelRegistry()
+    return _REGISTRY
+
+def get_model(model_name: str) -> Any:
+    """Atalho para 'get_registry().get(model_name)'."""
+    return get_registry().get(model_name)
+
+def encode(model_name: str, texts: List[str], batch_size: int = 32) -> np.ndarray:
+    """
+    Embeddings (n x d) de 'texts' no modelo 'model_name', via cache.
+    O modelo só é carregado se algum texto não estiver no cache.
+    """
+    return get_cache().encode(texts, cache_id(model_name), lambda: get_model(model_name), batch_size=batch_size)
@@ -0,0 +1,417 @@
+# tools/onnx_backend.py
+# v1.1.0 - Backend ONNX (CPU) para os Modelos de Embedding
+#
+# OBJETIVO:
+# Rodar os modelos de EMBEDDING_MODELS como grafos ONNX no onnxruntime
+# (CPU), opcionalmente com quantização dinâmica int8, como alternativa ao
+# PyTorch. O backend é escolhido POR MODELO.
+#
+# REGRA DE ACEITAÇÃO:
+# Um backend só é carregado se o seu relatório de paridade (gerado por
+# 'parity') não tiver NENHUM veredito invertido nos thresholds 0.70/0.55
+# em relação ao PyTorch, no conjunto de referência (nome, domínio), E se
+# o relatório for do MESMO arquivo .onnx (sha256): um re-export invalida
+# a paridade anterior.
+#
+# USO (CLI):
+# $ python tools/onnx_backend.py export --model mpnet --quantize
+# $ python tools/onnx_backend.py parity --model mpnet --backend onnx-int8
+# $ export ACC_EMBEDDING_BACKENDS="all-mpnet-base-v2=onnx-int8"
+#
+# DEPENDÊNCIAS (opcionais): onnxruntime, onnx, transformers
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from model_registry import BACKENDS
+from validation_core import THRESHOLD_MIN_CROSS_PLATFORM, THRESHOLD_PASS
+
+# --- Configuração ---
+DEFAULT_ONNX_DIR = os.getenv("ACC_ONNX_DIR", str(Path.home() / ".cache" / "acc" / "onnx"))
+ONNX_OPSET = 14
+
+# Conjunto de referência (nome, domínio) para o relatório de paridade:
+# agentes reais de 'templates/', casos de teste do README e casos ruins.
+REFERENCE_PAIRS: List[Tuple[str, str]] = [
+    ("Hacker Semântico", "análise forense de APIs e ofertas de tecnologia"),
+    ("Hacker Semântico", "Análise de sistemas, ofertas tech e auditoria de APIs."),
+    ("Explorador de API", "Explorar API"),
+    ("explorador api", "explorar api"),
+    ("SecurityScanner Contínuo", "Análise estática de código para identificação de vulnerabilidades (OWASP)"),
+    ("CommitAssistant Proposital", "geração de mensagens de commit semânticas a partir de diffs"),
+    ("DependencyMapper Visualizador", "mapeamento de dependências entre módulos de código"),
+    ("TestGenerator Automático", "geração automática de testes unitários"),
+    ("StyleEnforcer Consistente", "verificação de estilo e padronização de código"),
+    ("Auditor de API", "auditoria de segurança de APIs REST"),
+    ("O Cara", "análise técnica"),
+    ("Assistente", "análise forense de APIs e ofertas de tecnologia"),
+    ("Hacker Semântico Forense Estrategista Especializado", "análise tech"),
+    ("Tradutor Técnico", "tradução de documentação de software"),
+]
+
+def _model_slug(model_name: str) -> str:
+    """Nome de diretório seguro para o modelo."""
+    return re.sub(r'[^\w.-]', '_', model_name)
+
+def export_dir(model_name: str, base_dir: str = DEFAULT_ONNX_DIR) -> Path:
+    """Diretório do export ONNX de 'model_name'."""
+    return Path(base_dir) / _model_slug(model_name)
+
+_ONNX_FILES = {'onnx': "model.onnx", 'onnx-int8': "model-int8.onnx"}
+
+def _onnx_file(backend: str) -> str:
+    """Arquivo do grafo de 'backend'. Backends desconhecidos são recusados."""
+    if backend not in _ONNX_FILES:
+        raise RuntimeError(f"Backend ONNX desconhecido: '{backend}' (use {', '.join(_ONNX_FILES)}).")
+    return _ONNX_FILES[backend]
+
+def file_sha256(path: Path) -> str:
+    """sha256 do arquivo (lido em blocos: os grafos têm centenas de MB)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _require(module: str) -> Any:
+    """Importa uma dependência opcional, com mensagem de instalação."""
+    try:
+        return __import__(module, fromlist=['_'])
+    except ImportError:
+        raise RuntimeError(f"Dependência opcional '{module}' ausente. Execute: pip install onnxruntime onnx transformers")
+
+# --- Parte A: Export (PyTorch -> ONNX) ---
+
+def export_model(model_name: str, quantize: bool = False, base_dir: str = DEFAULT_ONNX_DIR) -> Path:
+    """
+    Exporta o Transformer de um SentenceTransformer para ONNX (fp32) e,
+    opcionalmente, gera a variante int8 (quantização dinâmica dos pesos).
+
+    O pooling (mean) e a normalização são refeitos em numpy no
+    'OnnxEmbeddingModel', a partir dos metadados salvos em 'acc_onnx.json'.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st_model = SentenceTransformer(model_name, device='cpu')
+    transformer = st_model[0]
+    pooling = st_model[1]
+    if not getattr(pooling, 'pooling_mode_mean_tokens', False):
+        raise RuntimeError(f"Modelo '{model_name}' não usa mean pooling; export ONNX não suportado.")
+
+    target = export_dir(model_name, base_dir)
+    target.mkdir(parents=True, exist_ok=True)
+
+    class _EncoderWrapper(torch.nn.Module):
+        """Expõe apenas (input_ids, attention_mask) -> last_hidden_state."""
+        def __init__(self, auto_model):
+            super().__init__()
+            self.auto_model = auto_model
+
+        def forward(self, input_ids, attention_mask):
+            return self.auto_model(input_ids=input_ids, attention_mask=attention_mask, return_dict=False)[0]
+
+    dummy = st_model.tokenizer(["ACC export"], return_tensors='pt')
+    wrapper = _EncoderWrapper(transformer.auto_model).eval()
+    fp32_path = target / _onnx_file('onnx')
+
+    print(f"⏳ Exportando '{model_name}' para ONNX (opset {ONNX_OPSET})...", file=sys.stderr)
+    with torch.no_grad():
+        torch.onnx.export(
+            wrapper,
+            (dummy['input_ids'], dummy['attention_mask']),
+            str(fp32_path),
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['last_hidden_state'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'last_hidden_state': {0: 'batch', 1: 'sequence'},
+            },
+            opset_version=ONNX_OPSET
+        )
+
+    st_model.tokenizer.save_pretrained(str(target))
+    metadata = {
+        'model_name': model_name,
+        'max_seq_length': st_model.max_seq_length,
+        'normalize': any(type(m).__name__ == 'Normalize' for m in st_model),
+        'opset': ONNX_OPSET
+    }
+    (target / "acc_onnx.json").write_text(json.dumps(metadata, indent=2), encoding='utf-8')
+
+    if quantize:
+        quantization = _require('onnxruntime.quantization')
+        print(f"⏳ Quantizando '{model_name}' (int8 dinâmico)...", file=sys.stderr)
+        quantization.quantize_dynamic(
+            str(fp32_path),
+            str(target / _onnx_file('onnx-int8')),
+            weight_type=quantization.QuantType.QInt8
+        )
+
+    print(f"✅ Export salvo em {target}", file=sys.stderr)
+    return target
+
+# --- Parte B: Inferência (onnxruntime, CPU) ---
+
+class OnnxEmbeddingModel:
+    """
+    Modelo de embedding sobre onnxruntime com a mesma interface 'encode'
+    usada pelas ferramentas (subconjunto do SentenceTransformer).
+    """
+
+    def __init__(self, model_name: str, backend: str = 'onnx', base_dir: str = DEFAULT_ONNX_DIR):
+        ort = _require('onnxruntime')
+        transformers = _require('transformers')
+
+        self.model_name = model_name
+        self.backend = backend
+        self.path = export_dir(model_name, base_dir)
+        onnx_path = self.path / _onnx_file(backend)
+        if not onnx_path.is_file():
+            raise RuntimeError(
+                f"Export ONNX ausente: {onnx_path}. Execute: python tools/onnx_backend.py export "
+                f"--model {model_name}{' --quantize' if backend == 'onnx-int8' else ''}"
+            )
+
+        metadata = json.loads((self.path / "acc_onnx.json").read_text(encoding='utf-8'))
+        self.max_seq_length = metadata['max_seq_length']
+        self.normalize = metadata['normalize']
+        self.tokenizer = transformers.AutoTokenizer.from_pretrained(str(self.path))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(str(onnx_path), options, providers=['CPUExecutionProvider'])
+        stat = onnx_path.stat()
+        self._nbytes = stat.st_size
+        # Um re-export muda a versão e invalida o cache de embeddings (model_registry)
+        self.version = f"{backend}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def memory_bytes(self) -> int:
+        """RAM estimada dos pesos (tamanho do grafo ONNX)."""
+        return self._nbytes
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        **kwargs
+    ) -> np.ndarray:
+        """
+        Codifica 'sentences' (ordenadas por tamanho para reduzir padding).
+        Retorna um vetor (str) ou uma matriz n x d (lista), em float32.
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        embeddings: List[Optional[np.ndarray]] = [None] * len(texts)
+
+        for start in range(0, len(order), batch_size):
+            batch_idx = order[start:start + batch_size]
+            tokens = self.tokenizer(
+                [texts[i] for i in batch_idx],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors='np'
+            )
+            mask = tokens['attention_mask'].astype(np.int64)
+            hidden = self.session.run(None, {
+                'input_ids': tokens['input_ids'].astype(np.int64),
+                'attention_mask': mask
+            })[0]
+
+            # Mean pooling (ignora padding), como o Pooling do SentenceTransformer
+            weights = mask[..., None].astype(np.float32)
+            pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+            if self.normalize:
+                pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+            for i, vector in zip(batch_idx, pooled):
+                embeddings[i] = vector.astype(np.float32)
+
+        result = np.stack(embeddings) if embeddings else np.zeros((0, 0), dtype=np.float32)
+        return result[0] if single else result
+
+def parity_report_path(model_name: str, backend: str, base_dir: str = DEFAULT_ONNX_DIR) -> Path:
+    return export_dir(model_name, base_dir) / f"parity-{backend}.json"
+
+def load_onnx_model(model_name: str, backend: str, base_dir: str = DEFAULT_ONNX_DIR) -> OnnxEmbeddingModel:
+    """
+    Carrega o backend ONNX de 'model_name' SOMENTE se o relatório de paridade
+    existir, estiver aceito (nenhum veredito invertido) e tiver sido gerado
+    para o arquivo .onnx atual (mesmo sha256).
+    """
+    onnx_path = export_dir(model_name, base_dir) / _onnx_file(backend)
+    report_path = parity_report_path(model_name, backend, base_dir)
+    if not report_path.is_file():
+        raise RuntimeError(
+            f"Backend '{backend}' de '{model_name}' sem relatório de paridade. Execute: "
+            f"python tools/onnx_backend.py parity --model {model_name} --backend {backend}"
+        )
+    report = json.loads(report_path.read_text(encoding='utf-8'))
+    if not report.get('accepted'):
+        raise RuntimeError(
+            f"Backend '{backend}' de '{model_name}' REPROVADO na paridade "
+            f"({report.get('verdict_flips')} veredito(s) invertido(s)). Use o backend 'torch'."
+        )
+    if onnx_path.is_file() and report.get('onnx_sha256') != file_sha256(onnx_path):
+        raise RuntimeError(
+            f"O relatório de paridade de '{model_name}' ({backend}) não é do export atual ({onnx_path.name} "
+            f"mudou desde o 'parity'). Execute: python tools/onnx_backend.py parity --model {model_name} "
+            f"--backend {backend}"
+        )
+    return OnnxEmbeddingModel(model_name, backend, base_dir)
+
+# --- Parte C: Relatório de Paridade (ONNX vs. PyTorch) ---
+
+def _pair_sds(model: Any, pairs: List[Tuple[str, str]]) -> np.ndarray:
+    """SD (cosseno) de cada par (nome, domínio), em um único batch."""
+    texts = [t for pair in pairs for t in pair]
+    embeddings = np.asarray(model.encode(texts, convert_to_numpy=True), dtype=np.float64)
+    embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+    return np.einsum('ij,ij->i', embeddings[0::2], embeddings[1::2])
+
+def _flips(reference: float, candidate: float) -> List[float]:
+    """Thresholds em que o veredito do candidato difere do de referência."""
+    return [
+        threshold for threshold in (THRESHOLD_PASS, THRESHOLD_MIN_CROSS_PLATFORM)
+        if (reference >= threshold) != (candidate >= threshold)
+    ]
+
+def parity_report(
+    model_name: str,
+    backend: str,
+    pairs: List[Tuple[str, str]] = REFERENCE_PAIRS,
+    base_dir: str = DEFAULT_ONNX_DIR
+) -> Dict[str, Any]:
+    """
+    Compara as SDs do backend ONNX com as do PyTorch no conjunto de
+    referência e grava o relatório (com 'accepted' e o sha256 do grafo
+    avaliado) ao lado do export.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    onnx_model = OnnxEmbeddingModel(model_name, backend, base_dir)
+    onnx_sha256 = file_sha256(onnx_model.path / _onnx_file(backend))
+    torch_sds = _pair_sds(SentenceTransformer(model_name, device='cpu'), pairs)
+    onnx_sds = _pair_sds(onnx_model, pairs)
+    deviation = np.abs(onnx_sds - torch_sds)
+
+    rows = []
+    for (name, domain), sd_torch, sd_onnx in zip(pairs, torch_sds, onnx_sds):
+        rows.append({
+            'name': name,
+            'domain': domain,
+            'sd_torch': round(float(sd_torch), 5),
+            'sd_onnx': round(float(sd_onnx), 5),
+            'deviation': round(float(abs(sd_onnx - sd_torch)), 5),
+            'flipped_thresholds': _flips(float(sd_torch), float(sd_onnx))
+        })
+    flips = sum(1 for row in rows if row['flipped_thresholds'])
+
+    report = {
+        'model_name': model_name,
+        'backend': backend,
+        'onnx_file': _onnx_file(backend),
+        'onnx_sha256': onnx_sha256,
+        'pairs': len(pairs),
+        'max_abs_deviation': round(float(deviation.max()), 5),
+        'mean_abs_deviation': round(float(deviation.mean()), 5),
+        'verdict_flips': flips,
+        'accepted': flips == 0,
+        'thresholds': [THRESHOLD_PASS, THRESHOLD_MIN_CROSS_PLATFORM],
+        'rows': rows
+    }
+    parity_report_path(model_name, backend, base_dir).write_text(
+        json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8'
+    )
+    return report
+
+# --- Executor CLI ---
+
+def _resolve_model_name(model: str) -> str:
+    """Aceita a chave de EMBEDDING_MODELS (ex: 'mpnet') ou o nome completo."""
+    from validation_core import EMBEDDING_MODELS
+    return EMBEDDING_MODELS.get(model, model)
+
+def main():
+    """
+    Ponto de entrada do CLI.
+    """
+    parser = argparse.ArgumentParser(
+        description='Backend ONNX/int8 (CPU) para os modelos de embedding (ACC v1.1.0)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+==========================================
+FLUXO DE ADOÇÃO (por modelo)
+==========================================
+
+# 1. Exportar (e quantizar):
+$ python tools/onnx_backend.py export --model mpnet --quantize
+
+# 2. Validar a paridade (nenhum veredito invertido em 0.70/0.55):
+$ python tools/onnx_backend.py parity --model mpnet --backend onnx-int8
+
+# 3. Selecionar o backend:
+$ export ACC_EMBEDDING_BACKENDS="all-mpnet-base-v2=onnx-int8"
+"""
+    )
+    parser.add_argument('command', choices=['export', 'parity'])
+    parser.add_argument('--model', type=str, required=True,
+                        help='Chave de EMBEDDING_MODELS (ex: "mpnet") ou nome completo do modelo.')
+    parser.add_argument('--backend', type=str, choices=BACKENDS[1:], default='onnx',
+                        help='Backend avaliado no "parity" (Padrão: onnx).')
+    parser.add_argument('--quantize', action='store_true',
+                        help='No "export", gera também a variante int8.')
+    parser.add_argument('--pairs', type=str, default=None,
+                        help='JSONL/CSV de pares (name, domain) para o "parity" (Padrão: conjunto de referência).')
+    parser.add_argument('--onnx-dir', type=str, default=DEFAULT_ONNX_DIR,
+                        help=f'Diretório dos exports (Padrão: {DEFAULT_ONNX_DIR}).')
+
+    args = parser.parse_args()
+    model_name = _resolve_model_name(args.model)
+
+    try:
+        if args.command == 'export':
+            export_model(model_name, quantize=args.quantize, base_dir=args.onnx_dir)
+            return
+
+        pairs = REFERENCE_PAIRS
+        if args.pairs:
+            from validation_core import read_records
+            pairs = [(r['name'], r['domain']) for r in read_records(args.pairs) if r['name'] and r['domain']]
+        report = parity_report(model_name, args.backend, pairs, base_dir=args.onnx_dir)
+    except RuntimeError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"\n{'='*70}")
+    print(f"📊 PARIDADE: {model_name} ({args.backend} vs. torch)")
+    print(f"{'='*70}\n")
+    print(f"{'SD torch':<10} {'SD onnx':<10} {'Desvio':<10} Par")
+    print(f"{'-'*70}")
+    for row in report['rows']:
+        flag = " ❌ INVERTIDO" if row['flipped_thresholds'] else ""
+        print(f"{row['sd_torch']:<10.4f} {row['sd_onnx']:<10.4f} {row['deviation']:<10.5f} {row['name']} | {row['domain'][:30]}{flag}")
+    print(f"\nDesvio máximo: {report['max_abs_deviation']:.5f} | Desvio médio: {report['mean_abs_deviation']:.5f}")
+
+    if report['accepted']:
+        print(f"✅ ACEITO - Nenhum veredito invertido em {THRESHOLD_PASS}/{THRESHOLD_MIN_CROSS_PLATFORM}.")
+    else:
+        print(f"❌ REPROVADO - {report['verdict_flips']} veredito(s) invertido(s). Mantenha o backend 'torch'.")
+        sys.exit(1)
+    print(f"{'='*70}\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+# tools/prefork.py
+# v1.1.0 - Servidor Multi-Worker (Pre-Fork com Pesos Compartilhados)
+#
+# OBJETIVO:
+# Escalar 'api-endpoint.py' (ou 'template_generator.py') em N processos sem
+# N cópias dos modelos. O processo pai importa o app e carrega os modelos
+# UMA vez (o 'warmup' do app), congela o heap ('gc.freeze') e faz fork dos
+# workers, que aceitam conexões no MESMO socket. As páginas dos pesos ficam
+# compartilhadas (copy-on-write) entre todos os workers.
+#
+# FUNCIONAMENTO:
+# 1. (PRELOAD) Sem forward pass no pai: o pool de threads do torch só nasce
+#    nos workers (fork depois de usar OpenMP pode travar).
+# 2. (THREADS) Cada worker usa CPUs / N threads no torch.
+# 3. (SUPERVISÃO) Um worker que morre é recriado; SIGTERM/SIGINT encerram todos.
+# 4. (MEMÓRIA) 'memory' (ou SIGUSR1 no pai) lê /proc/<pid>/smaps_rollup e
+#    mostra, por worker, a memória única (USS) vs. compartilhada.
+#
+# USO (CLI):
+# $ python tools/prefork.py serve tools/api-endpoint.py --workers 16 --port 8000
+# $ python tools/prefork.py memory <pid do pai>
+
+import argparse
+import gc
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from tool_loader import load_tool
+
+# --- Configuração ---
+DEFAULT_WORKERS = int(os.getenv("ACC_WORKERS", str(os.cpu_count() or 1)))
+RESPAWN_DELAY_S = 1.0
+
+def load_app_module(path: str) -> Any:
+    """Importa o arquivo do app (o nome pode ter '-' ou espaço) sem rodar o main()."""
+    return load_tool(path)
+
+# --- Relatório de Memória (Linux /proc) ---
+
+def read_smaps_rollup(pid: int) -> Dict[str, int]:
+    """Campos de /proc/<pid>/smaps_rollup, em kB."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup", 'r') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[-1] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[-2])
+    return fields
+
+def child_pids(parent_pid: int) -> List[int]:
+    """PIDs dos processos filhos de 'parent_pid'."""
+    children = []
+    for entry in Path('/proc').iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / 'stat').read_text()
+        except OSError:
+            continue
+        if int(stat.rsplit(')', 1)[1].split()[1]) == parent_pid:
+            children.append(int(entry.name))
+    return sorted(children)
+
+def _process_memory(pid: int) -> Dict[str, Any]:
+    fields = read_smaps_rollup(pid)
+    uss = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    shared = fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0)
+    return {
+        'pid': pid,
+        'rss_mb': round(fields.get('Rss', 0) / 1024, 1),
+        'pss_mb': round(fields.get('Pss', 0) / 1024, 1),
+        'uss_mb': round(uss / 1024, 1),
+        'shared_mb': round(shared / 1024, 1)
+    }
+
+def memory_report(parent_pid: int) -> Dict[str, Any]:
+    """
+    Memória do pai e de cada worker. USS = páginas só daquele processo;
+    PSS divide as compartilhadas entre quem as usa (a soma dos PSS é a
+    memória real do conjunto).
+    """
+    parent = _process_memory(parent_pid)
+    workers = []
+    for pid in child_pids(parent_pid):
+        try:
+            workers.append(_process_memory(pid))
+        except OSError:
+            continue  # worker encerrado durante a leitura
+    everyone = [parent] + workers
+    return {
+        'parent': parent,
+        'workers': workers,
+        'total_pss_mb': round(sum(p['pss_mb'] for p in everyone), 1),
+        'total_rss_mb': round(sum(p['rss_mb'] for p in everyone), 1),
+        'total_uss_mb': round(sum(p['uss_mb'] for p in everyone), 1)
+    }
+
+def print_memory_report(report: Dict[str, Any]) -> None:
+    print(f"\n{'='*70}")
+    print(f"🧠 MEMÓRIA POR PROCESSO (pai {report['parent']['pid']}, {len(report['workers'])} workers)")
+    print(f"{'='*70}\n")
+    print(f"{'Processo':<16} {'RSS (MB)':>12} {'PSS (MB)':>12} {'USS (MB)':>12} {'Compart. (MB)':>14}")
+    print(f"{'-'*70}")
+    for label, proc in [('pai', report['parent'])] + [(f"worker {p['pid']}", p) for p in report['workers']]:
+        print(f"{label:<16} {proc['rss_mb']:>12.1f} {proc['pss_mb']:>12.1f} {proc['uss_mb']:>12.1f} {proc['shared_mb']:>14.1f}")
+    print(f"{'-'*70}")
+    print(f"Soma RSS: {report['total_rss_mb']:.1f} MB | Memória real (soma PSS): {report['total_pss_mb']:.1f} MB")
+    print(f"\n{'='*70}\n", flush=True)
+
+# --- Pre-Fork ---
+
+class PreforkServer:
+    """Processo pai: carrega o app, abre o socket e supervisiona os workers."""
+
+    def __init__(self, app_path: str, host: str, port: int, workers: int, log_level: str = 'warning'):
+        self.app_path = app_path
+        self.host = host
+        self.port = port
+        self.num_workers = workers
+        self.log_level = log_level
+        self.workers: Dict[int, int] = {}  # pid -> índice
+        self.stopping = False
+
+    def preload(self) -> Any:
+        """Importa o app e executa o warmup dele no pai (antes do fork)."""
+        # Os pesos devem morar neste processo (não em um daemon de scoring)
+        os.environ["ACC_SCORING_DAEMON"] = "0"
+        started = time.perf_counter()
+        module = load_app_module(self.app_path)
+        startup = getattr(module, 'STARTUP', None)
+        if startup is not None:
+            startup.preload()
+        # Objetos do preload saem do GC: as coletas dos workers não tocam
+        # (nem copiam) essas páginas
+        gc.collect()
+        gc.freeze()
+        print(f"✅ App carregado no pai em {time.perf_counter() - started:.2f}s "
+              f"({gc.get_freeze_count()} objetos congelados).", file=sys.stderr)
+        return module.app
+
+    def bind(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET6 if ':' in self.host else socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def spawn(self, index: int, app: Any, sock: socket.socket) -> None:
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = index
+            return
+        # --- Worker ---
+        code = 0
+        try:
+            signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+            if 'torch' in sys.modules:
+                sys.modules['torch'].set_num_threads(max(1, (os.cpu_count() or 1) // self.num_workers))
+            import uvicorn
+            config = uvicorn.Config(app, log_level=self.log_level, lifespan='on')
+            uvicorn.Server(config).run(sockets=[sock])
+        except BaseException as e:
+            print(f"❌ Worker {os.getpid()} falhou: {e}", file=sys.stderr)
+            code = 1
+        finally:
+            os._exit(code)
+
+    def stop(self, signum=None, frame=None) -> None:
+        self.stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        app = self.preload()
+        sock = self.bind()
+
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGUSR1, lambda signum, frame: print_memory_report(memory_report(os.getpid())))
+
+        for index in range(self.num_workers):
+            self.spawn(index, app, sock)
+        print(f"🚀 {self.num_workers} workers em http://{self.host}:{self.port} (pai {os.getpid()}; "
+              f"'kill -USR1 {os.getpid()}' mostra a memória).", file=sys.stderr)
+
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            index = self.workers.pop(pid, None)
+            if index is None or self.stopping:
+                continue
+            print(f"⚠️  Worker {pid} encerrou (status {status}); recriando.", file=sys.stderr)
+            time.sleep(RESPAWN_DELAY_S)
+            self.spawn(index, app, sock)
+
+        sock.close()
+        print("✅ Servidor encerrado.", file=sys.stderr)
+
+# --- Executor CLI ---
+
+def main():
+    """
+    Ponto de entrada do CLI.
+    """
+    parser = argparse.ArgumentParser(
+        description='Servidor Multi-Worker com pesos compartilhados (ACC v1.1.0)',
+        epilog="Exemplo: python tools/prefork.py serve tools/api-endpoint.py --workers 16"
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help='Carrega o app uma vez e faz fork dos workers.')
+    serve.add_argument('app', type=str, help='Arquivo do app FastAPI (ex: tools/api-endpoint.py).')
+    serve.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                       help=f'Número de workers (Padrão: {DEFAULT_WORKERS}).')
+    serve.add_argument('--host', type=str, default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8000)
+    serve.add_argument('--log-level', type=str, default='warning')
+
+    memory = commands.add_parser('memory', help='Memória única (USS) vs. compartilhada do pai e dos workers.')
+    memory.add_argument('pid', type=int, help='PID do processo pai.')
+    memory.add_argument('--json', action='store_true', help='Saída em JSON.')
+
+    args = parser.parse_args()
+
+    if not hasattr(os, 'fork') or not os.path.isdir('/proc'):
+        print("❌ O modo pre-fork requer Linux (fork + /proc).", file=sys.stderr)
+        sys.exit(1)
+
+    if args.command == 'memory':
+        try:
+            report = memory_report(args.pid)
+        except OSError as e:
+            print(f"❌ Não foi possível ler a memória do processo {args.pid}: {e}", file=sys.stderr)
+            sys.exit(1)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_memory_report(report)
+        return
+
+    PreforkServer(args.app, args.host, args.port, args.workers, args.log_level).run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+# tools/response_cache.py
+# v1.1.0 - Cache de Respostas do LLM (Record/Replay)
+#
+# OBJETIVO:
+# Re-execuções de suítes de teste de comportamento (cli-test.py) sem
+# mudanças não devem chamar o LLM remoto de novo. A chave é o hash de
+# (conteúdo do template, query, modelo, temperature/top_p/top_k).
+#
+# MODOS (ACC_RESPONSE_CACHE_MODE ou --cache-mode):
+# - record:  usa o cache se houver; senão chama o LLM e grava.
+# - replay:  só o cache; um miss é erro (execução offline e determinística).
+# - refresh: sempre chama o LLM e sobrescreve a entrada.
+# - off:     desativado (padrão): record/replay são opt-in.
+# Um valor inválido na variável de ambiente gera um aviso e cai no padrão.
+#
+# ARMAZENAMENTO:
+# Um arquivo JSON comprimido (zlib) por resposta em ACC_RESPONSE_CACHE_DIR.
+# Acima de ACC_RESPONSE_CACHE_MAX_BYTES, as entradas menos usadas (mtime)
+# são removidas.
+#
+# USO (CLI):
+# $ python tools/response_cache.py stats
+# $ python tools/response_cache.py clear
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+# --- Configuração ---
+DEFAULT_CACHE_DIR = os.getenv(
+    "ACC_RESPONSE_CACHE_DIR",
+    str(Path.home() / ".cache" / "acc" / "responses")
+)
+DEFAULT_MAX_BYTES = int(os.getenv("ACC_RESPONSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))  # 256 MB
+
+CACHE_MODES = ('record', 'replay', 'refresh', 'off')
+ENTRY_SUFFIX = ".json.z"
+
+def _mode_from_env(default: str = 'off') -> str:
+    """ACC_RESPONSE_CACHE_MODE; um modo inválido avisa e usa 'default'."""
+    mode = os.getenv("ACC_RESPONSE_CACHE_MODE", default).strip().lower()
+    if mode not in CACHE_MODES:
+        print(f"Aviso: ACC_RESPONSE_CACHE_MODE inválido ('{mode}'); usando '{default}' "
+              f"(use {', '.join(CACHE_MODES)}).", file=sys.stderr)
+        return default
+    return mode
+
+DEFAULT_MODE = _mode_from_env()
+
+class ReplayMiss(LookupError):
+    """Modo 'replay': a resposta não está no cache."""
+
+def response_key(
+    template_content: str,
+    user_query: str,
+    model_name: str,
+    generation_config: Dict[str, Any],
+    endpoint: Optional[str] = None
+) -> str:
+    """
+    Hash (sha256) determinístico de tudo que define a resposta do LLM.
+    'endpoint' separa as respostas de um servidor alternativo (ex: um stub).
+    """
+    fields = {
+        'template': template_content,
+        'query': user_query,
+        'model': model_name,
+        'temperature': generation_config.get('temperature'),
+        'top_p': generation_config.get('top_p'),
+        'top_k': generation_config.get('top_k')
+    }
+    if endpoint:
+        fields['endpoint'] = endpoint
+    payload = json.dumps(fields, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class ResponseCache:
+    """
+    Cache em disco de respostas do LLM, endereçado por conteúdo, com
+    limite de tamanho (LRU por mtime).
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        mode: str = DEFAULT_MODE,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Modo de cache inválido: '{mode}' (use {', '.join(CACHE_MODES)}).")
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.mode = mode if self.cache_dir is not None else 'off'
+        self.max_bytes = max_bytes
+        self._total_bytes: Optional[int] = None
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{ENTRY_SUFFIX}"
+
+    def _entries(self):
+        return self.cache_dir.glob(f"*/*{ENTRY_SUFFIX}") if self.cache_dir and self.cache_dir.is_dir() else []
+
+    def get(self, key: str) -> Optional[str]:
+        """Resposta gravada para 'key' (None em caso de miss ou modo refresh/off)."""
+        if self.mode in ('off', 'refresh'):
+            return None
+        path = self._path(key)
+        try:
+            entry = json.loads(zlib.decompress(path.read_bytes()).decode('utf-8'))
+        except FileNotFoundError:
+            entry = None
+        except (OSError, zlib.error, ValueError):
+            # Entrada corrompida (ex: escrita interrompida): trata como miss.
+            path.unlink(missing_ok=True)
+            entry = None
+
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        try:
+            os.utime(path)  # LRU: marca como usada agora
+        except OSError:
+            pass
+        return entry['response']
+
+    def put(self, key: str, response: str, meta: Optional[Dict[str, Any]] = None) -> None:
+        """Grava a resposta (modos record/refresh) e aplica o limite de tamanho."""
+        if self.mode not in ('record', 'refresh'):
+            return
+        path = self._path(key)
+        data = zlib.compress(json.dumps(
+            {'response': response, 'created': time.time(), **(meta or {})}, ensure_ascii=False
+        ).encode('utf-8'), 9)
+        try:
+            previous = path.stat().st_size if path.exists() else 0
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Escrita atômica: outro processo nunca lê um arquivo pela metade.
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Aviso: Falha ao gravar cache de respostas: {e}", file=sys.stderr)
+            return
+        self.stats['writes'] += 1
+
+        if self._total_bytes is None:
+            self._total_bytes = sum(p.stat().st_size for p in self._entries())
+        else:
+            self._total_bytes += len(data) - previous
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Remove as entradas menos usadas até caber em 'max_bytes'."""
+        entries = []
+        for p in self._entries():
+            try:
+                stat = p.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, p))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in entries:
+            if total <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+            self.stats['evictions'] += 1
+        self._total_bytes = total
+
+    def call(
+        self,
+        template_content: str,
+        user_query: str,
+        model_name: str,
+        generation_config: Dict[str, Any],
+        generate: Callable[[], str]
+    ) -> str:
+        """
+        Resposta do cache (conforme o modo) ou de 'generate()', gravando-a.
+        Lança 'ReplayMiss' no modo replay quando não há entrada.
+        """
+        key = response_key(template_content, user_query, model_name, generation_config)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        if self.mode == 'replay':
+            raise ReplayMiss(f"Resposta não gravada (modo replay): modelo '{model_name}', chave {key[:12]}.")
+        response = generate()
+        self.put(key, response, {'model': model_name, 'query': user_query})
+        return response
+
+    def clear(self) -> int:
+        """Apaga todas as entradas. Retorna quantas foram removidas."""
+        removed = 0
+        for p in list(self._entries()):
+            p.unlink(missing_ok=True)
+            removed += 1
+        self._total_bytes = 0
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de hit/miss e ocupação do disco."""
+        sizes = [p.stat().st_size for p in self._entries()]
+        return {
+            **self.stats,
+            'mode': self.mode,
+            'entries': len(sizes),
+            'bytes': sum(sizes),
+            'max_bytes': self.max_bytes,
+            'cache_dir': str(self.cache_dir) if self.cache_dir else None
+        }
+
+# --- Executor CLI ---
+
+def main():
+    """
+    Ponto de entrada do CLI (inspeção e limpeza do cache em disco).
+    """
+    parser = argparse.ArgumentParser(
+        description='Cache de Respostas do LLM (ACC v1.1.0)',
+        epilog="Exemplo: python tools/response_cache.py stats"
+    )
+    parser.add_argument('command', choices=['stats', 'clear'],
+                        help='"stats" mostra o uso do disco; "clear" apaga todas as entradas.')
+    parser.add_argument('--cache-dir', type=str, default=DEFAULT_CACHE_DIR,
+                        help=f'Diretório do cache (Padrão: {DEFAULT_CACHE_DIR}).')
+
+    args = parser.parse_args()
+    cache = ResponseCache(cache_dir=args.cache_dir, mode='record')
+
+    if args.command == 'clear':
+        print(f"✅ Cache limpo: {cache.clear()} resposta(s) removida(s).")
+        return
+    print(json.dumps(cache.get_stats(), indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+# tools/scoring_daemon.py
+# v1.1.0 - Daemon de Scoring (Modelos Quentes em um Unix Socket)
+#
+# OBJETIVO:
+# Cada execução dos CLIs (semantic-density-calculator.py, alignment_visualizer.py,
+# strategy_generator.py) importa o torch e recarrega os modelos: segundos
+# de startup para um cosseno de microssegundos. O daemon mantém os modelos
+# carregados e responde 'encode' por um Unix domain socket.
+#
+# FUNCIONAMENTO:
+# 1. (TRANSPARENTE) O loader do 'model_registry' tenta o daemon primeiro: se
+#    o socket responde, o "modelo" é um 'RemoteModel' (sem torch no cliente).
+#    Sem daemon, a carga local segue como antes.
+# 2. (FALLBACK) Se o daemon cair no meio da execução, o 'RemoteModel' carrega
+#    o modelo local e continua.
+# 3. (PROTOCOLO) Frames com prefixo de tamanho: cabeçalho JSON + embeddings
+#    float32 em binário. Conexão persistente por cliente; cada requisição
+#    leva um 'id', ecoado na resposta. Um cliente que perde a sincronia
+#    (timeout, queda) é descartado e o próximo 'get_client' reconecta.
+#
+# CONFIGURAÇÃO (Variáveis de Ambiente):
+# ACC_SCORING_SOCKET - Caminho do socket (Padrão: ~/.cache/acc/scoring.sock).
+# ACC_SCORING_DAEMON - "0" desativa o uso do daemon pelos CLIs.
+#
+# USO (CLI):
+# $ python tools/scoring_daemon.py start &
+# $ python tools/scoring_daemon.py status
+# $ python tools/scoring_daemon.py stop
+
+import argparse
+import functools
+import json
+import os
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# --- Configuração ---
+DEFAULT_SOCKET = os.getenv(
+    "ACC_SCORING_SOCKET",
+    str(Path.home() / ".cache" / "acc" / "scoring.sock")
+)
+CONNECT_TIMEOUT_S = 0.2
+REQUEST_TIMEOUT_S = 300.0
+
+_FRAME = struct.Struct('!I')
+
+def daemon_enabled() -> bool:
+    """Os CLIs usam o daemon, a menos que ACC_SCORING_DAEMON=0."""
+    return os.getenv("ACC_SCORING_DAEMON", "1") != "0"
+
+# --- Protocolo ---
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks, remaining = [], size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Conexão encerrada pelo outro lado.")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+def send_message(sock: socket.socket, header: Dict[str, Any], payload: bytes = b"") -> None:
+    """Envia um frame: tamanho + cabeçalho JSON, tamanho + payload binário."""
+    data = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    sock.sendall(_FRAME.pack(len(data)) + data + _FRAME.pack(len(payload)) + payload)
+
+def recv_message(sock: socket.socket) -> Tuple[Dict[str, Any], bytes]:
+    """Recebe um frame enviado por 'send_message'."""
+    header = json.loads(_recv_exact(sock, _FRAME.unpack(_recv_exact(sock, _FRAME.size))[0]))
+    payload = _recv_exact(sock, _FRAME.unpack(_recv_exact(sock, _FRAME.size))[0])
+    return header, payload
+
+# --- Cliente ---
+
+class DaemonClient:
+    """
+    Conexão persistente com o daemon (thread-safe: uma requisição por vez).
+    Cada requisição leva um 'id' que o daemon devolve na resposta. Qualquer
+    falha entre o envio e a resposta (timeout, conexão caída, 'id' trocado)
+    deixa o stream fora de sincronia: o cliente é fechado e descartado.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, timeout_s: float = CONNECT_TIMEOUT_S):
+        self.socket_path = socket_path
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout_s)
+        self._sock.connect(socket_path)
+        self._sock.settimeout(REQUEST_TIMEOUT_S)
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self.closed = False
+
+    def request(self, header: Dict[str, Any]) -> Tuple[Dict[str, Any], bytes]:
+        with self._lock:
+            if self.closed:
+                raise ConnectionError("Cliente do daemon de scoring já encerrado.")
+            self._next_id += 1
+            request_id = self._next_id
+            try:
+                send_message(self._sock, {**header, 'id': request_id})
+                response, payload = recv_message(self._sock)
+                if response.get('id') != request_id:
+                    raise ConnectionError(
+                        f"Resposta fora de ordem do daemon (id {response.get('id')!r}, esperado {request_id})."
+                    )
+            except BaseException:
+                discard_client(self)
+                raise
+        if not response.get('ok'):
+            raise RuntimeError(f"Daemon de scoring: {response.get('error')}")
+        return response, payload
+
+    def encode(self, model_name: str, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        response, payload = self.request({'op': 'encode', 'model': model_name,
+                                          'texts': list(texts), 'batch_size': batch_size})
+        return np.frombuffer(payload, dtype=np.float32).reshape(response['shape'])
+
+    def close(self) -> None:
+        self.closed = True
+        self._sock.close()
+
+_CLIENT: Optional[DaemonClient] = None
+_CLIENT_LOCK = threading.Lock()
+
+def get_client(socket_path: str = DEFAULT_SOCKET) -> Optional[DaemonClient]:
+    """Cliente compartilhado do processo, ou None se o daemon não está rodando."""
+    global _CLIENT
+    if not daemon_enabled() or not os.path.exists(socket_path):
+        return None
+    with _CLIENT_LOCK:
+        if _CLIENT is None or _CLIENT.closed or _CLIENT.socket_path != socket_path:
+            try:
+                _CLIENT = DaemonClient(socket_path)
+            except OSError:
+                _CLIENT = None
+        return _CLIENT
+
+def discard_client(client: DaemonClient) -> None:
+    """Fecha 'client' e, se for o compartilhado, faz o próximo 'get_client' reconectar."""
+    global _CLIENT
+    client.close()
+    with _CLIENT_LOCK:
+        if _CLIENT is client:
+            _CLIENT = None
+
+class RemoteModel:
+    """
+    "Modelo" servido pelo daemon, com a interface de 'encode' do
+    SentenceTransformer. Se o daemon cair, carrega o modelo local.
+    """
+
+    def __init__(self, model_name: str, client: DaemonClient, local_loader=None):
+        self.model_name = model_name
+        self.client = client
+        self._local_loader = local_loader
+        self._local = None
+
+    def encode(self, sentences, batch_size: int = 32, convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if self._local is None:
+            try:
+                embeddings = self.client.encode(self.model_name, texts, batch_size)
+                return embeddings[0] if single else embeddings
+            except (OSError, ConnectionError) as e:
+                discard_client(self.client)
+                if self._local_loader is None:
+                    raise
+                print(f"⚠️  Daemon de scoring indisponível ({e}); carregando '{self.model_name}' localmente.",
+                      file=sys.stderr)
+                self._local = self._local_loader(self.model_name)
+        return self._local.encode(sentences, batch_size=batch_size, convert_to_numpy=True, **kwargs)
+
+    def memory_bytes(self) -> int:
+        # Os pesos vivem no daemon (ou, após o fallback, no processo)
+        return 0 if self._local is None else _local_nbytes(self._local)
+
+def _local_nbytes(model: Any) -> int:
+    from model_registry import model_nbytes
+    return model_nbytes(model)
+
+def remote_model(model_name: str, backend: str, local_loader=None) -> Optional[RemoteModel]:
+    """
+    'RemoteModel' para 'model_name' se o daemon está rodando com o mesmo
+    backend; senão None (o chamador carrega o modelo localmente).
+    """
+    # Um cliente compartilhado velho (ex: o daemon reiniciou) falha no
+    # 'hello': ele é descartado e a conexão é refeita uma única vez.
+    for _ in range(2):
+        client = get_client()
+        if client is None:
+            return None
+        try:
+            client.request({'op': 'hello', 'model': model_name, 'backend': backend})
+        except (OSError, ConnectionError):
+            discard_client(client)
+            continue
+        except RuntimeError:
+            return None
+        return RemoteModel(model_name, client, local_loader)
+    return None
+
+# --- Servidor ---
+
+class _Handler(socketserver.BaseRequestHandler):
+    """Atende uma conexão (várias requisições em sequência)."""
+
+    def _reply(self, request_id: Any, header: Dict[str, Any], payload: bytes = b"") -> None:
+        send_message(self.request, {**header, 'id': request_id}, payload)
+
+    def handle(self):
+        from model_registry import backend_for, encode, get_registry
+        while True:
+            try:
+                header, _ = recv_message(self.request)
+            except (ConnectionError, OSError, ValueError):
+                return
+
+            op = header.get('op')
+            # Toda resposta ecoa o 'id' da requisição (o cliente confere)
+            reply = functools.partial(self._reply, header.get('id'))
+            try:
+                if op == 'encode':
+                    embeddings = np.ascontiguousarray(
+                        encode(header['model'], header['texts'], header.get('batch_size', 32)), dtype=np.float32
+                    )
+                    self.server.stats['requests'] += 1
+                    self.server.stats['texts'] += len(header['texts'])
+                    reply({'ok': True, 'shape': list(embeddings.shape)}, embeddings.tobytes())
+                elif op == 'hello':
+                    backend = backend_for(header['model'])
+                    if header.get('backend', backend) != backend:
+                        raise ValueError(f"backend '{backend}' no daemon, '{header['backend']}' no cliente.")
+                    reply({'ok': True, 'pid': os.getpid()})
+                elif op == 'status':
+                    reply({
+                        'ok': True, 'pid': os.getpid(), 'uptime_s': round(time.time() - self.server.started, 1),
+                        'models': get_registry().loaded(), **self.server.stats
+                    })
+                elif op == 'shutdown':
+                    reply({'ok': True})
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    return
+                else:
+                    raise ValueError(f"operação desconhecida: {op!r}")
+            except (ConnectionError, BrokenPipeError):
+                return
+            except Exception as e:
+                reply({'ok': False, 'error': str(e)})
+
+class ScoringServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str):
+        self.started = time.time()
+        self.stats = {'requests': 0, 'texts': 0}
+        super().__init__(socket_path, _Handler)
+        os.chmod(socket_path, 0o600)
+
+def serve(socket_path: str = DEFAULT_SOCKET, model_names: Optional[List[str]] = None) -> None:
+    """Carrega os modelos e atende no socket até 'stop' (ou Ctrl+C)."""
+    # O próprio daemon nunca deve se usar como backend
+    os.environ["ACC_SCORING_DAEMON"] = "0"
+    from model_registry import get_registry
+
+    if os.path.exists(socket_path):
+        try:
+            DaemonClient(socket_path).close()
+            print(f"❌ Já existe um daemon em {socket_path}.", file=sys.stderr)
+            sys.exit(1)
+        except OSError:
+            os.unlink(socket_path)  # socket órfão de um daemon anterior
+    Path(socket_path).parent.mkdir(parents=True, exist_ok=True)
+
+    if model_names:
+        get_registry().warmup(model_names)
+
+    server = ScoringServer(socket_path)
+    print(f"✅ Daemon de scoring pronto em {socket_path} (pid {os.getpid()}).", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        print("✅ Daemon de scoring encerrado.", file=sys.stderr)
+
+# --- Executor CLI ---
+
+def main():
+    """
+    Ponto de entrada do CLI.
+    """
+    parser = argparse.ArgumentParser(
+        description='Daemon de Scoring (ACC v1.1.0) - modelos quentes em um Unix socket',
+        epilog="Exemplo: python tools/scoring_daemon.py start &"
+    )
+    parser.add_argument('command', choices=['start', 'status', 'stop'],
+                        help='"start" roda o daemon (em primeiro plano); "status"/"stop" falam com ele.')
+    parser.add_argument('--socket', type=str, default=DEFAULT_SOCKET,
+                        help=f'Caminho do socket (Padrão: {DEFAULT_SOCKET}).')
+    parser.add_argument('--models', type=str, nargs='*', default=None,
+                        help='Modelos a pré-carregar (Padrão: os de validation_core.EMBEDDING_MODELS).')
+
+    args = parser.parse_args()
+
+    if args.command == 'start':
+        if args.models is None:
+            from validation_core import EMBEDDING_MODELS
+            args.models = list(EMBEDDING_MODELS.values())
+        serve(args.socket, args.models)
+        return
+
+    try:
+        client = DaemonClient(args.socket)
+        response, _ = client.request({'op': args.command if args.command == 'status' else 'shutdown'})
+    except OSError:
+        print(f"❌ Nenhum daemon respondendo em {args.socket}.", file=sys.stderr)
+        sys.exit(1)
+    if args.command == 'status':
+        response.pop('ok', None)
+        response.pop('id', None)
+        print(json.dumps(response, indent=2, ensure_ascii=False))
+    else:
+        print("✅ Daemon de scoring encerrando.")
+
+if __name__ == "__main__":
+    main()
@@ -8,11 +8,13 @@
 # 2. (EFICIÊNCIA) Modelos são carregados UMA VEZ no início do benchmark, não em cada loop.
 # 3. (MANUTENÇÃO) Thresholds definidos como constantes globais.
 
-from sentence_transformers import SentenceTransformer, util
 import sys
 import argparse
 import time
 
+from embedding_cache import get_cache, cosine_matrix
+from model_registry import cache_id, get_registry
+
 # --- Constantes de Validação (A "Ciência" do ACC) ---
 EMBEDDING_MODELS = {
     'miniLM': 'all-MiniLM-L6-v2',                # Leve, rápido
@@ -23,7 +25,7 @@ THRESHOLD_PASS = 0.70  # Threshold principal para SD (Cosine Sim)
 THRESHOLD_MIN_CROSS_PLATFORM = 0.55 # Mínimo aceitável em benchmark
 THRESHOLD_MINIMALISM = 3 # Número máximo de palavras no Nome do Agente
 
-def calculate_sd(name: str, domain: str, model: SentenceTransformer):
+def calculate_sd(name: str, domain: str, model, model_name: str = None):
     """
     Calcula a Densidade Semântica (SD) e o Minimalismo.
     
@@ -34,14 +36,18 @@ def calculate_sd(name: str, domain: str, model: SentenceTransformer):
         name: Nome do agente (ex: "Hacker Semântico")
         domain: Domínio alvo (ex: "análise forense ofertas tech")
         model: O *objeto* do modelo SentenceTransformer já carregado.
+        model_name: Nome do modelo (ex: "all-MiniLM-L6-v2"). Se informado,
+            as embeddings passam pelo cache compartilhado (embedding_cache).
         
     Returns:
         tuple: (sd, word_count)
     """
-    embed_name = model.encode(name, convert_to_tensor=True)
-    embed_domain = model.encode(domain, convert_to_tensor=True)
+    if model_name:
+        embeddings = get_cache().encode([name, domain], cache_id(model_name), model)
+    else:
+        embeddings = model.encode([name, domain], convert_to_numpy=True)
     
-    cosine_sim = util.cos_sim(embed_name, embed_domain)[0][0].item()
+    cosine_sim = float(cosine_matrix(embeddings[0], embeddings[1])[0][0])
     word_count = len(name.split())
     
     # SD é a Similaridade de Cossenos.
@@ -65,8 +71,9 @@ def run_benchmark(name, domain):
     start_load = time.time()
     # Carrega todos os modelos UMA VEZ
     try:
+        models = get_registry().warmup(EMBEDDING_MODELS.values())
         loaded_models = {
-            key: SentenceTransformer(model_name) 
+            key: models[model_name]
             for key, model_name in EMBEDDING_MODELS.items()
         }
     except Exception as e:
@@ -81,7 +88,7 @@ def run_benchmark(name, domain):
     word_count = 0
     for key, model in loaded_models.items():
         print(f"Testando modelo: {key} ({EMBEDDING_MODELS[key]})...")
-        sd, wc = calculate_sd(name, domain, model)
+        sd, wc = calculate_sd(name, domain, model, EMBEDDING_MODELS[key])
         if word_count == 0:
             word_count = wc # Pega a contagem de palavras (só precisa ser 1 vez)
             
@@ -198,7 +205,7 @@ $ python tools/semantic-density-calculator.py "Hacker Semântico Forense Estrate
         model_name = EMBEDDING_MODELS[args.model]
         print(f"⏳ Carregando modelo: {args.model} ({model_name})...")
         try:
-            model = SentenceTransformer(model_name)
+            model = get_registry().get(model_name)
         except Exception as e:
             print(f"\n❌ ERRO FATAL: Falha ao carregar modelo. Verifique a instalação 'sentence-transformers'.")
             print(f"Detalhe: {e}")
@@ -206,7 +213,7 @@ $ python tools/semantic-density-calculator.py "Hacker Semântico Forense Estrate
             
         print("✅ Modelo carregado.")
         
-        sd, words = calculate_sd(args.name, args.domain, model)
+        sd, words = calculate_sd(args.name, args.domain, model, model_name)
         
         print(f"\n{'='*70}")
         print(f"📊 RESULTADO SIMPLES (Padrão ACC)")
@@ -0,0 +1,254 @@
+# tools/serving.py
+# v1.1.0 - Infraestrutura Comum dos Servidores (FastAPI)
+#
+# OBJETIVO:
+# Manter o event loop do uvicorn livre: trabalho CPU-bound (encode,
+# tokenização) roda em um pool de threads LIMITADO, e o excesso de carga
+# é recusado rápido (503 + Retry-After) em vez de enfileirar sem fim.
+#
+# CONFIGURAÇÃO (Variáveis de Ambiente):
+# ACC_WORKER_THREADS  - Threads do pool de inferência (Padrão: min(4, CPUs)).
+# ACC_MAX_IN_FLIGHT   - Máximo de requisições /api/ simultâneas (Padrão: 64).
+# ACC_RETRY_AFTER_S   - Valor do header Retry-After no 503 (Padrão: 1).
+# ACC_PREWARM         - Pré-carrega modelos/tokenizer em background depois
+#                       do startup; a readiness espera o fim (Padrão: "1").
+#                       "0" desliga: pronto logo no startup, e o modelo
+#                       carrega na primeira requisição.
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+# --- Configuração ---
+DEFAULT_WORKER_THREADS = int(os.getenv("ACC_WORKER_THREADS", str(min(4, os.cpu_count() or 1))))
+DEFAULT_MAX_IN_FLIGHT = int(os.getenv("ACC_MAX_IN_FLIGHT", "64"))
+DEFAULT_RETRY_AFTER_S = int(os.getenv("ACC_RETRY_AFTER_S", "1"))
+DEFAULT_PREWARM = os.getenv("ACC_PREWARM", "1") != "0"
+
+_IMPORTED_AT = time.time()
+
+# --- Pool de Inferência (compartilhado pelo processo) ---
+
+_WORKER_POOL: Optional[ThreadPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+def get_worker_pool() -> ThreadPoolExecutor:
+    """Pool de threads limitado para trabalho CPU-bound (criado sob demanda)."""
+    global _WORKER_POOL
+    if _WORKER_POOL is None:
+        with _POOL_LOCK:
+            if _WORKER_POOL is None:
+                _WORKER_POOL = ThreadPoolExecutor(
+                    max_workers=DEFAULT_WORKER_THREADS,
+                    thread_name_prefix='acc-worker'
+                )
+    return _WORKER_POOL
+
+async def run_in_pool(fn: Callable[..., Any], *args: Any) -> Any:
+    """Executa 'fn(*args)' no pool de inferência, sem bloquear o event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_worker_pool(), fn, *args)
+
+# --- Controle de Admissão ---
+
+class AdmissionController:
+    """
+    Limita as requisições em andamento. Acima do limite, a resposta é um
+    503 imediato com Retry-After (o cliente tenta de novo mais tarde).
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        retry_after_s: int = DEFAULT_RETRY_AFTER_S
+    ):
+        self.max_in_flight = max_in_flight
+        self.retry_after_s = retry_after_s
+        self.in_flight = 0
+        self.stats = {'admitted': 0, 'rejected': 0, 'max_in_flight_seen': 0}
+
+    def try_acquire(self) -> bool:
+        """Reserva uma vaga. Retorna False se o limite foi atingido."""
+        # Roda no event loop (thread única): não precisa de lock.
+        if self.in_flight >= self.max_in_flight:
+            self.stats['rejected'] += 1
+            return False
+        self.in_flight += 1
+        self.stats['admitted'] += 1
+        self.stats['max_in_flight_seen'] = max(self.stats['max_in_flight_seen'], self.in_flight)
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, 'in_flight': self.in_flight, 'max_in_flight': self.max_in_flight}
+
+class AdmissionMiddleware:
+    """
+    Middleware ASGI do controle de admissão. A vaga só é liberada quando a
+    resposta termina de verdade (último 'http.response.body', desconexão do
+    cliente ou erro), e não quando os headers saem (como no middleware
+    '@app.middleware("http")'): respostas em streaming
+    (NDJSON do lote, ZIP da exportação) contam até o último byte.
+    """
+
+    def __init__(self, app: Any, controller: AdmissionController, path_prefix: str = "/api/"):
+        self.app = app
+        self.controller = controller
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope['type'] != 'http' or not scope['path'].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+        controller = self.controller
+        if not controller.try_acquire():
+            response = JSONResponse(
+                status_code=503,
+                content={'detail': f"Servidor ocupado ({controller.max_in_flight} requisições em andamento). Tente novamente."},
+                headers={'Retry-After': str(controller.retry_after_s)}
+            )
+            await response(scope, receive, send)
+            return
+
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                controller.release()
+
+        async def send_until_done(message: Dict[str, Any]) -> None:
+            await send(message)
+            if message['type'] == 'http.response.body' and not message.get('more_body', False):
+                release()
+
+        try:
+            # O app só retorna depois do corpo inteiro, ou quando o streaming é
+            # cancelado pela desconexão do cliente
+            await self.app(scope, receive, send_until_done)
+        finally:
+            release()
+
+def install_admission_control(
+    app: FastAPI,
+    controller: Optional[AdmissionController] = None,
+    path_prefix: str = "/api/"
+) -> AdmissionController:
+    """
+    Aplica o controle de admissão às rotas que começam com 'path_prefix'.
+    Rotas fora do prefixo (health checks, docs) nunca são recusadas.
+    """
+    controller = controller or AdmissionController()
+    app.add_middleware(AdmissionMiddleware, controller=controller, path_prefix=path_prefix)
+    return controller
+
+# --- Sondas de Saúde (Liveness / Readiness) ---
+
+def process_started_at() -> float:
+    """Instante (epoch) em que o processo começou (Linux: /proc; senão, o import deste módulo)."""
+    try:
+        with open('/proc/self/stat', 'r') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        uptime = time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf('SC_CLK_TCK')
+        return time.time() - uptime
+    except (OSError, ValueError, IndexError, AttributeError):
+        return _IMPORTED_AT
+
+class StartupState:
+    """
+    Estado do startup: 'off' (prewarm desligado: pronto logo após o startup),
+    'running', 'done' ou 'error'. Só 'off'/'done' contam como prontos.
+    'startup_at' é o hook de startup do app (lifespan), que roda ANTES de
+    o uvicorn abrir o socket: não é o instante do bind.
+    """
+
+    def __init__(self, warmup: Optional[Callable[[], Any]] = None):
+        self.status = 'off'
+        self.warmup = warmup
+        self.error: Optional[str] = None
+        self.started_at = process_started_at()
+        self.startup_at: Optional[float] = None
+        self.ready_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.startup_at is not None and self.status in ('off', 'done')
+
+    def prewarm(self, warmup: Callable[[], Any]) -> None:
+        """Executa 'warmup' (em uma thread de background)."""
+        self.status = 'running'
+        print("⏳ Prewarm em andamento...", file=sys.stderr)
+        try:
+            warmup()
+        except Exception as e:
+            self.status, self.error = 'error', str(e)
+            print(f"❌ Prewarm falhou: {e}", file=sys.stderr)
+            return
+        self.status, self.ready_at = 'done', time.time()
+        print(f"✅ Prewarm concluído em {self.ready_at - self.startup_at:.2f}s.", file=sys.stderr)
+
+    def preload(self) -> None:
+        """
+        Executa o 'warmup' ANTES do servidor (ex: no processo pai do modo
+        pre-fork, 'prefork.py'); o startup não repete o prewarm.
+        """
+        if self.warmup is not None:
+            self.warmup()
+        self.status = 'done'
+
+    def get_stats(self) -> Dict[str, Any]:
+        def since_start(t: Optional[float]) -> Optional[float]:
+            return round(t - self.started_at, 3) if t is not None else None
+        return {
+            'ready': self.ready,
+            'prewarm': self.status,
+            'error': self.error,
+            'startup_s': since_start(self.startup_at),
+            'ready_s': since_start(self.ready_at)
+        }
+
+def install_health_probes(
+    app: FastAPI,
+    warmup: Optional[Callable[[], Any]] = None,
+    prewarm: bool = DEFAULT_PREWARM
+) -> StartupState:
+    """
+    Registra '/healthz' (liveness: o processo responde) e '/readyz'
+    (readiness: 503 até o prewarm terminar). Com 'prewarm' (o padrão),
+    'warmup()' roda em background logo após o startup, sem atrasar o
+    servidor: um orquestrador só manda tráfego com o modelo carregado.
+    """
+    state = StartupState(warmup)
+
+    async def on_startup():
+        state.startup_at = time.time()
+        if prewarm and warmup is not None and state.status == 'off':
+            state.status = 'running'
+            threading.Thread(target=state.prewarm, args=(warmup,), name='acc-prewarm', daemon=True).start()
+        else:
+            state.ready_at = state.startup_at
+
+    app.router.on_startup.append(on_startup)
+
+    @app.get("/healthz", include_in_schema=False)
+    async def healthz():
+        return {'status': 'ok'}
+
+    @app.get("/readyz", include_in_schema=False)
+    async def readyz():
+        stats = state.get_stats()
+        if not state.ready:
+            return JSONResponse(status_code=503, content=stats, headers={'Retry-After': str(DEFAULT_RETRY_AFTER_S)})
+        return stats
+
+    return state
@@ -7,10 +7,17 @@
 #    diretamente do 'alignment_visualizer.py'.
 # 3. (FLUXO) Foca em ser o Passo 1: "Gerar" candidatos para 
 #    o Passo 2: "Validar" com o 'semantic-density-calculator.py'.
+# 4. (SCORE) '--score' une os dois passos: gera, codifica todos os
+#    candidatos + domínio em batches e devolve o top-k por SD média, podando
+#    candidatos reprovados (cascata) ou que já não alcançam o top-k.
 
+import heapq
 import sys
 import argparse
-from typing import List, Set
+from itertools import combinations
+from typing import Any, Dict, List, Set
+
+import numpy as np
 
 # --- Importação Cirúrgica ---
 # Importa a lógica "Canivete" de extração de SINAL do 
@@ -22,7 +29,18 @@ except ImportError:
     print("Certifique-se que 'alignment_visualizer.py' está no mesmo diretório.", file=sys.stderr)
     sys.exit(1)
 
-def generate_name_candidates(name_base: str, domain: str, top_n: int = 5) -> List[str]:
+import model_registry
+from validation_core import (
+    EMBEDDING_MODELS, THRESHOLD_MIN_CROSS_PLATFORM, THRESHOLD_MINIMALISM,
+    best_possible_mean, build_verdict, cascade_decided, cascade_order, mark_evaluated
+)
+
+def generate_name_candidates(
+    name_base: str,
+    domain: str,
+    top_n: int = 5,
+    keyword_pairs: bool = False
+) -> List[str]:
     """
     Gera uma lista de nomes candidatos para o Agente, combinando o
     Nome Base com as keywords "SINAL" (Técnico/Ação/Domínio) do Domínio.
@@ -33,6 +51,8 @@ def generate_name_candidates(name_base: str, domain: str, top_n: int = 5) -> Lis
         name_base (str): O nome raiz (ex: "Hacker")
         domain (str): O texto completo do domínio alvo.
         top_n (int): O número de keywords principais a usar (padrão 5).
+        keyword_pairs (bool): Se True, também combina DUAS keywords com o
+            nome base (ex: "Hacker API forense"), ainda em <= 3 palavras.
         
     Returns:
         List[str]: Uma lista de candidatos únicos (ex: "Hacker de API").
@@ -68,8 +88,88 @@ def generate_name_candidates(name_base: str, domain: str, top_n: int = 5) -> Lis
         # Variação 4: "Hacker para API" (3 palavras)
         variations.add(f"{name_base} para {keyword}")
 
+    # Variação 5: "Hacker API forense" (3 palavras, combinações de keywords)
+    if keyword_pairs and len(name_base.split()) == 1:
+        for first, second in combinations(keywords, 2):
+            variations.add(f"{name_base} {first} {second}")
+            variations.add(f"{first} {second} {name_base}")
+
     return list(variations)
 
+def score_candidates(
+    candidates: List[str],
+    domain: str,
+    top_k: int = 10,
+    chunk_size: int = 64
+) -> List[Dict[str, Any]]:
+    """
+    Pontua e ranqueia candidatos pela SD média multi-modelo (Física v1.1.0).
+    
+    1. Minimalismo: candidatos com mais de THRESHOLD_MINIMALISM palavras são
+       descartados antes de qualquer encode.
+    2. Cascata: o modelo mais barato codifica [domínio + todos] em UM batch;
+       quem já tem SD < 0.55 está reprovado e sai ('cascade_decided').
+    3. Branch-and-bound: os modelos caros rodam em blocos de 'chunk_size'
+       candidatos, dos mais promissores aos menos. Antes de cada encode, sai
+       quem já não alcança o top-k: a melhor média possível (modelos
+       restantes em SD 1.0, 'best_possible_mean') abaixo da média do
+       k-ésimo melhor candidato completo.
+    
+    Returns:
+        Os 'top_k' melhores: primeiro os avaliados em todos os modelos sem
+        SD < 0.55 (por SD média), depois os demais (pela média, parcial se
+        'sd_partial'), com o veredito.
+    """
+    candidates = list(dict.fromkeys(candidates))
+    alive = [c for c in candidates if len(c.split()) <= THRESHOLD_MINIMALISM]
+    keys = cascade_order(list(EMBEDDING_MODELS.keys()))
+    sds: Dict[str, Dict[str, Dict[str, float]]] = {c: {} for c in alive}
+    
+    def values(candidate: str) -> List[float]:
+        return [r['sd'] for r in sds[candidate].values()]
+    
+    def score(key: str, batch: List[str]) -> None:
+        embeddings = model_registry.encode(EMBEDDING_MODELS[key], [domain] + batch, batch_size=chunk_size)
+        embeddings = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        for candidate, sd in zip(batch, embeddings[1:] @ embeddings[0]):
+            sds[candidate][key] = {'sd': float(sd)}
+    
+    if alive:
+        score(keys[0], alive)
+    alive = [c for c in alive if not cascade_decided(values(c))]
+    alive.sort(key=lambda c: best_possible_mean(values(c), len(keys)), reverse=True)
+    
+    top_means: List[float] = []  # min-heap: médias dos k melhores completos
+    for start in range(0, len(alive), chunk_size):
+        chunk = alive[start:start + chunk_size]
+        for key in keys[1:]:
+            bar = top_means[0] if len(top_means) >= top_k else float('-inf')
+            chunk = [
+                c for c in chunk
+                if not cascade_decided(values(c)) and best_possible_mean(values(c), len(keys)) >= bar
+            ]
+            if not chunk:
+                break
+            score(key, chunk)
+        for c in chunk:
+            if len(sds[c]) == len(keys) and not cascade_decided(values(c)):
+                mean = sum(values(c)) / len(keys)
+                if len(top_means) < top_k:
+                    heapq.heappush(top_means, mean)
+                elif mean > top_means[0]:
+                    heapq.heapreplace(top_means, mean)
+    
+    ranked = []
+    for candidate, results in sds.items():
+        verdict = build_verdict(results, len(candidate.split()))
+        verdict['name'] = candidate
+        mark_evaluated(verdict, results)
+        ranked.append(verdict)
+    
+    ranked.sort(key=lambda v: (not v['sd_partial'] and v['sd_min'] >= THRESHOLD_MIN_CROSS_PLATFORM, v['sd_mean']),
+                reverse=True)
+    return ranked[:top_k]
+
 def main():
     """
     Executa o CLI para o Gerador de Estratégia.
@@ -101,6 +201,10 @@ PASSO 2 (Validar):
 Pegue os melhores candidatos e use o 'semantic-density-calculator.py'
 
 $ python tools/semantic-density-calculator.py "Hacker Semântico" "análise forense de APIs e ofertas tech" --benchmark
+
+PASSOS 1 + 2 (Gerar e Pontuar, em lote):
+
+$ python tools/strategy_generator.py "Hacker" "análise forense de APIs e ofertas tech" --score --top-n 12 --top-k 5
 """
     )
     
@@ -108,6 +212,12 @@ $ python tools/semantic-density-calculator.py "Hacker Semântico" "análise fore
                         help='O Nome Base para o agente (ex: "Hacker", "Auditor")')
     parser.add_argument('domain', type=str, nargs='+',
                         help='O texto completo do Domínio Alvo (ex: "análise de APIs")')
+    parser.add_argument('--score', action='store_true',
+                        help='Pontua os candidatos (SD multi-modelo, em lote) e mostra o top-k')
+    parser.add_argument('--top-n', type=int, default=None,
+                        help='Keywords usadas na geração (Padrão: 5; 15 com --score)')
+    parser.add_argument('--top-k', type=int, default=10,
+                        help='Candidatos exibidos no ranking do --score (Padrão: 10)')
     
     args = parser.parse_args()
     
@@ -123,7 +233,24 @@ $ python tools/semantic-density-calculator.py "Hacker Semântico" "análise fore
     # --- 1. GERAÇÃO (Exploração) ---
     print("--- 1. Gerando Candidatos (com base em keywords 'SINAL') ---")
     
-    candidates = generate_name_candidates(args.name_base, domain_text)
+    top_n = args.top_n or (15 if args.score else 5)
+    candidates = generate_name_candidates(args.name_base, domain_text, top_n=top_n, keyword_pairs=args.score)
+    
+    if args.score:
+        print(f"  {len(candidates)} candidatos gerados (top_n={top_n}).")
+        print("\n--- 2. Pontuando Candidatos (SD multi-modelo, cascata) ---")
+        try:
+            ranked = score_candidates(candidates, domain_text, top_k=args.top_k)
+        except RuntimeError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        for i, verdict in enumerate(ranked):
+            status = 'PASS' if verdict['status_sd'] == 'PASS' and verdict['status_minimalism'] == 'PASS' else 'FAIL'
+            pruned = ' (podado)' if verdict['sd_partial'] else ''
+            print(f"  {i+1:>2}. {verdict['sd_mean']:.4f} (min {verdict['sd_min']:.4f}) "
+                  f"[{status}]{pruned} \"{verdict['name']}\"")
+        print(f"\n{'='*70}\n")
+        return
     
     if candidates:
         for i, candidate in enumerate(candidates):
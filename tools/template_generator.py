@@ -8,60 +8,99 @@
 # Este script também expõe essa lógica via uma API FastAPI.
 
 
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
+from types import SimpleNamespace
+from urllib.parse import quote
+import asyncio
 import re
-import tiktoken
+import unicodedata
 import os
-import tempfile
+import zipfile
 
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 
+from agent_config import AgentConfigV1_1, BaseshotExample
+from metrics import TOKENIZE_SECONDS, install_metrics, timed
+from serving import install_admission_control, install_health_probes, run_in_pool
+
 # --- Configuração do Framework v1.1.0 ---
 
-# Tokenizer padrão industrial (o "Árbitro" de tokens)
-try:
-    TOKENIZER = tiktoken.get_encoding("cl100k_base")
-except Exception:
-    print("Aviso: 'cl100k_base' não encontrado. Usando 'p50k_base'.")
-    TOKENIZER = tiktoken.get_encoding("p50k_base")
+@lru_cache(maxsize=None)
+def get_tokenizer():
+    """
+    Tokenizer padrão industrial (o "Árbitro" de tokens), resolvido na
+    primeira contagem: importar o módulo não paga o tiktoken.
+    """
+    import tiktoken
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        print("Aviso: 'cl100k_base' não encontrado. Usando 'p50k_base'.")
+        return tiktoken.get_encoding("p50k_base")
+
+def __getattr__(name: str):
+    # Compatibilidade: 'TOKENIZER' continua disponível, resolvido sob demanda.
+    if name == 'TOKENIZER':
+        return get_tokenizer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 THRESHOLD_TOKEN_PASS = 200
 
-@dataclass
-class BaseshotExample:
-    """Define um único exemplo de Baseshot"""
-    type: str  # 'positive' (✅), 'negative' (❌), 'edge' (⚠️)
-    input: str
-    output: str
+# --- Orçamento de Tokens ---
+# Níveis de corte (máx. de tokens por campo) e o "valor" que sobra de cada item
+EXAMPLE_TRIM_LEVELS = ((None, 1.0), (24, 0.7), (12, 0.45), (6, 0.25))
+PROTOCOL_TRIM_LEVELS = ((None, 1.0), (16, 0.6), (8, 0.3))
+# Peso por tipo de exemplo (o 'negative' carrega o Anti-Padrão)
+EXAMPLE_TYPE_WEIGHTS = {'negative': 1.2, 'edge': 1.0, 'positive': 1.0}
+MIN_PROTOCOL_ITEMS = 3
+MIN_BASESHOT_EXAMPLES = 5
+
+# Só trechos curtos (campos, itens, exemplos) entram no cache de tokens: em
+# um serviço de longa duração, documentos inteiros como chave ocupariam o
+# cache com templates completos.
+TOKEN_CACHE_MAX_CHARS = 512
+
+def _encode_tokens(text: str) -> Tuple[int, ...]:
+    with timed(TOKENIZE_SECONDS, tool='template_generator'):
+        return tuple(get_tokenizer().encode(text))
+
+@lru_cache(maxsize=8192)
+def _tokens(text: str) -> Tuple[int, ...]:
+    """Tokens de um trecho (cache por texto: cada trecho é codificado uma vez)."""
+    return _encode_tokens(text)
+
+def _token_ids(text: str) -> Tuple[int, ...]:
+    return _tokens(text) if len(text) <= TOKEN_CACHE_MAX_CHARS else _encode_tokens(text)
+
+def count_tokens(text: str) -> int:
+    return len(_token_ids(text))
+
+def count_document_tokens(text: str) -> int:
+    """Tokens de um documento inteiro (ex: o template renderizado), sem cache."""
+    return len(_encode_tokens(text))
+
+def truncate_tokens(text: str, max_tokens: Optional[int]) -> str:
+    """Corta 'text' em 'max_tokens' tokens (com '…'). None = sem corte."""
+    tokens = _token_ids(text)
+    if max_tokens is None or len(tokens) <= max_tokens:
+        return text
+    return get_tokenizer().decode(list(tokens[:max_tokens])).replace('\ufffd', '').rstrip() + "…"
 
 @dataclass
-class AgentConfigV1_1:
-    """Configuração completa do agente v1.1.0"""
-    name: str                   # Camada 1: Identidade
-    domain: str                 # Camada 1: Domínio
-    mission: str                # Camada 2: Missão
-    protocol_items: List[str]   # Camada 3: Protocolo
-    baseshot_examples: List[BaseshotExample] # Camada 4: Baseshot
-    sd_score: float = 0.0       # Metadado
-    
-    # Validação Pós-Inicialização
-    def __post_init__(self):
-        if not self.name or len(self.name.strip()) < 2:
-            raise ValueError("Identidade (Nome) é obrigatória (mín. 2 caracteres)")
-        if not self.domain or len(self.domain.strip()) < 10:
-            raise ValueError("Domínio é obrigatório (mín. 10 caracteres)")
-        if not self.mission or len(self.mission.strip()) < 20:
-            raise ValueError("Missão é obrigatória (mín. 20 caracteres)")
-        if len(self.protocol_items) < 3:
-            raise ValueError("Protocolo (Camada 3) requer no mínimo 3 itens.")
-        if len(self.baseshot_examples) < 5:
-            raise ValueError("Baseshot (Camada 4) requer no mínimo 5 exemplos.")
-        if not any(ex.type == 'negative' for ex in self.baseshot_examples):
-            raise ValueError("Baseshot (Camada 4) requer pelo menos um 'negative' (❌) 'Erro Comum'.")
+class BudgetResult:
+    """Resultado do otimizador de orçamento de tokens."""
+    config: 'AgentConfigV1_1'
+    token_count: int
+    fits: bool
+    dropped_protocol_items: int = 0
+    dropped_examples: int = 0
+    trimmed_items: int = 0
 
 # --- Lógica do Gerador de Template ---
 
@@ -87,7 +126,7 @@ class TemplateGenerator:
         full_markdown = self._build_header(config, body)
         
         # "CIÊNCIA": Calcular tokens reais
-        token_count = len(TOKENIZER.encode(full_markdown))
+        token_count = count_document_tokens(full_markdown)
         baseshot_count = len(config.baseshot_examples)
         
         return full_markdown, token_count, baseshot_count
@@ -134,23 +173,23 @@ class TemplateGenerator:
         }
         return emojis.get(example_type.lower(), '⚠️') # Padrão para 'edge'
 
-    def _build_baseshot(self, config: AgentConfigV1_1) -> str:
-        """Camada 4: Baseshot (Onde o "Anti-Padrão" vive)"""
+    def _build_example(self, ex: BaseshotExample) -> str:
+        """Um exemplo da Camada 4"""
+        emoji = self._get_example_emoji(ex.type)
         
-        examples_md = []
-        for ex in config.baseshot_examples:
-            emoji = self._get_example_emoji(ex.type)
-            
-            # Formata o "Erro Comum" (Anti-Padrão)
-            output_md = ex.output
-            if ex.type == 'negative':
-                output_md = f"{ex.output} (ERRADO: {ex.input})" # O 'input' aqui é a *razão*
-            
-            example_str = f"""│ {emoji} Caso (Tipo: {ex.type})
+        # Formata o "Erro Comum" (Anti-Padrão)
+        output_md = ex.output
+        if ex.type == 'negative':
+            output_md = f"{ex.output} (ERRADO: {ex.input})" # O 'input' aqui é a *razão*
+        
+        return f"""│ {emoji} Caso (Tipo: {ex.type})
 │ INPUT: "{ex.input}"
 │ OUTPUT: {output_md}"""
-            examples_md.append(example_str)
-            
+
+    def _build_baseshot(self, config: AgentConfigV1_1) -> str:
+        """Camada 4: Baseshot (Onde o "Anti-Padrão" vive)"""
+        
+        examples_md = [self._build_example(ex) for ex in config.baseshot_examples]
         examples_section = "\n│\n".join(examples_md)
         
         return f"""┌─────────────────────────────────────────┐
@@ -159,6 +198,159 @@ class TemplateGenerator:
 {examples_section}
 └─────────────────────────────────────────┘"""
 
+    # --- Modo Orçamento ---
+
+    def optimize_for_budget(self, config: AgentConfigV1_1, budget: int = THRESHOLD_TOKEN_PASS) -> BudgetResult:
+        """
+        Escolhe o subconjunto (e o corte) de itens de protocolo e exemplos de
+        Baseshot de maior "valor" que cabe em 'budget' tokens, mantendo as
+        regras v1.1.0 (>= 3 itens, >= 5 exemplos, >= 1 'negative').
+        
+        Cada trecho (seção fixa, item, exemplo cortado) é tokenizado uma única
+        vez (cache) e o custo de uma combinação é a soma dos trechos; o
+        documento inteiro só é codificado para confirmar a escolha final.
+        """
+        # Caixas vazias: só cabeçalho e rodapé das camadas 3 e 4
+        fixed_config = SimpleNamespace(protocol_items=[], baseshot_examples=[])
+        fixed_cost = (
+            count_tokens(self._build_identity(config))
+            + count_tokens(self._build_mission(config))
+            + count_tokens(self._build_protocol(fixed_config))
+            + count_tokens(self._build_baseshot(fixed_config))
+            + 3 * count_tokens("\n↓\n")
+        )
+        
+        protocol_options = [
+            [(count_tokens(f"│ {i+1}. {text}\n"), value, text)
+             for text, value in self._protocol_variants(item, i)]
+            for i, item in enumerate(config.protocol_items)
+        ]
+        example_options = [
+            [(count_tokens(self._build_example(ex) + "\n│\n"), value, ex)
+             for ex, value in self._example_variants(ex, i)]
+            for i, ex in enumerate(config.baseshot_examples)
+        ]
+        
+        effective_budget = budget
+        result = None
+        for _ in range(3):
+            choice = self._solve_budget(fixed_cost, protocol_options, example_options, effective_budget)
+            if choice is None:
+                break
+            result = self._budget_result(config, choice)
+            if result.token_count <= budget:
+                result.fits = True
+                return result
+            # A soma dos trechos subestimou o documento: aperta o orçamento e repete
+            effective_budget -= result.token_count - budget
+        
+        if result is None:
+            # Nem o mínimo (cortado ao máximo) cabe: devolve o menor possível
+            cheapest = self._solve_budget(fixed_cost, protocol_options, example_options, None)
+            result = self._budget_result(config, cheapest)
+        result.fits = result.token_count <= budget
+        return result
+
+    def _protocol_variants(self, item: str, position: int) -> List[Tuple[str, float]]:
+        """(texto, valor) de um item de protocolo por nível de corte."""
+        base = 1.0 / (1.0 + 0.1 * position)  # A ordem do autor é a prioridade
+        variants = {}
+        for max_tokens, factor in PROTOCOL_TRIM_LEVELS:
+            variants.setdefault(truncate_tokens(item, max_tokens), base * factor)
+        return list(variants.items())
+
+    def _example_variants(self, ex: BaseshotExample, position: int) -> List[Tuple[BaseshotExample, float]]:
+        """(exemplo, valor) de um exemplo de Baseshot por nível de corte."""
+        base = EXAMPLE_TYPE_WEIGHTS.get(ex.type, 1.0) / (1.0 + 0.1 * position)
+        variants = {}
+        for max_tokens, factor in EXAMPLE_TRIM_LEVELS:
+            trimmed = BaseshotExample(
+                type=ex.type,
+                input=truncate_tokens(ex.input, max_tokens),
+                output=truncate_tokens(ex.output, max_tokens)
+            )
+            variants.setdefault((trimmed.input, trimmed.output), (trimmed, base * factor))
+        return list(variants.values())
+
+    def _solve_budget(self, fixed_cost, protocol_options, example_options, budget):
+        """
+        Mochila de múltipla escolha (no máx. uma variante por item) com as
+        restrições de cardinalidade. Com 'budget' None, minimiza o custo.
+        Retorna (índices+variantes do protocolo, dos exemplos) ou None.
+        """
+        minimize = budget is None
+        
+        def knapsack(options, min_count, need_negative):
+            # estado: (custo, min(contagem, min_count), tem_negative) -> (valor, escolhas)
+            states = {(0, 0, not need_negative): (0.0, ())}
+            for index, variants in enumerate(options):
+                new_states = dict(states)
+                for (cost, count, negative), (value, picks) in states.items():
+                    for variant_index, (item_cost, item_value, item) in enumerate(variants):
+                        new_cost = cost + item_cost
+                        if not minimize and fixed_cost + new_cost > budget:
+                            continue
+                        key = (new_cost, min(count + 1, min_count),
+                               negative or getattr(item, 'type', None) == 'negative')
+                        candidate = (value + item_value, picks + ((index, variant_index),))
+                        if key not in new_states or candidate[0] > new_states[key][0]:
+                            new_states[key] = candidate
+                states = new_states
+            # Melhor valor por custo, só entre os estados válidos
+            return {cost: entry for (cost, count, negative), entry in states.items()
+                    if count >= min_count and negative}
+        
+        protocol = knapsack(protocol_options, MIN_PROTOCOL_ITEMS, False)
+        examples = knapsack(example_options, MIN_BASESHOT_EXAMPLES, True)
+        if not protocol or not examples:
+            return None
+        
+        if minimize:
+            p_picks = protocol[min(protocol)][1]
+            e_picks = examples[min(examples)][1]
+        else:
+            # Melhor exemplo com custo <= c (máximo de prefixo), para cada c
+            best_examples, running = {}, None
+            for cost in range(budget - fixed_cost + 1):
+                if cost in examples and (running is None or examples[cost][0] > running[0]):
+                    running = examples[cost]
+                best_examples[cost] = running
+            best = None
+            for p_cost, (p_value, picks) in protocol.items():
+                entry = best_examples.get(budget - fixed_cost - p_cost)
+                if entry is not None and (best is None or p_value + entry[0] > best[0]):
+                    best = (p_value + entry[0], picks, entry[1])
+            if best is None:
+                return None
+            _, p_picks, e_picks = best
+        
+        return (
+            [protocol_options[i][v][2] for i, v in p_picks],
+            [example_options[i][v][2] for i, v in e_picks],
+            sum(v > 0 for _, v in p_picks) + sum(v > 0 for _, v in e_picks)
+        )
+
+    def _budget_result(self, config: AgentConfigV1_1, choice) -> BudgetResult:
+        """Monta a config escolhida e confirma com UM encode do documento."""
+        protocol_items, examples, trimmed = choice
+        optimized = AgentConfigV1_1(
+            name=config.name,
+            domain=config.domain,
+            mission=config.mission,
+            protocol_items=protocol_items,
+            baseshot_examples=examples,
+            sd_score=config.sd_score
+        )
+        _, token_count, _ = self.generate_template_file(optimized)
+        return BudgetResult(
+            config=optimized,
+            token_count=token_count,
+            fits=False,
+            dropped_protocol_items=len(config.protocol_items) - len(protocol_items),
+            dropped_examples=len(config.baseshot_examples) - len(examples),
+            trimmed_items=trimmed
+        )
+
 # =====================================================
 # API ENDPOINT (FASTAPI)
 # =====================================================
@@ -168,6 +360,13 @@ app = FastAPI(
     description="API para gerar 'skeletons' de Agentes v1.1.0 validados."
 )
 
+# Excesso de carga: 503 + Retry-After (ver 'serving.py')
+ADMISSION = install_admission_control(app)
+# /healthz e /readyz; o tokenizer carrega após o startup (ACC_PREWARM=0 desliga)
+STARTUP = install_health_probes(app, warmup=lambda: get_tokenizer().encode("warmup"))
+# GET /metrics (Prometheus)
+install_metrics(app)
+
 # --- Modelos Pydantic para a API ---
 
 class BaseshotExampleModel(BaseModel):
@@ -182,6 +381,7 @@ class PromptRequestModel(BaseModel):
     protocol_items: List[str] = field(default_factory=list)
     baseshot_examples: List[BaseshotExampleModel] = field(default_factory=list)
     sd_score: float = 0.0
+    optimize_budget: bool = False  # Ajusta protocolo/exemplos a THRESHOLD_TOKEN_PASS
 
 class PromptResponseModel(BaseModel):
     markdown_template: str
@@ -189,39 +389,74 @@ class PromptResponseModel(BaseModel):
     baseshot_count: int
     warnings: List[str]
 
+def _build_config(request: PromptRequestModel) -> AgentConfigV1_1:
+    """Converte o modelo Pydantic para a Dataclass (ValueError se inválido)."""
+    baseshot_dcs = [
+        BaseshotExample(type=ex.type, input=ex.input, output=ex.output)
+        for ex in request.baseshot_examples
+    ]
+    
+    return AgentConfigV1_1(
+        name=request.name,
+        domain=request.domain,
+        mission=request.mission,
+        protocol_items=request.protocol_items,
+        baseshot_examples=baseshot_dcs,
+        sd_score=request.sd_score
+    )
+
+def _render(request: PromptRequestModel, config: AgentConfigV1_1) -> Tuple[str, int, int, Optional[BudgetResult]]:
+    """
+    Renderiza o template (CPU-bound: roda no pool, fora do event loop).
+    Retorna (markdown, token_count, baseshot_count, budget_result).
+    """
+    generator = TemplateGenerator()
+    budget_result = None
+    
+    # Modo Orçamento: escolhe/corta itens e exemplos para caber no limite
+    if request.optimize_budget:
+        budget_result = generator.optimize_for_budget(config)
+        config = budget_result.config
+    
+    markdown, token_count, baseshot_count = generator.generate_template_file(config)
+    
+    # Preencher os metadados finais (agora que temos a contagem)
+    markdown = markdown.replace("{{token_count}}", str(token_count))
+    markdown = markdown.replace("{{baseshot_count}}", str(baseshot_count))
+    return markdown, token_count, baseshot_count, budget_result
+
+def _export_filename(name: str) -> str:
+    """Nome de arquivo seguro (ex: 'hacker-semantico.md')."""
+    safe_name = re.sub(r'[^\w\s-]', '', name.lower())
+    safe_name = re.sub(r'[-\s]+', '-', safe_name).strip('-')
+    return f"{safe_name or 'template'}.md"
+
+def _content_disposition(filename: str) -> str:
+    """Header de download (com fallback ASCII para nomes acentuados)."""
+    ascii_name = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii') or 'download'
+    return f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename)}"
+
 @app.post("/api/v1/generate-template", response_model=PromptResponseModel)
 async def generate_template_endpoint(request: PromptRequestModel):
     """
     Gera um esqueleto de template .md no formato ACC v1.1.0.
     """
-    generator = TemplateGenerator()
     warnings = []
     
     try:
-        # Converter modelos Pydantic para Dataclasses
-        baseshot_dcs = [
-            BaseshotExample(type=ex.type, input=ex.input, output=ex.output)
-            for ex in request.baseshot_examples
-        ]
-        
-        config = AgentConfigV1_1(
-            name=request.name,
-            domain=request.domain,
-            mission=request.mission,
-            protocol_items=request.protocol_items,
-            baseshot_examples=baseshot_dcs,
-            sd_score=request.sd_score
-        )
-        
+        config = _build_config(request)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    # Gerar o template
-    markdown, token_count, baseshot_count = generator.generate_template_file(config)
+    markdown, token_count, baseshot_count, budget_result = await run_in_pool(_render, request, config)
     
-    # Preencher os metadados finais (agora que temos a contagem)
-    markdown = markdown.replace("{{token_count}}", str(token_count))
-    markdown = markdown.replace("{{baseshot_count}}", str(baseshot_count))
+    if budget_result is not None:
+        warnings.append(
+            f"ℹ️ ORÇAMENTO - {budget_result.dropped_protocol_items} item(ns) de protocolo e "
+            f"{budget_result.dropped_examples} exemplo(s) removidos, {budget_result.trimmed_items} cortado(s)"
+        )
+        if not budget_result.fits:
+            warnings.append(f"⚠️ ORÇAMENTO - Nem o mínimo v1.1.0 cabe em {THRESHOLD_TOKEN_PASS} tokens")
     
     # "CIÊNCIA": Validar com as métricas v1.1.0
     if token_count > THRESHOLD_TOKEN_PASS:
@@ -242,26 +477,104 @@ async def generate_template_endpoint(request: PromptRequestModel):
 @app.post("/api/v1/export-template")
 async def export_template_endpoint(request: PromptRequestModel):
     """
-    Exporta o template gerado como um arquivo .md para download.
+    Exporta o template gerado como um arquivo .md para download
+    (direto da memória, sem arquivo temporário).
     """
-    # Reusa a lógica do endpoint de geração
-    response_data = await generate_template_endpoint(request)
-    markdown = response_data.markdown_template
+    try:
+        config = _build_config(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False, encoding='utf-8') as f:
-        f.write(markdown)
-        temp_path = f.name
-        
-    # Gerar nome de arquivo seguro (ex: 'templates/hacker-semantico.md')
-    safe_name = re.sub(r'[^\w\s-]', '', request.name.lower())
-    safe_name = re.sub(r'[-\s]+', '-', safe_name).strip('-')
-    filename = f"{safe_name}.md"
+    markdown, _, _, _ = await run_in_pool(_render, request, config)
+    
+    return Response(
+        content=markdown.encode('utf-8'),
+        media_type='text/markdown; charset=utf-8',
+        headers={"Content-Disposition": _content_disposition(_export_filename(request.name))}
+    )
+
+# --- Exportação em Lote (ZIP) ---
+
+# Templates renderizados ao mesmo tempo no ZIP (limita a memória)
+EXPORT_ZIP_WINDOW = int(os.getenv("ACC_EXPORT_ZIP_WINDOW", "8"))
+
+class _ZipChunkSink:
+    """
+    Destino de escrita não-posicionável para o 'zipfile': acumula os bytes
+    escritos até o próximo 'drain()' (o ZIP sai em pedaços, sem 'seek').
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+async def _stream_zip(requests: List[PromptRequestModel], configs: List[AgentConfigV1_1]) -> AsyncIterator[bytes]:
+    """
+    Renderiza os templates em paralelo (no máx. EXPORT_ZIP_WINDOW por vez) e
+    emite o ZIP entrada a entrada, na ordem do pedido.
+    """
+    sink = _ZipChunkSink()
+    used_names: Dict[str, int] = {}
+    pending: Deque[Tuple[str, asyncio.Future]] = deque()
+    
+    def add_entry(filename: str, markdown: str) -> bytes:
+        info = zipfile.ZipInfo(filename, date_time=datetime.now().timetuple()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        archive.writestr(info, markdown.encode('utf-8'))
+        return sink.drain()
+    
+    with zipfile.ZipFile(sink, mode='w') as archive:
+        for request, config in zip(requests, configs):
+            filename = _export_filename(request.name)
+            count = used_names[filename] = used_names.get(filename, 0) + 1
+            if count > 1:
+                filename = f"{filename[:-3]}-{count}.md"
+            pending.append((filename, asyncio.ensure_future(run_in_pool(_render, request, config))))
+            
+            while pending and (pending[0][1].done() or len(pending) >= EXPORT_ZIP_WINDOW):
+                filename, future = pending.popleft()
+                yield add_entry(filename, (await future)[0])
+        while pending:
+            filename, future = pending.popleft()
+            yield add_entry(filename, (await future)[0])
+    
+    # Diretório central do ZIP (escrito no 'close')
+    yield sink.drain()
+
+@app.post("/api/v1/export-templates/zip")
+async def export_templates_zip_endpoint(requests: List[PromptRequestModel]):
+    """
+    Exporta vários templates em um arquivo ZIP (streaming).
+    
+    Todas as configs são validadas antes do início da resposta (400 com o
+    índice do item inválido); depois, o ZIP é transmitido à medida que os
+    templates ficam prontos, com memória constante.
+    """
+    if not requests:
+        raise HTTPException(status_code=400, detail="Envie ao menos uma configuração.")
+    
+    configs = []
+    for index, request in enumerate(requests):
+        try:
+            configs.append(_build_config(request))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Item {index}: {e}")
     
-    return FileResponse(
-        temp_path,
-        media_type='text/markdown',
-        filename=filename,
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    return StreamingResponse(
+        _stream_zip(requests, configs),
+        media_type='application/zip',
+        headers={"Content-Disposition": _content_disposition("templates.zip")}
     )
 
 if __name__ == "__main__":
@@ -0,0 +1,257 @@
+# tools/template_index.py
+# v1.1.0 - Índice de Similaridade da Biblioteca 'templates/'
+#
+# OBJETIVO:
+# Encontrar o agente existente mais próximo de um novo domínio (e agentes
+# quase duplicados) sem ler a biblioteca inteira.
+#
+# FUNCIONAMENTO:
+# 1. (BUILD) Extrai Identidade, Domínio e Missão de cada template e guarda
+#    as embeddings em um índice plano (.npz, linhas normalizadas) + manifesto
+#    (.json) com o hash de conteúdo de cada arquivo.
+# 2. (INCREMENTAL) Arquivos com o mesmo hash reaproveitam a linha anterior:
+#    só os novos/alterados são codificados.
+# 3. (QUERY) Top-k por produto escalar; (DUPLICATES) pares acima do limiar,
+#    calculados em blocos (memória limitada para milhares de templates).
+#
+# USO (CLI):
+# $ python tools/template_index.py build
+# $ python tools/template_index.py query "auditoria de segurança de APIs" --top-k 5
+# $ python tools/template_index.py duplicates --threshold 0.90
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+import model_registry
+from template_parser import parse_summary
+
+# --- Configuração ---
+DEFAULT_TEMPLATES_DIR = str(Path(__file__).resolve().parent.parent / "templates")
+DEFAULT_INDEX_DIR = os.getenv("ACC_TEMPLATE_INDEX_DIR", str(Path.home() / ".cache" / "acc" / "templates"))
+DEFAULT_MODEL = 'all-MiniLM-L6-v2'
+DUPLICATE_THRESHOLD = 0.90
+DUPLICATE_BLOCK_SIZE = 1024
+
+# --- Extração (Identidade, Domínio, Missão) ---
+
+def parse_template_summary(text: str) -> Dict[str, str]:
+    """
+    Extrai {'identity', 'domain', 'mission'} das camadas 1 (IDENTIDADE) e
+    2 (MISSÃO) de um template, com a gramática de 'template_parser.py'.
+    Campos ausentes ficam "".
+    """
+    return parse_summary(text.splitlines())
+
+def profile_text(summary: Dict[str, str]) -> str:
+    """Texto codificado por template: identidade + domínio + missão."""
+    return " ".join(filter(None, (summary['identity'], summary['domain'], summary['mission'])))
+
+# --- Índice ---
+
+def _model_slug(model_name: str) -> str:
+    return re.sub(r'[^\w.@-]', '_', model_name)
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    return matrix / np.clip(np.linalg.norm(matrix, axis=-1, keepdims=True), 1e-12, None)
+
+class TemplateIndex:
+    """
+    Índice plano: 'embeddings' (n x d, normalizadas) + 'entries' (uma por
+    linha: path, sha256, identity, domain, mission).
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, index_dir: str = DEFAULT_INDEX_DIR):
+        self.model_name = model_name
+        base = Path(index_dir) / _model_slug(model_registry.cache_id(model_name))
+        self.matrix_path = base.with_suffix('.npz')
+        self.manifest_path = base.with_suffix('.manifest.json')
+        self.entries: List[Dict[str, str]] = []
+        self.embeddings = np.zeros((0, 0), dtype=np.float32)
+
+    def load(self) -> "TemplateIndex":
+        """Carrega o índice salvo (se existir)."""
+        if self.matrix_path.exists() and self.manifest_path.exists():
+            self.entries = json.loads(self.manifest_path.read_text(encoding='utf-8'))['entries']
+            with np.load(self.matrix_path, allow_pickle=False) as data:
+                self.embeddings = data['embeddings'].astype(np.float32)
+            if len(self.entries) != len(self.embeddings):
+                # Índice inconsistente (ex: escrita interrompida): reconstruir do zero.
+                self.entries, self.embeddings = [], np.zeros((0, 0), dtype=np.float32)
+        return self
+
+    def build(self, templates_dir: str = DEFAULT_TEMPLATES_DIR, pattern: str = "**/*.md") -> Dict[str, int]:
+        """
+        (Re)constrói o índice de forma incremental a partir de 'templates_dir'.
+        Retorna as contagens {'total', 'encoded', 'reused', 'removed'}.
+        """
+        previous = {(e['path'], e['sha256']): i for i, e in enumerate(self.entries)}
+        paths = sorted(Path(templates_dir).glob(pattern))
+
+        entries, rows, to_encode = [], [], []
+        for path in paths:
+            content = path.read_bytes()
+            sha256 = hashlib.sha256(content).hexdigest()
+            row = previous.get((str(path), sha256))
+            if row is not None:
+                entries.append(self.entries[row])
+                rows.append(self.embeddings[row])
+                continue
+            summary = parse_template_summary(content.decode('utf-8', errors='replace'))
+            entries.append({'path': str(path), 'sha256': sha256, **summary})
+            rows.append(None)
+            to_encode.append(len(rows) - 1)
+
+        if to_encode:
+            texts = [profile_text(entries[i]) or Path(entries[i]['path']).stem for i in to_encode]
+            encoded = _normalize_rows(model_registry.encode(self.model_name, texts, batch_size=64))
+            for i, embedding in zip(to_encode, encoded):
+                rows[i] = embedding
+
+        reused = len(paths) - len(to_encode)
+        removed = len(self.entries) - reused
+        self.entries = entries
+        self.embeddings = np.vstack(rows).astype(np.float32) if rows else np.zeros((0, 0), dtype=np.float32)
+        self.save()
+        return {'total': len(entries), 'encoded': len(to_encode), 'reused': reused, 'removed': removed}
+
+    def save(self) -> None:
+        """Grava matriz + manifesto (escrita atômica via arquivo temporário)."""
+        self.matrix_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_matrix = self.matrix_path.with_name(self.matrix_path.stem + f".{os.getpid()}.tmp.npz")
+        np.savez(tmp_matrix, embeddings=self.embeddings)
+        os.replace(tmp_matrix, self.matrix_path)
+        tmp_manifest = self.manifest_path.with_name(self.manifest_path.name + f".{os.getpid()}.tmp")
+        tmp_manifest.write_text(
+            json.dumps({'model_name': self.model_name, 'entries': self.entries}, ensure_ascii=False, indent=1),
+            encoding='utf-8'
+        )
+        os.replace(tmp_manifest, self.manifest_path)
+
+    def query(self, domain: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Os 'k' agentes mais próximos do domínio (cosseno)."""
+        if not self.entries:
+            return []
+        query = _normalize_rows(model_registry.encode(self.model_name, [domain]))[0]
+        scores = self.embeddings @ query
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [{**self.entries[i], 'similarity': round(float(scores[i]), 4)} for i in best]
+
+    def near_duplicates(
+        self,
+        threshold: float = DUPLICATE_THRESHOLD,
+        block_size: int = DUPLICATE_BLOCK_SIZE
+    ) -> List[Dict[str, Any]]:
+        """
+        Pares (a, b) com cosseno >= 'threshold', do mais ao menos similar.
+        A matriz de similaridade é calculada em blocos de 'block_size' linhas.
+        """
+        pairs: List[Tuple[float, int, int]] = []
+        n = len(self.entries)
+        for start in range(0, n, block_size):
+            block = self.embeddings[start:start + block_size] @ self.embeddings.T
+            rows, cols = np.nonzero(block >= threshold)
+            for r, c in zip(rows, cols):
+                a = start + int(r)
+                if a < int(c):
+                    pairs.append((float(block[r, c]), a, int(c)))
+        pairs.sort(reverse=True)
+        return [
+            {'a': self.entries[a]['path'], 'b': self.entries[b]['path'], 'similarity': round(sim, 4)}
+            for sim, a, b in pairs
+        ]
+
+def load_index(model_name: str = DEFAULT_MODEL, index_dir: str = DEFAULT_INDEX_DIR) -> TemplateIndex:
+    """Índice salvo do modelo (vazio se nunca construído)."""
+    return TemplateIndex(model_name, index_dir).load()
+
+def find_nearest_agents(
+    domain: str,
+    k: int = 5,
+    model_name: str = DEFAULT_MODEL,
+    index_dir: str = DEFAULT_INDEX_DIR
+) -> List[Dict[str, Any]]:
+    """Atalho: os 'k' templates mais próximos de 'domain' no índice salvo."""
+    return load_index(model_name, index_dir).query(domain, k)
+
+# --- Executor CLI ---
+
+def main():
+    """
+    Ponto de entrada do CLI.
+    """
+    parser = argparse.ArgumentParser(
+        description="Índice de similaridade da biblioteca 'templates/' (ACC v1.1.0)"
+    )
+    parser.add_argument('command', choices=['build', 'query', 'duplicates'])
+    parser.add_argument('domain', type=str, nargs='*',
+                        help='No "query": o texto do Domínio Alvo.')
+    parser.add_argument('--templates-dir', type=str, default=DEFAULT_TEMPLATES_DIR,
+                        help='Diretório dos templates (Padrão: templates/ do repositório).')
+    parser.add_argument('--model', type=str, default=DEFAULT_MODEL,
+                        help=f'Modelo de embedding (Padrão: {DEFAULT_MODEL}).')
+    parser.add_argument('--index-dir', type=str, default=DEFAULT_INDEX_DIR,
+                        help=f'Diretório do índice (Padrão: {DEFAULT_INDEX_DIR}).')
+    parser.add_argument('--top-k', type=int, default=5,
+                        help='No "query": número de agentes retornados (Padrão: 5).')
+    parser.add_argument('--threshold', type=float, default=DUPLICATE_THRESHOLD,
+                        help=f'No "duplicates": similaridade mínima (Padrão: {DUPLICATE_THRESHOLD}).')
+    parser.add_argument('--json', action='store_true',
+                        help='Saída em JSON.')
+
+    args = parser.parse_args()
+    index = load_index(args.model, args.index_dir)
+
+    try:
+        if args.command == 'build':
+            result = index.build(args.templates_dir)
+        elif args.command == 'query':
+            domain = " ".join(args.domain)
+            if not domain:
+                parser.error('"query" exige o texto do domínio.')
+            result = index.query(domain, args.top_k)
+        else:
+            result = index.near_duplicates(args.threshold)
+    except (RuntimeError, OSError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+
+    print(f"\n{'='*70}")
+    if args.command == 'build':
+        print(f"🗂️  ÍNDICE DE TEMPLATES ({args.model})")
+        print(f"{'='*70}\n")
+        print(f"Total: {result['total']} | Codificados: {result['encoded']} | "
+              f"Reaproveitados: {result['reused']} | Removidos: {result['removed']}")
+    elif args.command == 'query':
+        print(f"🔎 AGENTES MAIS PRÓXIMOS: {' '.join(args.domain)[:50]}")
+        print(f"{'='*70}\n")
+        if not index.entries:
+            print("Índice vazio. Rode: python tools/template_index.py build")
+        for i, entry in enumerate(result):
+            print(f"  {i+1:>2}. {entry['similarity']:.4f}  {entry['identity']} ({Path(entry['path']).name})")
+            print(f"      Domínio: {entry['domain'][:60]}")
+    else:
+        print(f"👯 QUASE DUPLICADOS (>= {args.threshold})")
+        print(f"{'='*70}\n")
+        if not result:
+            print("Nenhum par encontrado.")
+        for pair in result:
+            print(f"  {pair['similarity']:.4f}  {Path(pair['a']).name} <-> {Path(pair['b']).name}")
+    print(f"\n{'='*70}\n")
+
+if __name__ == "__main__":
+    main()
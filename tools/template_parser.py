@@ -0,0 +1,335 @@
+# tools/template_parser.py
+# v1.1.0 - Parser de Templates (ASCII-box -> AgentConfigV1_1)
+#
+# OBJETIVO:
+# O caminho inverso do 'TemplateGenerator': ler os templates .md (4 camadas
+# em ASCII-box) de volta para 'AgentConfigV1_1' / 'BaseshotExample', para
+# auditar e re-pontuar a biblioteca 'templates/' sem redigitar nada.
+#
+# FUNCIONAMENTO:
+# 1. (STREAMING) Uma única passada, linha a linha (o arquivo não é
+#    carregado inteiro na memória).
+# 2. (TOLERANTE) Aceita as variações dos templates escritos à mão: bordas
+#    '│' ou '|', linhas de continuação indentadas, 'INPUT (rótulo):'
+#    repetido, emojis com ou sem seletor de variação, CRLF.
+# 3. (ERROS) 'TemplateParseError' aponta arquivo:linha do problema.
+# 4. (LOTE) 'parse_directory' usa um pool de processos.
+#
+# USO (CLI):
+# $ python tools/template_parser.py templates/
+# $ python tools/template_parser.py templates/hacker-semantico.md --json
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from agent_config import AgentConfigV1_1, BaseshotExample
+
+# --- Gramática ---
+_SECTION_HEADER = re.compile(r'^(\d)\.\s+(IDENTIDADE|MISS[ÃA]O|PROTOCOLO|BASESHOT)\b', re.IGNORECASE)
+_SECTION_IDS = {'IDENTIDADE': 'identity', 'MISSÃO': 'mission', 'MISSAO': 'mission',
+                'PROTOCOLO': 'protocol', 'BASESHOT': 'baseshot'}
+_DOMAIN_LINE = re.compile(r'^dom[íi]nio\s*:\s*(.*)$', re.IGNORECASE)
+_PROTOCOL_ITEM = re.compile(r'^(?:\d+[.)]|[-*•])\s+(.*)$')
+_EXAMPLE_HEADER = re.compile(r'^(✅|❌|⚠️?)\s*(.*)$')
+_EXAMPLE_FIELD = re.compile(r'^(INPUT|OUTPUT)\s*(?:\(([^)]*)\))?\s*:\s*(.*)$', re.IGNORECASE)
+_EXAMPLE_TYPES = {'✅': 'positive', '❌': 'negative', '⚠': 'edge'}
+_BOX_BORDERS = ('┌', '└', '├', '+-', '```', '↓')
+
+# Processos só compensam acima deste número de arquivos (o parsing de um
+# template leva ~0.3 ms; iniciar o pool custa dezenas de ms)
+PARALLEL_MIN_FILES = 512
+
+class TemplateParseError(ValueError):
+    """Erro de parsing com a localização (arquivo:linha) do problema."""
+
+    def __init__(self, message: str, line: int = 0, path: str = "<template>"):
+        self.message = message
+        self.line = line
+        self.path = path
+        super().__init__(f"{path}:{line}: {message}")
+
+    def __reduce__(self):
+        # Permite devolver o erro de um processo do pool
+        return (TemplateParseError, (self.message, self.line, self.path))
+
+class _Example:
+    """Exemplo de Baseshot em construção (campos acumulados linha a linha)."""
+
+    def __init__(self, example_type: str, label: str, line: int):
+        self.type = example_type
+        self.label = label
+        self.line = line
+        self.fields: Dict[str, List[str]] = {'input': [], 'output': []}
+        self.current: Optional[str] = None
+
+    def build(self, path: str) -> BaseshotExample:
+        for name in ('input', 'output'):
+            if not self.fields[name]:
+                raise TemplateParseError(f"Exemplo '{self.label}' sem {name.upper()}.", self.line, path)
+        example_input = _unquote("\n".join(self.fields['input']))
+        example_output = "\n".join(self.fields['output']).strip()
+        # Inverso do 'TemplateGenerator': 'saída (ERRADO: razão)' nos negativos
+        suffix = f" (ERRADO: {example_input})"
+        if self.type == 'negative' and example_output.endswith(suffix):
+            example_output = example_output[:-len(suffix)]
+        return BaseshotExample(type=self.type, input=example_input, output=example_output)
+
+def _unquote(text: str) -> str:
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        return text[1:-1]
+    return text
+
+def _box_content(raw: str) -> Optional[str]:
+    """Conteúdo de uma linha de caixa (sem a borda) ou None se não for conteúdo."""
+    stripped = raw.strip()
+    if not stripped or stripped.startswith(_BOX_BORDERS):
+        return None
+    if stripped[0] in '│|':
+        return stripped[1:].rstrip()
+    return stripped
+
+class _LayerScanner:
+    """
+    A máquina de estados das 4 camadas, alimentada linha a linha ('feed').
+    Compartilhada por 'parse_lines' (estrito) e 'parse_summary' (tolerante).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.section: Optional[str] = None
+        self.section_lines: Dict[str, int] = {}
+        self.name = ""
+        self.domain_parts: List[str] = []
+        self.mission_parts: List[str] = []
+        self.in_domain = False
+        self.protocol_items: List[str] = []
+        self.examples: List[BaseshotExample] = []
+        self.example: Optional[_Example] = None
+
+    def feed(self, line_no: int, raw: str) -> None:
+        """Consome uma linha. Lança 'TemplateParseError' se ela for inválida."""
+        path = self.path
+        content = _box_content(raw)
+        if content is None:
+            return
+        text = content.strip()
+
+        header = _SECTION_HEADER.match(text)
+        if header:
+            self.section = _SECTION_IDS[header.group(2).upper()]
+            if self.section in self.section_lines:
+                raise TemplateParseError(f"Camada '{header.group(2)}' repetida.", line_no, path)
+            self.section_lines[self.section] = line_no
+            return
+        if not text:
+            return
+        if self.section is None:
+            raise TemplateParseError(f"Conteúdo fora de uma camada: '{text[:40]}'.", line_no, path)
+
+        if self.section == 'identity':
+            domain = _DOMAIN_LINE.match(text)
+            if domain:
+                self.in_domain = True
+                self.domain_parts.append(domain.group(1))
+            elif self.in_domain:
+                self.domain_parts.append(text)
+            elif not self.name:
+                self.name = text
+            else:
+                raise TemplateParseError(f"Linha inesperada na IDENTIDADE: '{text[:40]}'.", line_no, path)
+
+        elif self.section == 'mission':
+            self.mission_parts.append(text)
+
+        elif self.section == 'protocol':
+            item = _PROTOCOL_ITEM.match(text)
+            if item:
+                self.protocol_items.append(item.group(1).strip())
+            elif self.protocol_items:
+                # Continuação do item anterior (quebra de linha no template)
+                self.protocol_items[-1] = f"{self.protocol_items[-1]} {text}"
+            else:
+                raise TemplateParseError(f"Item de PROTOCOLO sem numeração: '{text[:40]}'.", line_no, path)
+
+        else:  # baseshot
+            # Cabeçalhos e INPUT/OUTPUT ficam na margem da caixa; linhas
+            # mais indentadas são sempre continuação (ex: '│   ✅ Análise limpa.').
+            example = self.example
+            at_margin = len(content) - len(content.lstrip()) <= 1
+            example_header = _EXAMPLE_HEADER.match(text) if at_margin else None
+            if example_header:
+                if example is not None:
+                    self.examples.append(example.build(path))
+                self.example = _Example(_EXAMPLE_TYPES[example_header.group(1)[0]], example_header.group(2).strip(), line_no)
+                return
+            if example is None:
+                raise TemplateParseError(f"Linha de BASESHOT fora de um exemplo (✅/❌/⚠️): '{text[:40]}'.", line_no, path)
+            field_match = _EXAMPLE_FIELD.match(text) if at_margin else None
+            if field_match:
+                example.current = field_match.group(1).lower()
+                label, value = field_match.group(2), field_match.group(3).strip()
+                piece = f"{label}: {value}".strip() if label else value
+                if piece:
+                    example.fields[example.current].append(piece)
+                elif not example.fields[example.current]:
+                    example.fields[example.current].append("")
+            elif example.current is not None:
+                # Continuação (ex: bullets, diff ou YAML): mantém a indentação
+                example.fields[example.current].append(content[1:] if content.startswith(' ') else content)
+            else:
+                raise TemplateParseError(f"Esperado INPUT/OUTPUT no exemplo '{example.label}'.", line_no, path)
+
+    @property
+    def domain(self) -> str:
+        return " ".join(self.domain_parts).strip()
+
+    @property
+    def mission(self) -> str:
+        return " ".join(self.mission_parts)
+
+def parse_lines(lines: Iterable[str], path: str = "<template>") -> AgentConfigV1_1:
+    """
+    Parser de passada única: consome 'lines' (ex: um arquivo aberto) e
+    devolve o 'AgentConfigV1_1'. Lança 'TemplateParseError' com a linha.
+    """
+    scanner = _LayerScanner(path)
+    line_no = 0
+    for line_no, raw in enumerate(lines, start=1):
+        scanner.feed(line_no, raw)
+
+    if scanner.example is not None:
+        scanner.examples.append(scanner.example.build(path))
+
+    for section_id, label in (('identity', 'IDENTIDADE'), ('mission', 'MISSÃO'),
+                              ('protocol', 'PROTOCOLO'), ('baseshot', 'BASESHOT')):
+        if section_id not in scanner.section_lines:
+            raise TemplateParseError(f"Camada '{label}' ausente.", line_no, path)
+
+    try:
+        return AgentConfigV1_1(
+            name=scanner.name,
+            domain=scanner.domain,
+            mission=scanner.mission,
+            protocol_items=scanner.protocol_items,
+            baseshot_examples=scanner.examples
+        )
+    except ValueError as e:
+        raise TemplateParseError(str(e), scanner.section_lines[_section_for_error(str(e))], path) from e
+
+def _section_for_error(message: str) -> str:
+    """Camada responsável por um erro de validação do 'AgentConfigV1_1'."""
+    lowered = message.lower()
+    for keyword, section_id in (('baseshot', 'baseshot'), ('protocolo', 'protocol'),
+                                ('missão', 'mission'), ('domínio', 'identity'), ('identidade', 'identity')):
+        if keyword in lowered:
+            return section_id
+    return 'identity'
+
+def parse_summary(lines: Iterable[str]) -> Dict[str, str]:
+    """
+    Leitura TOLERANTE de {'identity', 'domain', 'mission'} (camadas 1 e 2)
+    sobre a máquina de estados de 'parse_lines': linhas inválidas são
+    ignoradas e a leitura para depois das duas camadas. Nunca lança: campos
+    ausentes ficam "" (usada pelo índice de similaridade, 'template_index.py').
+    """
+    scanner = _LayerScanner("<template>")
+    for line_no, raw in enumerate(lines, start=1):
+        try:
+            scanner.feed(line_no, raw)
+        except TemplateParseError:
+            continue
+        if scanner.section in ('protocol', 'baseshot') and {'identity', 'mission'} <= scanner.section_lines.keys():
+            break
+
+    return {'identity': scanner.name, 'domain': scanner.domain, 'mission': scanner.mission}
+
+def parse_text(text: str, path: str = "<template>") -> AgentConfigV1_1:
+    """Parser de um template já em memória."""
+    return parse_lines(text.splitlines(), path)
+
+def parse_file(path: Union[str, Path]) -> AgentConfigV1_1:
+    """Parser de um arquivo .md (lido em streaming)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_lines(f, str(path))
+
+# --- Modo Lote ---
+
+ParseResult = Tuple[str, Optional[AgentConfigV1_1], Optional[TemplateParseError]]
+
+def _parse_path(path: str) -> ParseResult:
+    """Tarefa do pool: nunca lança, devolve (path, config, erro)."""
+    try:
+        return path, parse_file(path), None
+    except TemplateParseError as e:
+        return path, None, e
+    except (OSError, UnicodeDecodeError) as e:
+        return path, None, TemplateParseError(str(e), 0, path)
+
+def parse_directory(
+    directory: Union[str, Path],
+    pattern: str = "**/*.md",
+    workers: Optional[int] = None
+) -> List[ParseResult]:
+    """
+    Parser de todos os templates de 'directory', em ordem de caminho.
+    Acima de PARALLEL_MIN_FILES arquivos, usa um ProcessPoolExecutor.
+    """
+    paths = [str(p) for p in sorted(Path(directory).glob(pattern)) if p.is_file()]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) < PARALLEL_MIN_FILES:
+        return [_parse_path(p) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(paths) // (workers * 4))
+        return list(pool.map(_parse_path, paths, chunksize=chunksize))
+
+# --- Executor CLI ---
+
+def main():
+    """
+    Ponto de entrada do CLI.
+    """
+    parser = argparse.ArgumentParser(
+        description='Parser de templates ASCII-box -> AgentConfigV1_1 (ACC v1.1.0)'
+    )
+    parser.add_argument('path', type=str,
+                        help='Arquivo .md ou diretório de templates.')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processos no modo diretório (Padrão: CPUs).')
+    parser.add_argument('--json', action='store_true',
+                        help='Imprime as configs em JSON (uma por linha).')
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if Path(args.path).is_dir():
+        results = parse_directory(args.path, workers=args.workers)
+    else:
+        results = [_parse_path(args.path)]
+    elapsed = time.perf_counter() - start
+
+    errors = 0
+    for path, config, error in results:
+        if error is not None:
+            errors += 1
+            print(f"❌ {error}", file=sys.stderr)
+        elif args.json:
+            print(json.dumps({'path': path, **asdict(config)}, ensure_ascii=False))
+        else:
+            print(f"✅ {path}: {config.name} ({len(config.protocol_items)} protocolo, "
+                  f"{len(config.baseshot_examples)} exemplos)")
+
+    print(f"\n{len(results)} template(s), {errors} erro(s) em {elapsed * 1000:.1f} ms.", file=sys.stderr)
+    if errors:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,27 @@
 # OBJETIVO:
 # Validar a métrica de "Minimalismo" (< 200 tokens) 
 # usando o tokenizer padrão da OpenAI (GPT-4).
+#
+# MODO AUDITORIA (diretórios, globs ou vários arquivos):
+# - Tokeniza em lote ('encode_batch', multi-thread) só os arquivos novos ou
+#   alterados; o manifesto (ACC_TOKEN_MANIFEST) guarda (path, hash) -> contagem
+#   dos arquivos da última auditoria (os demais são descartados).
+# - Saída em tabela, JSON ou CSV; código de saída 1 se algum arquivo
+#   exceder THRESHOLD_TOKEN_PASS (pronto para um hook de pre-commit).
 
+import csv
+import glob
+import hashlib
+import json
+import os
 import sys
 import tiktoken
 import argparse
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from metrics import TOKENIZE_SECONDS, timed
 
 # Tokenizer padrão da indústria (usado pelo GPT-4, GPT-3.5-Turbo, etc.)
 TOKENIZER_NAME = "cl100k_base"
@@ -16,6 +32,17 @@ TOKENIZER_NAME = "cl100k_base"
 # --- Constante de Validação (A "Ciência" do ACC) ---
 THRESHOLD_TOKEN_PASS = 200
 
+# Manifesto da auditoria: (path, hash do conteúdo) -> contagens
+DEFAULT_MANIFEST = os.getenv(
+    "ACC_TOKEN_MANIFEST",
+    str(Path.home() / ".cache" / "acc" / "token-manifest.json")
+)
+
+@lru_cache(maxsize=None)
+def get_encoding():
+    """Tokenizer 'cl100k_base', carregado uma vez por processo."""
+    return tiktoken.get_encoding(TOKENIZER_NAME)
+
 def count_tokens_from_file(file_path: str) -> (int, str):
     """
     Lê um arquivo e conta seus tokens usando o tokenizer 'cl100k_base'.
@@ -33,8 +60,9 @@ def count_tokens_from_file(file_path: str) -> (int, str):
         sys.exit(1)
 
     try:
-        encoding = tiktoken.get_encoding(TOKENIZER_NAME)
-        token_list = encoding.encode(content)
+        encoding = get_encoding()
+        with timed(TOKENIZE_SECONDS, tool='token_counter'):
+            token_list = encoding.encode(content)
         token_count = len(token_list)
         return token_count, content
     except Exception as e:
@@ -42,23 +70,189 @@ def count_tokens_from_file(file_path: str) -> (int, str):
         print("Tente: pip install tiktoken", file=sys.stderr)
         sys.exit(1)
 
+# --- Modo Auditoria (Biblioteca Inteira) ---
+
+def expand_paths(patterns: List[str], extension: str = ".md") -> List[Path]:
+    """Arquivos de 'patterns' (arquivos, diretórios ou globs), sem repetição."""
+    found: Dict[str, Path] = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = sorted(path.rglob(f"*{extension}"))
+        elif path.is_file():
+            matches = [path]
+        else:
+            matches = sorted(Path(p) for p in glob.glob(pattern, recursive=True))
+        for match in matches:
+            if match.is_file():
+                found.setdefault(str(match.resolve()), match)
+    return list(found.values())
+
+def _load_manifest(manifest_path: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    if not manifest_path or not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # Contagens de outro tokenizer não valem
+    if manifest.get('tokenizer') != TOKENIZER_NAME:
+        return {}
+    return manifest.get('files', {})
+
+def _save_manifest(manifest_path: str, files: Dict[str, Dict[str, Any]]) -> None:
+    Path(manifest_path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'tokenizer': TOKENIZER_NAME, 'files': files}, f, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+def audit_files(
+    paths: List[Path],
+    manifest_path: Optional[str] = DEFAULT_MANIFEST,
+    num_threads: int = 8
+) -> List[Dict[str, Any]]:
+    """
+    Conta os tokens de vários arquivos. Um arquivo é reaproveitado do
+    manifesto se o (tamanho, mtime) OU o hash do conteúdo não mudaram;
+    os demais são tokenizados juntos, em um único 'encode_batch'. O
+    manifesto salvo guarda só os arquivos desta execução: entradas de
+    arquivos removidos (ou fora de 'paths') são descartadas.
+    """
+    manifest = _load_manifest(manifest_path)
+    rows: List[Dict[str, Any]] = []
+    pending: List[tuple] = []
+    seen = set()
+    dirty = False
+
+    for path in paths:
+        key = str(path.resolve())
+        seen.add(key)
+        stat = path.stat()
+        entry = manifest.get(key)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            rows.append(entry)
+            continue
+
+        raw = path.read_bytes()
+        sha256 = hashlib.sha256(raw).hexdigest()
+        if entry and entry['sha256'] == sha256:
+            entry = {**entry, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+            manifest[key] = entry
+            dirty = True
+            rows.append(entry)
+            continue
+
+        content = raw.decode('utf-8')
+        entry = {
+            'path': str(path),
+            'sha256': sha256,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'tokens': 0,
+            'words': len(content.split()),
+            'chars': len(content)
+        }
+        rows.append(entry)
+        pending.append((key, entry, content))
+
+    if pending:
+        with timed(TOKENIZE_SECONDS, tool='token_counter'):
+            counts = get_encoding().encode_batch([content for _, _, content in pending], num_threads=num_threads)
+        for (key, entry, _), tokens in zip(pending, counts):
+            entry['tokens'] = len(tokens)
+            manifest[key] = entry
+
+    stale = manifest.keys() - seen
+    for key in stale:
+        del manifest[key]
+
+    if manifest_path and (pending or dirty or stale):
+        _save_manifest(manifest_path, manifest)
+
+    return [
+        {'path': row['path'], 'tokens': row['tokens'], 'words': row['words'], 'chars': row['chars'],
+         'status': 'PASS' if row['tokens'] <= THRESHOLD_TOKEN_PASS else 'FAIL'}
+        for row in rows
+    ]
+
+def write_audit(rows: List[Dict[str, Any]], fmt: str, output) -> None:
+    """Escreve a tabela da auditoria em 'table', 'json' ou 'csv'."""
+    if fmt == 'json':
+        json.dump({'threshold': THRESHOLD_TOKEN_PASS, 'tokenizer': TOKENIZER_NAME, 'files': rows},
+                  output, ensure_ascii=False, indent=2)
+        output.write("\n")
+    elif fmt == 'csv':
+        writer = csv.DictWriter(output, fieldnames=['path', 'tokens', 'words', 'chars', 'status'])
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        for row in rows:
+            icon = '✅' if row['status'] == 'PASS' else '❌'
+            output.write(f"{icon} {row['tokens']:>6}  {row['path']}\n")
+        failed = sum(row['status'] == 'FAIL' for row in rows)
+        output.write(f"\n{len(rows)} arquivo(s), {failed} acima de {THRESHOLD_TOKEN_PASS} tokens.\n")
+
+def run_audit(args) -> int:
+    """Executa o modo auditoria. Retorna o código de saída."""
+    paths = expand_paths(args.template_file)
+    if not paths:
+        print("Erro: Nenhum arquivo encontrado.", file=sys.stderr)
+        return 1
+
+    try:
+        rows = audit_files(paths, None if args.no_cache else args.manifest, num_threads=args.threads)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Erro ao ler os arquivos: {e}", file=sys.stderr)
+        return 1
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='') as f:
+            write_audit(rows, args.format, f)
+    else:
+        write_audit(rows, args.format, sys.stdout)
+
+    return 1 if any(row['status'] == 'FAIL' for row in rows) else 0
+
 def main():
     """
     Ponto de entrada do CLI.
     """
     parser = argparse.ArgumentParser(
         description=f'Contador de Tokens (ACC v1.1.0) - Padrão: {TOKENIZER_NAME}',
-        epilog="Exemplo: python tools/token-counter.py templates/hacker-semantico.md"
+        epilog="""Exemplos:
+  python tools/token-counter.py templates/hacker-semantico.md
+  python tools/token-counter.py templates/ --format json
+  python tools/token-counter.py "templates/**/*.md" --format csv -o tokens.csv""",
+        formatter_class=argparse.RawDescriptionHelpFormatter
     )
     
     parser.add_argument(
         'template_file', 
         type=str, 
-        help='Caminho para o arquivo .md do template do Agente.'
+        nargs='+',
+        help='Arquivo .md do template do Agente, ou diretórios/globs (modo auditoria).'
     )
+    parser.add_argument('--format', choices=['table', 'json', 'csv'], default=None,
+                        help='Saída do modo auditoria (Padrão: table).')
+    parser.add_argument('-o', '--output', type=str, default=None,
+                        help='Arquivo de saída do modo auditoria (Padrão: stdout).')
+    parser.add_argument('--manifest', type=str, default=DEFAULT_MANIFEST,
+                        help=f'Manifesto de contagens (Padrão: {DEFAULT_MANIFEST}).')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Ignora o manifesto (recontagem completa).')
+    parser.add_argument('--threads', type=int, default=8,
+                        help='Threads do encode_batch (Padrão: 8).')
     
     args = parser.parse_args()
     
+    # Um único arquivo (sem --format): relatório detalhado. Senão: auditoria.
+    if len(args.template_file) > 1 or args.format or not Path(args.template_file[0]).is_file():
+        args.format = args.format or 'table'
+        sys.exit(run_audit(args))
+    args.template_file = args.template_file[0]
+    
     token_count, content = count_tokens_from_file(args.template_file)
     word_count = len(content.split())
     char_count = len(content)
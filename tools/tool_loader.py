@@ -0,0 +1,56 @@
+# tools/tool_loader.py
+# v1.1.0 - Carga de Scripts pelo Caminho
+#
+# OBJETIVO:
+# Alguns scripts de 'tools/' têm nomes que não são módulos importáveis
+# ('api-endpoint.py', 'token-counter.py', 'cli-test.py'). Um único loader
+# os importa pelo caminho, sem rodar o main(), registrados em sys.modules
+# sob um nome válido ('api-endpoint.py' -> 'api_endpoint'): um segundo
+# 'load_tool' (ou um 'import api_endpoint') reusa o mesmo módulo.
+#
+# USO:
+# api = load_tool('api-endpoint.py')          # relativo a 'tools/'
+# app = load_tool('/caminho/para/app.py')
+
+import importlib.util
+import re
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Optional, Union
+
+TOOLS_DIR = Path(__file__).resolve().parent
+
+def module_name_for(path: Union[str, Path]) -> str:
+    """Nome de módulo importável para um arquivo (ex: 'api-endpoint.py' -> 'api_endpoint')."""
+    return re.sub(r'\W', '_', Path(path).stem.strip())
+
+def load_tool(path: Union[str, Path], module_name: Optional[str] = None) -> ModuleType:
+    """
+    Importa o arquivo 'path' (relativo ao diretório atual ou a 'tools/')
+    como 'module_name'. O diretório do arquivo entra no sys.path, como ao
+    rodar 'python tools/x.py', para que os imports irmãos funcionem.
+    """
+    path = Path(path)
+    if not path.is_file() and not path.is_absolute():
+        path = TOOLS_DIR / path
+    if not path.is_file():
+        raise ImportError(f"Arquivo não encontrado: {path}")
+    path = path.resolve()
+    module_name = module_name or module_name_for(path)
+
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+
+    if str(path.parent) not in sys.path:
+        sys.path.insert(0, str(path.parent))
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        sys.modules.pop(module_name, None)
+        raise
+    return module
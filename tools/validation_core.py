@@ -2,9 +2,20 @@
 # Versão Minimalista para Notebook Colab
 # Implementa SD (Densidade Semântica) e Minimalismo.
 
-from sentence_transformers import SentenceTransformer, util
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
 import time
-from typing import Tuple, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Dict, Any, Callable, Optional, Iterable, Iterator, List
+
+import numpy as np
+
+from embedding_cache import get_cache, cosine_matrix, normalize_text
+from model_registry import cache_id, get_model, get_registry
 
 # --- Constantes de Validação (A "Ciência" do ACC) ---
 EMBEDDING_MODELS = {
@@ -16,67 +27,239 @@ THRESHOLD_PASS = 0.70  # Threshold principal para SD (Cosine Sim)
 THRESHOLD_MIN_CROSS_PLATFORM = 0.55 # Mínimo aceitável em benchmark
 THRESHOLD_MINIMALISM = 3 # Número máximo de palavras no Nome do Agente
 
-# Armazenamento em cache para modelos já carregados
-_LOADED_MODELS = {}
+# Modo Cascata: do modelo mais barato para o mais caro
+CASCADE_ORDER = ['miniLM', 'mpnet', 'multilingual']
+SD_UPPER_BOUND = 1.0 # Cosine Sim máxima possível (limite para os modelos não avaliados)
+
+# 'torch.set_num_threads' é global: serializa quem o altera (ver '_score_models_parallel')
+_TORCH_THREADS_LOCK = threading.Lock()
 
-def load_models() -> Dict[str, SentenceTransformer]:
+def load_models(verbose: bool = True) -> Dict[str, Any]:
     """
-    Carrega todos os modelos de embedding UMA VEZ e os armazena em cache.
+    Carrega (warmup) todos os modelos de embedding UMA VEZ, via o registro
+    compartilhado (model_registry), e os retorna por chave.
+    
+    As funções de validação NÃO precisam desta chamada: elas carregam cada
+    modelo sob demanda (ex: a cascata pode nunca carregar o 'mpnet').
+    Com verbose=False, as mensagens de progresso vão para stderr.
     """
-    global _LOADED_MODELS
-    if _LOADED_MODELS:
-        return _LOADED_MODELS
-
-    print(f"⏳ Carregando {len(EMBEDDING_MODELS)} modelos de embedding...")
+    log = sys.stdout if verbose else sys.stderr
+    print(f"⏳ Carregando {len(EMBEDDING_MODELS)} modelos de embedding...", file=log)
     start_load = time.time()
     
-    try:
-        for key, model_name in EMBEDDING_MODELS.items():
-            _LOADED_MODELS[key] = SentenceTransformer(model_name)
-    except Exception as e:
-        # No Colab, erros fatais devem ser lançados para a célula falhar.
-        raise RuntimeError(f"❌ ERRO FATAL: Falha ao carregar modelos: {e}")
+    # No Colab, erros fatais (RuntimeError) devem ser lançados para a célula falhar.
+    models = get_registry().warmup(EMBEDDING_MODELS.values())
             
     load_time = time.time() - start_load
-    print(f"✅ Modelos carregados e prontos em {load_time:.2f}s.")
-    return _LOADED_MODELS
+    print(f"✅ Modelos carregados e prontos em {load_time:.2f}s.", file=log)
+    return {key: models[model_name] for key, model_name in EMBEDDING_MODELS.items()}
 
-def calculate_sd(name: str, domain: str, model: SentenceTransformer) -> Tuple[float, int]:
+def calculate_sd(name: str, domain: str, model: Any, model_name: Optional[str] = None) -> Tuple[float, int]:
     """
     Calcula a Densidade Semântica (SD) e a contagem de palavras.
+    
+    Com 'model_name', as embeddings passam pelo cache compartilhado
+    (embedding_cache) e só os textos inéditos são codificados. Nesse caso,
+    'model' pode ser uma função sem argumentos que retorna o modelo.
     """
-    embed_name = model.encode(name, convert_to_tensor=True)
-    embed_domain = model.encode(domain, convert_to_tensor=True)
+    if model_name:
+        embeddings = get_cache().encode([name, domain], cache_id(model_name), model)
+    else:
+        embeddings = model.encode([name, domain], convert_to_numpy=True)
     
     # SD é a Similaridade de Cossenos.
-    sd = util.cos_sim(embed_name, embed_domain)[0][0].item()
+    sd = float(cosine_matrix(embeddings[0], embeddings[1])[0][0])
     word_count = len(name.split())
     
     return sd, word_count
 
-def run_validation(name: str, domain: str) -> Dict[str, Any]:
+def _model_loader(key: str) -> Callable[[], Any]:
+    """Função que obtém (sob demanda) o modelo 'key' do registro."""
+    return lambda: get_model(EMBEDDING_MODELS[key])
+
+def _score_model(key: str, name: str, domain: str) -> Tuple[float, int, Dict[str, float]]:
+    """
+    Calcula a SD de UM modelo e mede o tempo de parede e de CPU (da thread).
+    """
+    start_wall = time.perf_counter()
+    start_cpu = time.thread_time()
+    
+    sd, wc = calculate_sd(name, domain, _model_loader(key), EMBEDDING_MODELS[key])
+    
+    timing = {
+        'wall_s': time.perf_counter() - start_wall,
+        'cpu_s': time.thread_time() - start_cpu
+    }
+    return sd, wc, timing
+
+def run_validation(
+    name: str,
+    domain: str,
+    parallel: bool = False,
+    threads_per_model: Optional[int] = None,
+    cascade: bool = False
+) -> Dict[str, Any]:
     """
     Executa a validação multi-modelo e retorna um dicionário consolidado.
+    
+    Args:
+        name: Nome do agente.
+        domain: Domínio alvo.
+        parallel: Se True, os modelos de EMBEDDING_MODELS rodam em paralelo
+            (uma thread por modelo; o torch libera o GIL durante o forward).
+            O resultado é o mesmo do modo sequencial: a ordem dos modelos é
+            sempre a de EMBEDDING_MODELS, independente de quem termina antes.
+        threads_per_model: (Apenas com parallel) valor de 'torch.set_num_threads'
+            durante a execução (ex: 32 núcleos / 3 modelos = 10). A configuração
+            é GLOBAL do processo, não por modelo: cada thread de modelo abre sua
+            própria equipe intra-op com esse tamanho, então o total fica em
+            ~threads_per_model x modelos. Por isso, chamadas com
+            'threads_per_model' são serializadas (ver '_TORCH_THREADS_LOCK').
+            None mantém a configuração atual do torch.
+        cascade: Se True, avalia os modelos em CASCADE_ORDER (do mais barato
+            ao mais caro) e para no primeiro com SD < THRESHOLD_MIN_CROSS_PLATFORM
+            (ver 'cascade_decided'). Incompatível com 'parallel'.
+    
+    O campo 'timing' traz o tempo de parede vs. tempo de CPU (total e por modelo).
+    'models_evaluated' lista os modelos que foram de fato executados; com
+    'sd_partial' = True (parada antecipada), 'sd_mean'/'sd_min' cobrem só
+    esses modelos e NÃO são comparáveis aos de uma execução completa.
     """
-    loaded_models = load_models()
+    if parallel and cascade:
+        raise ValueError("Os modos 'parallel' e 'cascade' são mutuamente exclusivos.")
+    
+    keys = list(EMBEDDING_MODELS.keys())
     results = {}
+    per_model_timing = {}
     
     print(f"\n{'='*70}")
     print(f"🔬 VALIDANDO: {name} | Domínio: {domain}")
     print(f"{'='*70}")
     
     word_count = 0
-    sd_values = []
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
     
-    for key, model in loaded_models.items():
+    if parallel:
+        scored = _score_models_parallel(keys, name, domain, threads_per_model)
+    elif cascade:
+        scored = _score_models_cascade(keys, name, domain)
+    else:
+        scored = [(key, *_score_model(key, name, domain)) for key in keys]
+    
+    for key, sd, wc, timing in scored:
         # print(f"Testando modelo: {key}...") # Removido para minimalismo no output
-        sd, wc = calculate_sd(name, domain, model)
         if word_count == 0:
             word_count = wc
             
         results[key] = {'sd': sd}
-        sd_values.append(sd)
-        
+        per_model_timing[key] = timing
+    
+    verdict = build_verdict(results, word_count)
+    mark_evaluated(verdict, results)
+    verdict['timing'] = {
+        'mode': 'parallel' if parallel else 'cascade' if cascade else 'sequential',
+        'wall_s': time.perf_counter() - start_wall,
+        'cpu_s': time.process_time() - start_cpu,
+        'per_model': per_model_timing
+    }
+    return verdict
+
+def _score_models_parallel(
+    keys: List[str],
+    name: str,
+    domain: str,
+    threads_per_model: Optional[int]
+) -> List[Tuple[str, float, int, Dict[str, float]]]:
+    """
+    Roda '_score_model' para todos os modelos em um pool de threads.
+    Retorna os resultados na ordem de 'keys' (determinístico).
+    """
+    if not threads_per_model:
+        return _run_models_pool(keys, name, domain)
+    
+    import torch
+    # 'set_num_threads' vale para o processo inteiro: sem o lock, uma chamada
+    # concorrente restauraria o valor no meio da execução desta.
+    with _TORCH_THREADS_LOCK:
+        previous_threads = torch.get_num_threads()
+        torch.set_num_threads(threads_per_model)
+        try:
+            return _run_models_pool(keys, name, domain)
+        finally:
+            torch.set_num_threads(previous_threads)
+
+def _run_models_pool(
+    keys: List[str],
+    name: str,
+    domain: str
+) -> List[Tuple[str, float, int, Dict[str, float]]]:
+    with ThreadPoolExecutor(max_workers=len(keys), thread_name_prefix='acc-model') as pool:
+        futures = {key: pool.submit(_score_model, key, name, domain) for key in keys}
+        return [(key, *future.result()) for key, future in futures.items()]
+
+def cascade_decided(sd_values: List[float]) -> bool:
+    """
+    Retorna True se o REPROVADO de densidade já é certo, seja qual for a SD
+    dos modelos ainda não avaliados: algum modelo avaliado ficou abaixo de
+    THRESHOLD_MIN_CROSS_PLATFORM (então sd_min < 0.55, com certeza).
+    
+    É a ÚNICA regra de parada. Um limite pela média (restantes em SD 1.0)
+    nunca dispara antes do último modelo: com todas as SDs >= 0.55 e 3
+    modelos, a melhor média possível é >= 0.85 após um modelo e >= 0.70
+    após dois. O APROVADO nunca é antecipado: um modelo restante sempre
+    pode ficar < 0.55.
+    """
+    return min(sd_values) < THRESHOLD_MIN_CROSS_PLATFORM
+
+def best_possible_mean(sd_values: List[float], n_models: int) -> float:
+    """
+    Maior SD média que um par ainda pode alcançar, com os modelos não
+    avaliados no limite SD_UPPER_BOUND. Não antecipa o REPROVADO (ver
+    'cascade_decided'), mas serve para podar um ranking: um candidato cujo
+    limite fica abaixo da média do k-ésimo melhor já não entra no top-k.
+    """
+    remaining = n_models - len(sd_values)
+    return (sum(sd_values) + remaining * SD_UPPER_BOUND) / n_models
+
+def mark_evaluated(verdict: Dict[str, Any], results: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+    """
+    Registra no veredito quais modelos foram avaliados ('models_evaluated')
+    e se o resultado é parcial ('sd_partial': parada antecipada da cascata;
+    'sd_mean'/'sd_min' cobrem só os modelos avaliados).
+    """
+    verdict['models_evaluated'] = list(results.keys())
+    verdict['sd_partial'] = len(results) < len(EMBEDDING_MODELS)
+    return verdict
+
+def _score_models_cascade(
+    keys: List[str],
+    name: str,
+    domain: str
+) -> List[Tuple[str, float, int, Dict[str, float]]]:
+    """
+    Roda '_score_model' em CASCADE_ORDER e para quando 'cascade_decided'.
+    Retorna apenas os modelos avaliados.
+    """
+    scored = []
+    for key in cascade_order(keys):
+        scored.append((key, *_score_model(key, name, domain)))
+        if cascade_decided([sd for _, sd, _, _ in scored]):
+            break
+    return scored
+
+def cascade_order(keys: List[str]) -> List[str]:
+    """Chaves dos modelos na ordem da cascata (extras vão para o fim)."""
+    ordered = [key for key in CASCADE_ORDER if key in keys]
+    return ordered + [key for key in keys if key not in ordered]
+
+def build_verdict(results: Dict[str, Dict[str, float]], word_count: int) -> Dict[str, Any]:
+    """
+    Aplica o Veredito Final (Lógica de Dupla Condição) sobre as SDs por modelo.
+    Compartilhado por 'run_validation' e 'run_validation_bulk'.
+    """
+    sd_values = [r['sd'] for r in results.values()]
+    
     # --- Veredito Final (Lógica de Dupla Condição) ---
     sd_mean = sum(sd_values) / len(sd_values)
     sd_min = min(sd_values)
@@ -102,4 +285,238 @@ def run_validation(name: str, domain: str) -> Dict[str, Any]:
         }
     }
 
+# --- Modo Bulk (Validação em Lote) ---
+
+def read_records(path: str, fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Lê registros (name, domain) de um arquivo JSONL ou CSV, em streaming.
+    
+    Args:
+        path: Caminho do arquivo ('-' para stdin).
+        fmt: 'jsonl' ou 'csv'. Se None, deduzido pela extensão (padrão: jsonl).
+        
+    Aceita 'agent_name' como sinônimo de 'name' (mesmo contrato da API).
+    Uma linha malformada (JSON inválido, não-objeto, name/domain que não são
+    texto) NÃO interrompe o lote: vira um registro {'line', 'error'}, como
+    no endpoint de lote da API.
+    """
+    fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+    f = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8', newline='')
+    
+    try:
+        if fmt == 'csv':
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield _record_from_row(row, reader.line_num)
+            return
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield _invalid_record(line_number, f"JSON inválido: {e}")
+                continue
+            yield _record_from_row(row, line_number)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def _invalid_record(line_number: int, error: str) -> Dict[str, Any]:
+    return {'name': None, 'domain': None, 'line': line_number, 'error': f"Linha {line_number}: {error}"}
+
+def _record_from_row(row: Any, line_number: int) -> Dict[str, Any]:
+    """Registro {'name', 'domain'} de uma linha lida, ou um registro de erro."""
+    if not isinstance(row, dict):
+        return _invalid_record(line_number, f"esperado um objeto {{name, domain}}, recebido {type(row).__name__}.")
+    record = {'name': row.get('name', row.get('agent_name')), 'domain': row.get('domain')}
+    for field, value in record.items():
+        if value is not None and not isinstance(value, str):
+            return _invalid_record(line_number, f"'{field}' deve ser texto, recebido {type(value).__name__}.")
+    return record
+
+def _encode_unique(texts: List[str], model_key: str, batch_size: int) -> np.ndarray:
+    """
+    Codifica textos únicos (já normalizados) ordenados por tamanho, para que
+    cada batch tenha sequências de comprimento parecido (menos padding).
+    Retorna as embeddings L2-normalizadas, na ordem original de 'texts'.
+    """
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    embeddings = get_cache().encode(
+        [texts[i] for i in order], cache_id(EMBEDDING_MODELS[model_key]), _model_loader(model_key), batch_size=batch_size
+    )
+    
+    unsorted = np.empty_like(embeddings)
+    unsorted[order] = embeddings
+    return unsorted / np.clip(np.linalg.norm(unsorted, axis=1, keepdims=True), 1e-12, None)
+
+def run_validation_bulk(
+    records: Iterable[Dict[str, str]],
+    chunk_size: int = 4096,
+    batch_size: int = 128,
+    cascade: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """
+    Valida um fluxo de registros {'name', 'domain'} em lote.
+    
+    Para cada bloco de 'chunk_size' registros: remove textos duplicados,
+    codifica por modelo em batches grandes ordenados por tamanho e calcula
+    todas as SDs de forma vetorizada. Emite UM resultado por entrada, na
+    ordem de entrada, com os mesmos campos de 'run_validation'.
+    A memória fica limitada ao tamanho do bloco.
+    
+    Com cascade=True, cada modelo (em CASCADE_ORDER) só codifica os textos
+    dos registros ainda indecisos (ver 'cascade_decided'); os registros
+    parados antes do último modelo saem com 'sd_partial' = True.
+    """
+    chunk: List[Dict[str, str]] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield from _validate_chunk(chunk, batch_size, cascade)
+            chunk = []
+    if chunk:
+        yield from _validate_chunk(chunk, batch_size, cascade)
+
+def _is_text(value: Any) -> bool:
+    return isinstance(value, str) and bool(value.strip())
+
+def _validate_chunk(
+    chunk: List[Dict[str, str]],
+    batch_size: int,
+    cascade: bool
+) -> Iterator[Dict[str, Any]]:
+    """Valida um bloco de registros (ver 'run_validation_bulk')."""
+    # 1. Deduplicação: cada texto único recebe um índice de linha
+    text_index: Dict[str, int] = {}
+    pairs = []
+    for record in chunk:
+        name, domain = record.get('name'), record.get('domain')
+        if record.get('error') or not _is_text(name) or not _is_text(domain):
+            pairs.append(None)
+            continue
+        rows = []
+        for text in (normalize_text(name), normalize_text(domain)):
+            rows.append(text_index.setdefault(text, len(text_index)))
+        pairs.append(tuple(rows))
+    
+    valid = [p for p in pairs if p is not None]
+    n_valid = len(valid)
+    keys = cascade_order(list(EMBEDDING_MODELS.keys())) if cascade else list(EMBEDDING_MODELS.keys())
+    
+    # sd_matrix[i, j] = SD do registro válido i no modelo keys[j] (NaN = não avaliado)
+    sd_matrix = np.full((n_valid, len(keys)), np.nan)
+    
+    # 2. Encode por modelo (um batch grande) + SD vetorizada
+    if valid:
+        texts = list(text_index.keys())
+        name_rows = np.array([p[0] for p in valid])
+        domain_rows = np.array([p[1] for p in valid])
+        active = np.ones(n_valid, dtype=bool)
+        
+        for j, key in enumerate(keys):
+            if not active.any():
+                break
+            # Só os textos dos registros ainda ativos (indecisos)
+            needed = np.unique(np.concatenate([name_rows[active], domain_rows[active]]))
+            encoded = _encode_unique([texts[i] for i in needed], key, batch_size)
+            embeddings = np.zeros((len(texts), encoded.shape[1]), dtype=encoded.dtype)
+            embeddings[needed] = encoded
+            
+            sd_matrix[active, j] = np.einsum(
+                'ij,ij->i', embeddings[name_rows[active]], embeddings[domain_rows[active]]
+            )
+            
+            if cascade:
+                active &= ~(sd_matrix[:, j] < THRESHOLD_MIN_CROSS_PLATFORM)
+    
+    # 3. Um resultado por entrada, na ordem de entrada
+    position = 0
+    for record, pair in zip(chunk, pairs):
+        if pair is None:
+            yield {
+                'name': record.get('name'),
+                'domain': record.get('domain'),
+                **({'line': record['line']} if 'line' in record else {}),
+                'error': record.get('error') or "Registro inválido: 'name' e 'domain' são obrigatórios (texto)."
+            }
+            continue
+        results = {
+            key: {'sd': float(sd_matrix[position, j])}
+            for j, key in enumerate(keys)
+            if not np.isnan(sd_matrix[position, j])
+        }
+        position += 1
+        verdict = build_verdict(results, len(record['name'].split()))
+        mark_evaluated(verdict, results)
+        yield {
+            'name': record['name'],
+            'domain': record['domain'],
+            **verdict
+        }
+
+# --- Executor CLI ---
+
+def main():
+    """
+    Ponto de entrada do CLI.
+    """
+    parser = argparse.ArgumentParser(
+        description='Validação SD + Minimalismo (ACC v1.1.0)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+==========================================
+EXEMPLOS DE USO
+==========================================
+
+# 1. Validação de um único par:
+$ python tools/validation_core.py "Explorador de API" "Explorar API"
+
+# 2. Validação em lote (JSONL ou CSV com colunas name,domain):
+$ python tools/validation_core.py --bulk candidatos.jsonl -o resultados.jsonl
+$ cat candidatos.csv | python tools/validation_core.py --bulk - --format csv
+"""
+    )
+    parser.add_argument('name', type=str, nargs='?', help='Nome do agente (ex: "Explorador de API")')
+    parser.add_argument('domain', type=str, nargs='?', help='Domínio alvo (ex: "Explorar API")')
+    parser.add_argument('--bulk', type=str, metavar='ARQUIVO',
+                        help='Arquivo JSONL/CSV de registros (name, domain). "-" para stdin.')
+    parser.add_argument('--format', type=str, choices=['jsonl', 'csv'], default=None,
+                        help='Formato da entrada do --bulk (Padrão: pela extensão).')
+    parser.add_argument('-o', '--output', type=str, default='-',
+                        help='Arquivo JSONL de saída do --bulk (Padrão: stdout).')
+    parser.add_argument('--batch-size', type=int, default=128,
+                        help='Tamanho do batch de encode no --bulk (Padrão: 128).')
+    parser.add_argument('--parallel', action='store_true',
+                        help='Executa os modelos em paralelo (uma thread por modelo).')
+    parser.add_argument('--cascade', action='store_true',
+                        help='Modo cascata: pula modelos caros quando o REPROVADO já é certo.')
+    parser.add_argument('--threads-per-model', type=int, default=None,
+                        help='Com --parallel: threads intra-op do torch (global; cada modelo abre uma equipe desse tamanho) '
+                             f'(ex: {max(1, (os.cpu_count() or 1) // len(EMBEDDING_MODELS))} nesta máquina).')
+    
+    args = parser.parse_args()
+    
+    if args.bulk:
+        out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+        try:
+            for result in run_validation_bulk(read_records(args.bulk, args.format),
+                                              batch_size=args.batch_size, cascade=args.cascade):
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        return
+    
+    if not args.name or not args.domain:
+        parser.error("Informe 'name' e 'domain', ou use --bulk ARQUIVO.")
+    
+    result = run_validation(args.name, args.domain, parallel=args.parallel,
+                            threads_per_model=args.threads_per_model, cascade=args.cascade)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
+
 # Fim do Arquivo validation_core.py
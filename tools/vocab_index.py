@@ -0,0 +1,341 @@
+# tools/vocab_index.py
+# v1.1.0 - Índice de Vocabulário (Sugestão de Nomes)
+#
+# OBJETIVO:
+# Sugerir nomes (<= 3 palavras) que maximizam a SD contra um domínio, sem
+# recarregar o modelo a cada consulta.
+#
+# FUNCIONAMENTO:
+# 1. (BUILD) Um vocabulário técnico PT/EN é codificado UMA vez por modelo e
+#    salvo como matriz compacta (float16, linhas normalizadas) em .npz.
+# 2. (QUERY) Top-k por produto escalar contra a embedding do domínio e
+#    beam search sobre combinações de até 3 palavras (média normalizada
+#    dos vetores das palavras). Milissegundos, sem modelo carregado, QUANDO
+#    a embedding do domínio já existe (relatório/API a repassam; ou o
+#    domínio está no cache de embeddings). Um domínio inédito no 'query'
+#    exige UM encode: o modelo é carregado (ou o daemon de scoring responde).
+# 3. (RERANK, opcional) Os melhores nomes são re-pontuados com o modelo.
+# 4. (VERSÃO) O .npz guarda o hash do vocabulário e o modelo: um índice de
+#    outro vocabulário (ex: o embutido mudou) ou modelo é reconstruído na carga.
+#
+# USO (CLI):
+# $ python tools/vocab_index.py build --model miniLM
+# $ python tools/vocab_index.py query "análise forense de APIs" --model miniLM --top-k 10
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+import model_registry
+
+# --- Configuração ---
+DEFAULT_INDEX_DIR = os.getenv("ACC_VOCAB_INDEX_DIR", str(Path.home() / ".cache" / "acc" / "vocab"))
+MAX_WORDS = 3  # Regra do Minimalismo
+
+# Vocabulário padrão (PT/EN): termos técnicos, ações e papéis de agente.
+# Termos de "qualidade" (premium, profissional...) ficam de fora: são RUÍDO.
+DEFAULT_VOCABULARY: List[str] = sorted(set("""
+api apis rest http graphql grpc json xml yaml sql nosql código software sistema sistemas
+dados banco backend frontend web mobile cloud nuvem servidor rede redes protocolo endpoint
+microsserviço microservice container docker kubernetes pipeline deploy infraestrutura
+segurança security vulnerabilidade vulnerability owasp criptografia token autenticação
+firewall malware exploit pentest forense forensic log logs telemetria monitoramento
+tech tecnologia algoritmo modelo machine learning ia ai llm prompt embedding semântico
+semantic texto linguagem documentação documentation teste testes test unit commit diff
+git versão release dependência dependency módulo module arquitetura architecture
+desempenho performance latência cache memória compilador parser sintaxe estilo lint
+análise analysis varredura scan auditoria audit desenvolvimento development criação
+geração generation otimização optimization validação validation verificação
+mapeamento mapping refatoração refactoring tradução translation revisão review
+detecção detection classificação extração extraction busca search indexação
+automação automation integração integration migração migration depuração debugging
+hacker auditor scanner explorador explorer arquiteto architect engenheiro engineer
+detetive detective inspetor inspector guardião guardian sentinela sentinel curador
+tradutor translator revisor reviewer mapeador mapper gerador generator validador
+validator otimizador optimizer analisador analyzer rastreador tracker crawler
+estrategista strategist cirurgião surgeon mentor tutor oráculo oracle forjador
+""".split()))
+
+def vocabulary_hash(words: Iterable[str]) -> str:
+    """Hash (sha256) do vocabulário, na ordem e sem duplicatas (como no build)."""
+    return hashlib.sha256("\n".join(dict.fromkeys(words)).encode('utf-8')).hexdigest()
+
+DEFAULT_VOCABULARY_HASH = vocabulary_hash(DEFAULT_VOCABULARY)
+
+def _model_slug(model_name: str) -> str:
+    """Nome de arquivo seguro para o modelo."""
+    return re.sub(r'[^\w.@-]', '_', model_name)
+
+def index_path(model_name: str, index_dir: str = DEFAULT_INDEX_DIR) -> Path:
+    """Arquivo .npz do índice do modelo (por backend: ver 'cache_id')."""
+    return Path(index_dir) / f"{_model_slug(model_registry.cache_id(model_name))}.npz"
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.clip(norms, 1e-12, None)
+
+def read_vocabulary(path: Optional[str] = None) -> List[str]:
+    """Vocabulário: um termo por linha ('#' comenta). Sem 'path', o padrão."""
+    if not path:
+        return list(DEFAULT_VOCABULARY)
+    with open(path, 'r', encoding='utf-8') as f:
+        words = [line.split('#', 1)[0].strip() for line in f]
+    return list(dict.fromkeys(w for w in words if w))
+
+# --- Build ---
+
+def build_index(
+    model_name: str,
+    vocabulary: Optional[Iterable[str]] = None,
+    index_dir: str = DEFAULT_INDEX_DIR,
+    batch_size: int = 128
+) -> Path:
+    """
+    Codifica o vocabulário no modelo e salva o índice (.npz, float16).
+    Retorna o caminho do arquivo gerado.
+    """
+    words = list(dict.fromkeys(vocabulary if vocabulary is not None else DEFAULT_VOCABULARY))
+    if not words:
+        raise ValueError("Vocabulário vazio.")
+
+    embeddings = _normalize_rows(model_registry.encode(model_name, words, batch_size=batch_size))
+    vocab_hash = vocabulary_hash(words)
+
+    path = index_path(model_name, index_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.stem + f".{os.getpid()}.tmp.npz")
+    np.savez(
+        tmp_path,
+        words=np.array(words),
+        embeddings=embeddings.astype(np.float16),
+        model_name=np.array(model_registry.cache_id(model_name)),
+        vocab_hash=np.array(vocab_hash)
+    )
+    os.replace(tmp_path, path)
+    _INDEXES.pop(str(path), None)
+    return path
+
+# --- Query ---
+
+class VocabIndex:
+    """
+    Índice de vocabulário em memória: matriz (n x d) normalizada + palavras.
+    """
+
+    def __init__(self, words: List[str], embeddings: np.ndarray, model_name: str = "", vocab_hash: str = ""):
+        self.words = list(words)
+        # float32 para as consultas (o arquivo guarda float16)
+        self.embeddings = _normalize_rows(embeddings)
+        self.model_name = model_name
+        self.vocab_hash = vocab_hash
+
+    @classmethod
+    def load(cls, path: Path) -> "VocabIndex":
+        with np.load(path, allow_pickle=False) as data:
+            # Índices antigos não têm 'vocab_hash': nunca batem (são reconstruídos)
+            vocab_hash = str(data['vocab_hash']) if 'vocab_hash' in data.files else ""
+            return cls(data['words'].tolist(), data['embeddings'], str(data['model_name']), vocab_hash)
+
+    def matches(self, model_name: str, vocab_hash: str) -> bool:
+        """O índice é deste modelo (e backend) e deste vocabulário?"""
+        return self.vocab_hash == vocab_hash and self.model_name == model_registry.cache_id(model_name)
+
+    def top_k(self, query_embedding: np.ndarray, k: int = 10) -> List[Tuple[str, float]]:
+        """As 'k' palavras de maior cosseno com a consulta."""
+        scores = self.embeddings @ _normalize_rows(query_embedding).reshape(-1)
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(self.words[i], float(scores[i])) for i in best]
+
+    def beam_search(
+        self,
+        query_embedding: np.ndarray,
+        k: int = 10,
+        beam_width: int = 16,
+        pool_size: int = 64,
+        max_words: int = MAX_WORDS
+    ) -> List[Tuple[str, float]]:
+        """
+        Melhores combinações de até 'max_words' palavras, pontuadas pelo
+        cosseno entre a média normalizada dos vetores e a consulta.
+
+        A expansão fica restrita às 'pool_size' palavras mais próximas da
+        consulta; cada nível mantém os 'beam_width' melhores prefixos.
+        """
+        query = _normalize_rows(query_embedding).reshape(-1)
+        scores = self.embeddings @ query
+        pool_size = min(pool_size, len(scores))
+        pool = np.argpartition(-scores, pool_size - 1)[:pool_size]
+        pool = pool[np.argsort(-scores[pool])]
+        pool_vectors = self.embeddings[pool]
+
+        # Estado do beam: (índices no pool, soma dos vetores)
+        beam = [((int(i),), pool_vectors[i]) for i in range(min(beam_width, pool_size))]
+        found: Dict[frozenset, Tuple[Tuple[int, ...], float]] = {
+            frozenset(ids): (ids, float(scores[pool[ids[0]]])) for ids, _ in beam
+        }
+
+        for _ in range(max_words - 1):
+            expansions = []
+            for ids, total in beam:
+                sums = total[None, :] + pool_vectors
+                combined = sums @ query / np.clip(np.linalg.norm(sums, axis=1), 1e-12, None)
+                for j in np.argsort(-combined)[:beam_width + len(ids)]:
+                    if int(j) in ids:
+                        continue
+                    new_ids = ids + (int(j),)
+                    key = frozenset(new_ids)
+                    if key in found:
+                        continue
+                    found[key] = (new_ids, float(combined[j]))
+                    expansions.append((float(combined[j]), new_ids, sums[j]))
+            if not expansions:
+                break
+            expansions.sort(key=lambda e: e[0], reverse=True)
+            beam = [(ids, total) for _, ids, total in expansions[:beam_width]]
+
+        ranked = sorted(found.values(), key=lambda e: e[1], reverse=True)[:k]
+        return [(" ".join(self.words[pool[i]] for i in ids), score) for ids, score in ranked]
+
+_INDEXES: Dict[str, VocabIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+def get_index(
+    model_name: str,
+    index_dir: str = DEFAULT_INDEX_DIR,
+    vocabulary: Optional[Iterable[str]] = None
+) -> Optional[VocabIndex]:
+    """
+    Índice do modelo (carregado uma vez por processo), ou None se não
+    construído. Um índice de outro vocabulário ('vocabulary'; padrão: o
+    embutido) ou de outro modelo/backend é reconstruído (carrega o modelo).
+    """
+    words = list(dict.fromkeys(vocabulary)) if vocabulary is not None else None
+    expected = vocabulary_hash(words) if words is not None else DEFAULT_VOCABULARY_HASH
+    path = index_path(model_name, index_dir)
+    index = _INDEXES.get(str(path))
+    if index is None or not index.matches(model_name, expected):
+        if not path.exists():
+            return None
+        with _INDEXES_LOCK:
+            index = _INDEXES.get(str(path))
+            if index is None or not index.matches(model_name, expected):
+                index = VocabIndex.load(path)
+                if not index.matches(model_name, expected):
+                    print(f"♻️  Índice de vocabulário desatualizado ({path.name}); reconstruindo...", file=sys.stderr)
+                    build_index(model_name, words, index_dir)
+                    index = VocabIndex.load(path)
+                _INDEXES[str(path)] = index
+    return index
+
+def suggest_names(
+    model_name: str,
+    domain: str,
+    k: int = 5,
+    domain_embedding: Optional[np.ndarray] = None,
+    rerank: bool = False,
+    index_dir: str = DEFAULT_INDEX_DIR,
+    vocabulary: Optional[Iterable[str]] = None
+) -> List[Tuple[str, float]]:
+    """
+    Nomes (<= 3 palavras) com maior SD estimada contra o domínio.
+
+    Passe 'domain_embedding' quando já calculada (nenhum encode é feito).
+    Sem ela, o domínio passa pelo cache de embeddings e, se for inédito, é
+    codificado: isso CARREGA o modelo (segundos), salvo com o daemon de
+    scoring rodando. Com 'rerank', os candidatos do beam são re-pontuados
+    com o modelo real. Sem índice construído, retorna []. 'vocabulary':
+    ver 'get_index'.
+    """
+    index = get_index(model_name, index_dir, vocabulary)
+    if index is None:
+        return []
+    if domain_embedding is None:
+        domain_embedding = model_registry.encode(model_name, [domain])[0]
+
+    candidates = index.beam_search(domain_embedding, k=k * 4 if rerank else k)
+    if not rerank:
+        return candidates
+
+    names = [name for name, _ in candidates]
+    embeddings = _normalize_rows(model_registry.encode(model_name, [domain] + names))
+    scores = embeddings[1:] @ embeddings[0]
+    order = np.argsort(-scores)[:k]
+    return [(names[i], float(scores[i])) for i in order]
+
+# --- Executor CLI ---
+
+def _resolve_model_name(model: str) -> str:
+    """Aceita a chave de EMBEDDING_MODELS (ex: 'miniLM') ou o nome completo."""
+    from validation_core import EMBEDDING_MODELS
+    return EMBEDDING_MODELS.get(model, model)
+
+def main():
+    """
+    Ponto de entrada do CLI.
+    """
+    parser = argparse.ArgumentParser(
+        description='Índice de Vocabulário para sugestão de nomes (ACC v1.1.0)'
+    )
+    parser.add_argument('command', choices=['build', 'query'])
+    parser.add_argument('domain', type=str, nargs='*',
+                        help='No "query": o texto do Domínio Alvo.')
+    parser.add_argument('--model', type=str, default='miniLM',
+                        help='Chave de EMBEDDING_MODELS (ex: "miniLM") ou nome completo (Padrão: miniLM).')
+    parser.add_argument('--vocab', type=str, default=None,
+                        help='Arquivo com um termo por linha (Padrão: vocabulário embutido). No "query", '
+                             'um índice de outro vocabulário é reconstruído.')
+    parser.add_argument('--top-k', type=int, default=10,
+                        help='No "query": número de sugestões (Padrão: 10).')
+    parser.add_argument('--rerank', action='store_true',
+                        help='No "query": re-pontua as sugestões com o modelo (carrega o modelo).')
+    parser.add_argument('--index-dir', type=str, default=DEFAULT_INDEX_DIR,
+                        help=f'Diretório dos índices (Padrão: {DEFAULT_INDEX_DIR}).')
+
+    args = parser.parse_args()
+    model_name = _resolve_model_name(args.model)
+
+    try:
+        if args.command == 'build':
+            vocabulary = read_vocabulary(args.vocab)
+            path = build_index(model_name, vocabulary, index_dir=args.index_dir)
+            print(f"✅ Índice de {len(vocabulary)} termos salvo em: {path}")
+            return
+
+        domain = " ".join(args.domain)
+        if not domain:
+            parser.error('"query" exige o texto do domínio.')
+        vocabulary = read_vocabulary(args.vocab) if args.vocab else None
+        if get_index(model_name, args.index_dir, vocabulary) is None:
+            print(f"Erro: índice não encontrado. Rode: python tools/vocab_index.py build --model {args.model}",
+                  file=sys.stderr)
+            sys.exit(1)
+
+        start = time.perf_counter()
+        suggestions = suggest_names(model_name, domain, k=args.top_k, rerank=args.rerank, index_dir=args.index_dir,
+                                    vocabulary=vocabulary)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+    except (RuntimeError, ValueError, OSError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"\n{'='*70}")
+    print(f"💡 SUGESTÕES DE NOME: {domain[:50]} ({model_name})")
+    print(f"{'='*70}\n")
+    for i, (name, score) in enumerate(suggestions):
+        print(f"  {i+1:>2}. {score:.4f}  \"{name}\"")
+    print(f"\nConsulta em {elapsed_ms:.1f} ms.")
+    print(f"{'='*70}\n")
+
+if __name__ == "__main__":
+    main()